@@ -1,69 +1,189 @@
 import pandas as pd
 import streamlit as st
-import matplotlib.pyplot as plt
-from preprocessing import preprocess_data
-from predict import predict_cost
-from scenario_utils import create_scenario_input
-from config import CATEGORICAL_FEATURES, NUMERICAL_FEATURES, TRUCK_TYPE
-import eda
-
-@st.cache_data
-def load_raw_data():
-    """
-    Loads all raw datasets.
-    """
-    # Dimension tables
-    dimension_tables = pd.read_excel("data/DimensionTables.xlsx")
-    vehicles = pd.read_excel("data/DimensionTables.xlsx", sheet_name="Vehicles")
-    customers = pd.read_excel("data/DimensionTables.xlsx", sheet_name="Customers")
-
-    # Cost & freight data
-    f_cost = pd.read_excel("data/fCosts.xlsx", header=2)
-    f_freight = pd.read_csv("data/fFreight.csv")
-
-    return vehicles, customers, f_cost, f_freight
+from periods import GRAINS, aggregate_periods, date_bounds, period_source
+from config import CATEGORICAL_FEATURES, NUMERICAL_FEATURES, TRUCK_TYPE, COST_PER_KM, NET_PROFIT
+import instrumentation
+from instrumentation import cached, span
+from stats_cube import LEVELS, stat
+from shared_cache import shared_frames
+from figure_cache import FigureCache, figure_key
+from geo import customer_index, cities_within
+from fact_table import load_facts
+from validation import QUARANTINE_PATH
+from dataset import RAW_FRAMES, build_dataset, version as dataset_version
 
 st.set_page_config(page_title="Fleet Analytics", layout="wide")
 st.title("🚚 Fleet Cost Prediction System")
 
+@cached(st.cache_resource, "dataset")
+def load_dataset(version):
+    """
+    (raw frames, (df, city_stats), stats cube, (validation summary, rejections by
+    reason)) for this dataset version (dataset.build_dataset). Built by the
+    first worker process and memory-mapped by the others (see shared_cache.py); keyed
+    on the version string, so reruns skip hashing the frames.
+    Shared by all sessions and workers: treat the frames as read-only.
+    """
+    frames = shared_frames("dataset", version, build_dataset)
+    cube = {level: frames[f"stats.{level}"] for level in LEVELS if f"stats.{level}" in frames}
+    validation = (frames["validation.summary"], frames["validation.reasons"])
+    return tuple(frames[name] for name in RAW_FRAMES), (frames["merged_log"], frames["city_stats"]), cube, validation
+
 # Load and Preprocess Data
 with st.spinner("Loading data..."):
-    vehicles, customers, f_cost, f_freight = load_raw_data()
-    df, city_stats = preprocess_data(vehicles, customers, f_cost, f_freight)
+    # Raw files, validation rules and the code building the frames (see dataset.py)
+    version = dataset_version()
+    (vehicles, customers, f_cost, f_freight), (df, city_stats), cube, validation = load_dataset(version)
+
+# Underscored arguments below are not hashed by Streamlit: the dataset version
+# already identifies them
+@cached(st.cache_resource, "period_source")
+def load_period_source(version, _raw):
+    """
+    Cleaned, date-sorted cost and freight rows for per-period aggregation.
+    """
+    vehicles, customers, f_cost, f_freight = _raw
+    return period_source(vehicles, f_cost, f_freight)
+
+@cached(st.cache_data, "aggregate_periods")
+def load_periods(version, grain, start, end, _source):
+    return aggregate_periods(_source, grain, start, end)
+
+@cached(st.cache_data(max_entries=8), "sensitivity_sweep")
+def load_sweep(version, model, spec, _truck_means):
+    """
+    sweeps.Sweep for spec = ((variable, start, stop, steps), ...). `model` (the served
+    model's id) and the dataset version identify the predictions.
+    """
+    import numpy as np
+    from sweeps import Sweep
+    axes = {col: np.linspace(start, stop, steps) for col, start, stop, steps in spec}
+    return Sweep(_truck_means, axes)
+
+@cached(st.cache_resource, "facts")
+def load_fact_table(version, _raw):
+    """
+    Sorted, indexed freight and cost fact tables for drill-downs (see fact_table.py).
+    """
+    return load_facts(version, _raw)
+
+@cached(st.cache_resource, "customer_index")
+def load_customer_index(version, _customers):
+    """
+    Spatial index over customer coordinates, as (GridIndex, located customers).
+    """
+    return customer_index(_customers)
+
+source = load_period_source(version, (vehicles, customers, f_cost, f_freight))
 
-# Navigation
-page = st.sidebar.radio("Navigate", ["Analysis", "Prediction"])
+@st.cache_resource
+def load_figure_cache():
+    # One cache per server process, shared by all sessions
+    return FigureCache()
+
+figures = load_figure_cache()
+
+def show_figure(name, build, **params):
+    """
+    Shows the PNG of build() for this dataset version and params, rendering it only
+    the first time (any session) it is needed.
+    """
+    key = figure_key(version, name, **params)
+    png = figures.get(key)
+    if png is None:
+        with span(f"render.{name}"):
+            png = figures.get_or_render(key, build)
+    st.image(png, width="stretch")
+
+# Navigation (the Diagnostics page is only listed with ?diagnostics=1 in the URL)
+pages = ["Analysis", "Prediction"]
+if st.query_params.get("diagnostics") == "1":
+    pages.append("Diagnostics")
+page = st.sidebar.radio("Navigate", pages, key="page")
 
 # --- TAB 1: Analysis ---
 if page == "Analysis":
+    # Plotting libraries load only when this page runs (see benchmarks/startup.py)
+    import eda
+
     st.header("Fleet Data Analysis")
     
     col1, col2 = st.columns(2)
     
     with col1:
         st.subheader("Truck Type Cost Analysis")
-        # Bar chart
-        fig1 = eda.plot_truck_type_analysis_bar(df)
-        st.pyplot(fig1)
+        # Bar chart (interactive, straight from the precomputed truck type means)
+        st.bar_chart(stat(cube, "mean")[eda.COST_PER_KM_COLS], stack=False)
 
         st.subheader("Top 10 Cities by Goods Value")
         # Top Cities
-        fig3 = eda.plot_top_10_cities(city_stats)
-        st.pyplot(fig3)
+        show_figure("top_10_cities", lambda: eda.plot_top_10_cities(city_stats.copy()))
         
     with col2:
         st.subheader("Costs per KM Distribution")
         # Boxplot
-        fig2 = eda.plot_costs_per_km_boxplot(df)
-        st.pyplot(fig2)
+        show_figure("costs_per_km_boxplot", lambda: eda.plot_costs_per_km_boxplot(df))
 
         st.subheader("Customer Geography")
         # Geo scatter
-        fig4 = eda.plot_geo_distribution(city_stats)
-        st.pyplot(fig4)
+        show_figure("geo_distribution", lambda: eda.plot_geo_distribution(city_stats))
+
+        with st.expander("Cities near a depot"):
+            index, located = load_customer_index(version, customers)
+            g1, g2, g3 = st.columns(3)
+            depot_lat = g1.number_input("Latitude", -90.0, 90.0, float(located['Latitude'].median()) if len(located) else 0.0)
+            depot_lon = g2.number_input("Longitude", -180.0, 180.0, float(located['Longitude'].median()) if len(located) else 0.0)
+            radius_km = g3.number_input("Radius (km)", 1.0, 5000.0, 100.0)
+            nearby = cities_within(index, located, depot_lat, depot_lon, radius_km)
+            st.write(f"{len(nearby)} cities, {int(nearby['Customers'].sum())} customers within {radius_km:g} km")
+            st.dataframe(nearby, hide_index=True)
+
+    st.subheader("Trends by Period")
+    first, last = date_bounds(source)
+    if first is None:
+        st.info("No dated cost or freight rows.")
+    else:
+        t1, t2, t3 = st.columns(3)
+        grain = t1.selectbox("Time grain", GRAINS, index=GRAINS.index("month"))
+        date_range = t2.date_input("Date range", (first.date(), last.date()),
+                                   min_value=first.date(), max_value=last.date())
+        metrics = NUMERICAL_FEATURES + [NET_PROFIT]
+        metric = t3.selectbox("Metric", metrics, index=metrics.index(COST_PER_KM))
+        # The picker returns a single date while the user is still choosing the range
+        if len(date_range) == 2:
+            periods = load_periods(version, grain, date_range[0], date_range[1], source)
+            if periods.empty:
+                st.info("No trips in this date range.")
+            else:
+                # Mean over the trucks of each type in each period
+                st.line_chart(periods.groupby(['Period', TRUCK_TYPE], observed=True)[metric].mean().unstack())
+
+        with st.expander("Drill-down: trips by truck or customer"):
+            facts = load_fact_table(version, (vehicles, customers, f_cost, f_freight))
+            d1, d2, d3 = st.columns(3)
+            by = d1.radio("By", ["Truck", "Customer"], horizontal=True)
+            if by == "Truck":
+                truck_id = d2.selectbox("Truck ID", sorted(vehicles['Truck ID'].dropna().unique()))
+            else:
+                customer_id = d2.number_input("Customer ID", min_value=0, step=1,
+                                              value=int(facts.freight['Customer ID'].iloc[0]) if len(facts.freight) else 0)
+            # Default to the last month of data
+            window = d3.date_input("Dates", ((last - pd.DateOffset(months=1)).date(), last.date()),
+                                   min_value=first.date(), max_value=last.date(), key="drill_dates")
+            if len(window) == 2:
+                if by == "Truck":
+                    rows = facts.trips(truck_id, *window)
+                    st.write(f"{len(rows):,} trips, {len(facts.truck_costs(truck_id, *window)):,} cost entries")
+                else:
+                    rows = facts.customer_freight(customer_id, *window)
+                    st.write(f"{len(rows):,} deliveries")
+                st.dataframe(rows, hide_index=True)
 
 # --- TAB 2: Prediction ---
 if page == "Prediction":
+    # The model (joblib, sklearn) loads on the first prediction, never for other pages
+    from predict import predict_scenario
+
     st.header("Profit Prediction Setup")
     
     st.markdown("Use this tool to predict **Net Profit** for a **Single Delivery**. Select a truck type to load average trip stats, then override specific values.")
@@ -74,12 +194,13 @@ if page == "Prediction":
     c_base, _ = st.columns(2)
     with c_base:
         st.subheader("Base Configuration")
-        truck_types = sorted(df[TRUCK_TYPE].dropna().unique())
+        truck_types = sorted(stat(cube, "count").index)
         selected_truck = st.selectbox("Select Truck Type (Base)", truck_types)
     
-    # Calculate means
+    # Truck type means (precomputed once per dataset version, see stats_cube.py)
     from config import NUMERICAL_FEATURES, DISTANCE_KM, WEIGHT_KG, WEIGHT_CUBIC, GOODS_VALUE
-    truck_means = df.groupby(TRUCK_TYPE)[NUMERICAL_FEATURES].mean()
+    with span("app.truck_means"):
+        truck_means = stat(cube, "mean")
 
     # --- Session State Logic to Update Defaults ---
     # Initialize keys if not present
@@ -126,14 +247,9 @@ if page == "Prediction":
             }
             
             try:
-                # Prepare input DF using utility
-                scenario_df = create_scenario_input(scenario_data, truck_means)
-                
-                # Predict
-                # Use predict module wrapper if updated, or load pipeline here?
-                # Best to use predict module for consistency
-                from predict import predict_cost 
-                prediction = predict_cost(scenario_df)
+                # Prepare input DF (create_scenario_input) and predict, memoized per
+                # model and dataset version (see prediction_cache.py)
+                prediction = predict_scenario(scenario_data, truck_means, version)
                 
                 st.metric("Predicted Net Profit", f"₹ {prediction:,.2f}")
                 
@@ -145,3 +261,77 @@ if page == "Prediction":
             except Exception as e:
                 st.error(f"Prediction Error: {e}")
 
+    # Sensitivity of the prediction to one or two variables, for every truck type
+    from predict import model_id
+    from sweeps import SWEEP_VARIABLES
+
+    st.subheader("Sensitivity Sweep")
+    st.markdown("How predicted **Net Profit** moves as one or two variables vary, for every truck type. Other values are each type's averages.")
+    w1, w2 = st.columns(2)
+    x_col = w1.selectbox("Vary", SWEEP_VARIABLES)
+    y_col = w2.selectbox("Against", ["None"] + [v for v in SWEEP_VARIABLES if v != x_col])
+    swept = [x_col] + ([y_col] if y_col != "None" else [])
+    spec = []
+    for col in swept:
+        r1, r2, r3 = st.columns(3)
+        start = r1.number_input(f"{col} from", min_value=0.0, value=0.0, key=f"sweep_start_{col}")
+        stop = r2.number_input(f"{col} to", min_value=0.0, value=round(2 * float(truck_means[col].max()), 2),
+                               key=f"sweep_stop_{col}")
+        steps = r3.number_input(f"{col} steps", min_value=2, max_value=2000,
+                                value=200 if len(swept) == 1 else 60, key=f"sweep_steps_{col}")
+        spec.append((col, float(start), float(stop), int(steps)))
+    if st.button("Run Sweep"):
+        st.session_state.sweep_spec = tuple(spec)
+
+    spec = st.session_state.get("sweep_spec")
+    if spec:
+        try:
+            model = model_id()
+            with st.spinner("Scoring the grid..."):
+                sweep = load_sweep(version, model, spec, truck_means)
+        except Exception as e:
+            st.error(f"Sweep Error: {e}")
+        else:
+            break_even = sweep.break_even()
+            if sweep.y is None:
+                st.line_chart(sweep.curves())
+                st.write(f"Break-even {sweep.x} per truck type (empty: no sign change in the range)")
+                st.dataframe(break_even)
+            else:
+                truck = st.selectbox("Heatmap truck type", sweep.truck_types)
+                # Vega-Lite, not matplotlib: this page never loads a plotting library
+                st.vega_lite_chart(sweep.heatmap_spec(truck), width="stretch")
+                st.write(f"Break-even {sweep.x} by {sweep.y} (empty: no sign change in the range)")
+                st.line_chart(break_even)
+
+# --- Hidden: Diagnostics ---
+if page == "Diagnostics":
+    st.header("Diagnostics")
+    scope = st.radio("Scope", ["This session", "Process"], horizontal=True)
+    session = instrumentation.session_id() if scope == "This session" else instrumentation.PROCESS
+    metrics = instrumentation.snapshot(session)
+
+    st.subheader("Latency by stage (ms)")
+    latency = pd.DataFrame(metrics["latency"]).T
+    if latency.empty:
+        st.info("No spans recorded yet.")
+    else:
+        st.dataframe(latency.drop(columns="buckets"))
+        stage = st.selectbox("Histogram", list(latency.index))
+        st.bar_chart(pd.Series(metrics["latency"][stage]["buckets"]))
+
+    st.subheader("Cache hits / misses")
+    st.dataframe(pd.DataFrame(metrics["cache"]).T)
+
+    st.subheader("Data validation")
+    st.dataframe(validation[0], hide_index=True)
+    if len(validation[1]):
+        st.dataframe(validation[1], hide_index=True)
+        st.caption(f"Rejected rows and their reasons: {QUARANTINE_PATH}")
+
+    st.subheader("Prediction cache (process)")
+    from prediction_cache import get_cache
+    st.json(get_cache().summary())
+
+    st.download_button("Download metrics (JSON)", instrumentation.export_metrics(),
+                       file_name="fleet_metrics.json", mime="application/json")
@@ -0,0 +1,87 @@
+# benchmarks/bench_cleaning.py
+#
+# Rows/sec of the numeric cleaning stage on a synthetic fFreight file.
+# Usage: python -m benchmarks.bench_cleaning [--rows 10000000]
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from cleaning import clean_numeric, FREIGHT_SCHEMA
+
+
+def legacy_clean_num(df, col, to_type=float, replace_comma_dot=False, replace_comma_empty=False):
+    """
+    The per-column helper preprocess_data used before cleaning.clean_numeric.
+    """
+    if col not in df.columns: return pd.Series(0, index=df.index)
+    s = df[col].astype(str)
+    if replace_comma_dot:
+        s = s.str.replace(',', '.')
+    if replace_comma_empty:
+        s = s.str.replace(',', '')
+    s = s.replace('nan', '0')
+    return pd.to_numeric(s, errors='coerce').fillna(0).astype(to_type)
+
+
+def legacy_clean(df):
+    df = df.copy()
+    df['Net Revenue'] = legacy_clean_num(df, 'Net Revenue', float, replace_comma_dot=True)
+    df['Weight (Kg)'] = legacy_clean_num(df, 'Weight (Kg)', float, replace_comma_dot=True)
+    df['Weight (Cubic)'] = legacy_clean_num(df, 'Weight (Cubic)', float, replace_comma_dot=True)
+    df['Goods Value'] = legacy_clean_num(df, 'Goods Value', float, replace_comma_empty=True)
+    return df
+
+
+def write_synthetic_freight(path, rows, seed=0):
+    """
+    Writes the numeric columns of fFreight.csv in its locale format ("7,42").
+    """
+    rng = np.random.default_rng(seed)
+
+    def comma_decimal(values):
+        return pd.Series(np.round(values, 2)).astype(str).str.replace(".", ",", regex=False)
+
+    df = pd.DataFrame({
+        "Net Revenue": comma_decimal(rng.uniform(1, 20, rows)),
+        "Weight (Kg)": comma_decimal(rng.uniform(0.5, 10, rows)),
+        "Weight (Cubic)": rng.integers(1, 10, rows),
+        "Goods Value": comma_decimal(rng.uniform(50, 500, rows)),
+    })
+    df.to_csv(path, index=False)
+
+
+def time_it(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--skip-legacy", action="store_true", help="only time clean_numeric")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fFreight.csv")
+        print(f"Writing {args.rows:,} synthetic freight rows...")
+        write_synthetic_freight(path, args.rows)
+        df = pd.read_csv(path)
+
+    (new, failures), new_s = time_it(clean_numeric, df, FREIGHT_SCHEMA)
+    print(f"clean_numeric: {new_s:.2f}s  {args.rows / new_s:,.0f} rows/sec  failures={failures}")
+
+    if not args.skip_legacy:
+        old, old_s = time_it(legacy_clean, df)
+        print(f"legacy clean_num: {old_s:.2f}s  {args.rows / old_s:,.0f} rows/sec")
+        print(f"speedup: {old_s / new_s:.1f}x")
+        pd.testing.assert_frame_equal(old[list(FREIGHT_SCHEMA)], new[list(FREIGHT_SCHEMA)])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# benchmarks/load_service.py
+#
+# Load generator for service.py: N concurrent keep-alive clients each send single
+# scenario POST /predict requests; reports throughput, client latency percentiles and
+# the server's batch sizes from /metrics. Stdlib only.
+#
+# Usage:
+#   python service.py --port 8000 &
+#   python -m benchmarks.load_service --port 8000 --concurrency 64 --requests 5000
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+TRUCK_TYPES = ["BOX", "SEMI-TRAILER", "TRACTOR", "TRAILER"]
+
+
+async def _request(reader, writer, method, path, payload=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def client(host, port, count, latencies, errors, seed):
+    rng = random.Random(seed)
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            scenario = {"Truck Type": rng.choice(TRUCK_TYPES), "KM Traveled": rng.uniform(5, 500)}
+            start = time.perf_counter()
+            status, _ = await _request(reader, writer, "POST", "/predict", scenario)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+
+async def run(host, port, concurrency, requests):
+    latencies, errors = [], []
+    per_client = [requests // concurrency + (i < requests % concurrency) for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, n, latencies, errors, i) for i, n in enumerate(per_client) if n))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    pct = lambda q: latencies[min(int(q / 100 * len(latencies)), len(latencies) - 1)] * 1000
+    print(f"{len(latencies):,} requests, {concurrency} clients, {elapsed:.2f}s "
+          f"-> {len(latencies) / elapsed:,.0f} req/s, {len(errors)} errors")
+    print(f"latency ms: p50 {pct(50):.1f}  p95 {pct(95):.1f}  p99 {pct(99):.1f}  max {latencies[-1] * 1000:.1f}")
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, metrics = await _request(reader, writer, "GET", "/metrics")
+    writer.close()
+    print(f"server: {metrics['batches']:,} batches, batch size {metrics['batch_size']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the prediction service.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    asyncio.run(run(args.host, args.port, args.concurrency, args.requests))
@@ -0,0 +1,253 @@
+# benchmarks/run.py
+#
+# Times the project's hot paths (load, preprocess, train, predict, EDA plots) on
+# synthetic data at one or more scales, records wall time and peak traced memory per
+# stage, and writes a JSON file that can be compared across commits.
+#
+# Usage:
+#   python -m benchmarks.run --rows 1000 100000 --output bench.json
+#   python -m benchmarks.run --rows 100000 --baseline bench.json   # exits 1 on regression
+#   python -m benchmarks.run --compare old.json new.json
+
+import argparse
+import contextlib
+import datetime
+import gc
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.synthetic import generate_dataset
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_THRESHOLD = 1.25
+
+
+@contextlib.contextmanager
+def working_dir(path):
+    previous = os.getcwd()
+    os.chdir(path)
+    try:
+        yield
+    finally:
+        os.chdir(previous)
+
+
+def measure(fn, repeat=1, memory=True):
+    """
+    Returns {"seconds": best of `repeat` runs, "peak_mb": traced peak of one extra run}.
+    """
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    result = {"seconds": min(times)}
+
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def run_stages(repeat=3, memory=True, train=True, predict_rows=10_000):
+    """
+    Runs every stage against ./data and returns {stage: measurement}.
+    """
+    import matplotlib.pyplot as plt
+    import eda
+    import predict
+    from data_loader import load_raw_data
+    from preprocessing import preprocess_data
+    from scenario_utils import create_scenario_input, truck_type_defaults
+    from config import TRUCK_TYPE, DISTANCE_KM, WEIGHT_KG
+
+    results = {}
+    state = {}
+
+    def load_cold():
+        shutil.rmtree(os.path.join("data", ".cache"), ignore_errors=True)
+        load_raw_data.clear()
+        state["raw"] = load_raw_data()
+
+    def load_warm():
+        load_raw_data.clear()
+        state["raw"] = load_raw_data()
+
+    def preprocess():
+        preprocess_data.clear()
+        state["df"], state["city_stats"] = preprocess_data(*state["raw"])
+
+    # Cold load can only be measured once per run: repeating it would hit the cache
+    results["load_raw_data_cold"] = measure(load_cold, 1, memory=False)
+    results["load_raw_data"] = measure(load_warm, repeat, memory)
+    results["preprocess_data"] = measure(preprocess, repeat, memory)
+
+    if train:
+        from train_model import train_pipeline
+        with contextlib.redirect_stdout(open(os.devnull, "w")):
+            results["train_pipeline"] = measure(train_pipeline, 1, memory=False)
+
+    df, city_stats = state["df"], state["city_stats"]
+    means = truck_type_defaults(df)
+    truck_type = means.index[0]
+    predict._load_model.clear()
+    predict.get_pipeline()
+
+    scenario = {TRUCK_TYPE: truck_type, DISTANCE_KM: 50.0, WEIGHT_KG: 5.0}
+    single_calls = 50
+
+    def predict_single():
+        for _ in range(single_calls):
+            predict.predict_cost(create_scenario_input(scenario, means))
+
+    single = measure(predict_single, repeat, memory)
+    single["seconds"] /= single_calls
+    results["predict_cost"] = single
+
+    rng = np.random.default_rng(0)
+    scenarios = pd.DataFrame({
+        TRUCK_TYPE: rng.choice(means.index, predict_rows),
+        DISTANCE_KM: rng.uniform(1, 200, predict_rows),
+    })
+    results[f"predict_batch_{predict_rows}"] = measure(
+        lambda: predict.predict_batch(scenarios, means), repeat, memory
+    )
+
+    plots = {
+        "plot_truck_type_analysis_bar": lambda: eda.plot_truck_type_analysis_bar(df),
+        "plot_costs_per_km_boxplot": lambda: eda.plot_costs_per_km_boxplot(df),
+        "plot_top_10_cities": lambda: eda.plot_top_10_cities(city_stats.copy()),
+        "plot_geo_distribution": lambda: eda.plot_geo_distribution(city_stats),
+    }
+    for name, plot in plots.items():
+        def render(plot=plot):
+            fig = plot()
+            fig.canvas.draw()
+            plt.close(fig)
+        results[name] = measure(render, repeat, memory)
+
+    return results
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(rows_list, workspace, repeat=3, memory=True, train=True):
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "pandas": pd.__version__,
+            "numpy": np.__version__,
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "repeat": repeat,
+        },
+        "results": {},
+    }
+    for rows in rows_list:
+        scale_dir = os.path.join(workspace, f"freight_{rows}")
+        data_dir = os.path.join(scale_dir, "data")
+        if not os.path.exists(os.path.join(data_dir, "fFreight.csv")):
+            print(f"Generating {rows:,} freight rows in {data_dir}...")
+            generate_dataset(data_dir, rows)
+        print(f"Benchmarking {rows:,} freight rows...")
+        with working_dir(scale_dir):
+            report["results"][str(rows)] = run_stages(repeat, memory, train)
+        print_results(report["results"][str(rows)])
+    return report
+
+
+def print_results(results):
+    for stage, m in results.items():
+        peak = f"{m['peak_mb']:9.1f} MB" if "peak_mb" in m else " " * 12
+        print(f"  {stage:32s} {m['seconds'] * 1000:12.2f} ms {peak}")
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Prints per-stage time ratios (current / baseline) and returns the regressions,
+    i.e. stages slower than `threshold` times the baseline.
+    """
+    regressions = []
+    for rows, stages in current["results"].items():
+        base_stages = baseline["results"].get(rows, {})
+        print(f"{rows} freight rows ({baseline['meta'].get('commit')} -> {current['meta'].get('commit')}):")
+        for stage, m in stages.items():
+            if stage not in base_stages:
+                continue
+            ratio = m["seconds"] / max(base_stages[stage]["seconds"], 1e-12)
+            flag = "  REGRESSION" if ratio > threshold else ""
+            print(f"  {stage:32s} {ratio:6.2f}x{flag}")
+            if ratio > threshold:
+                regressions.append((rows, stage, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark load/preprocess/train/predict/EDA stages.")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 100_000],
+                        help="freight rows per scale (1k to 10M)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--skip-train", action="store_true")
+    parser.add_argument("--workspace", help="keep generated data here (default: temp dir)")
+    parser.add_argument("--output", help="write results JSON here")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="only compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f_old, open(args.compare[1]) as f_new:
+            regressions = compare(json.load(f_old), json.load(f_new), args.threshold)
+        sys.exit(1 if regressions else 0)
+
+    if REPO_DIR not in sys.path:
+        sys.path.insert(0, REPO_DIR)
+
+    workspace = args.workspace or tempfile.mkdtemp(prefix="fleet-bench-")
+    try:
+        report = run(args.rows, workspace, args.repeat, not args.no_memory, not args.skip_train)
+    finally:
+        if not args.workspace:
+            shutil.rmtree(workspace, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(json.load(f), report, args.threshold)
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
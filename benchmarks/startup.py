@@ -0,0 +1,147 @@
+# benchmarks/startup.py
+#
+# Startup report: import time per project module (python -X importtime, each in a
+# fresh interpreter) and time to first render of each app page (streamlit AppTest,
+# also in a fresh interpreter), with the heavy libraries each one pulled in.
+# --check exits 1 when a page or module loads a library it must not need (HEAVY_RULES),
+# e.g. plotting on the Prediction page, so CI catches an eager import creeping back.
+#
+# Usage (from the repo root; pages need a data/ directory under --data-root):
+#   python -m benchmarks.startup
+#   python -m benchmarks.startup --data-root /path/with/data --check --output startup.json
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = ["config", "data_loader", "preprocessing", "predict", "scenario_utils", "eda",
+           "figure_cache", "stats_cube", "shared_cache", "periods", "geo"]
+PAGES = ["Analysis", "Prediction", "Prediction+sweep"]
+# Session state each page render starts from; Prediction+sweep is the Prediction page
+# after "Run Sweep" over two variables, which draws the heatmap
+PAGE_STATE = {
+    "Analysis": {"page": "Analysis"},
+    "Prediction": {"page": "Prediction"},
+    "Prediction+sweep": {"page": "Prediction",
+                         "sweep_spec": (("KM Traveled", 0.0, 500.0, 8), ("Weight (Kg)", 0.0, 50.0, 6))},
+}
+HEAVY = ["matplotlib", "seaborn", "sklearn", "scipy", "joblib", "openpyxl"]
+
+# Libraries that must stay unloaded: per page (first render) and per module (import)
+HEAVY_RULES = {
+    "page:Analysis": ["sklearn", "joblib"],
+    "page:Prediction": ["matplotlib", "seaborn", "scipy"],
+    # Scoring the sweep loads the model (sklearn, and scipy through it), never plotting
+    "page:Prediction+sweep": ["matplotlib", "seaborn"],
+    "module:predict": ["matplotlib", "seaborn", "sklearn"],
+    "module:data_loader": ["matplotlib", "seaborn", "sklearn", "openpyxl"],
+    "module:preprocessing": ["matplotlib", "seaborn", "sklearn"],
+}
+
+_PAGE_SCRIPT = """
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {repo!r})
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=300)
+for key, value in {state!r}.items():
+    at.session_state[key] = value
+at.run()
+print(json.dumps({{
+    "seconds": time.perf_counter() - start,
+    "errors": [str(e.value) for e in at.exception],
+    "loaded": sorted(m for m in {heavy!r} if m in sys.modules),
+}}))
+"""
+
+
+def import_times(module):
+    """
+    Seconds to import `module` in a fresh interpreter, its five slowest direct
+    imports, and the HEAVY libraries it loaded.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_DIR, capture_output=True, text=True, check=True,
+    )
+    seconds, children, names = 0.0, {}, set()
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # the header line
+        # Names are indented two spaces per nesting level; children are listed first
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        names.add(name.split(".")[0])
+        if depth == 0 and name == module:
+            seconds = int(cumulative) / 1e6
+        elif depth == 1:
+            children[name] = int(cumulative) / 1e6
+        elif depth == 0:
+            children.clear()  # interpreter startup imports, not ours
+    return {"seconds": seconds, "loaded": sorted(m for m in HEAVY if m in names),
+            "slowest": dict(sorted(children.items(), key=lambda kv: -kv[1])[:5])}
+
+
+def page_startup(page, data_root):
+    """
+    Seconds from a fresh interpreter to the first full render of `page`, and the
+    HEAVY libraries loaded by then.
+    """
+    script = _PAGE_SCRIPT.format(repo=REPO_DIR, app=os.path.join(REPO_DIR, "app.py"), state=PAGE_STATE[page],
+                                 heavy=HEAVY)
+    result = subprocess.run([sys.executable, "-c", script], cwd=data_root, capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"Rendering {page} failed:\n{result.stderr[-2000:]}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def violations(report):
+    found = []
+    for name, forbidden in HEAVY_RULES.items():
+        kind, target = name.split(":")
+        entry = report["pages" if kind == "page" else "modules"].get(target)
+        if entry:
+            found += [f"{name} loads {lib}" for lib in forbidden if lib in entry["loaded"]]
+    return found
+
+
+def run(data_root, pages=PAGES, modules=MODULES):
+    report = {"modules": {}, "pages": {}}
+    for module in modules:
+        report["modules"][module] = entry = import_times(module)
+        print(f"import {module:<15} {entry['seconds'] * 1000:8.0f} ms   heavy: {', '.join(entry['loaded']) or '-'}")
+    if data_root:
+        for page in pages:
+            report["pages"][page] = entry = page_startup(page, data_root)
+            print(f"page   {page:<15} {entry['seconds'] * 1000:8.0f} ms   heavy: {', '.join(entry['loaded']) or '-'}"
+                  + (f"   errors: {entry['errors']}" if entry["errors"] else ""))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report import and first-render times.")
+    parser.add_argument("--data-root", default=".", help="directory containing data/ (pages are skipped if empty)")
+    parser.add_argument("--pages", nargs="*", default=PAGES)
+    parser.add_argument("--modules", nargs="*", default=MODULES)
+    parser.add_argument("--output", help="write the report JSON here")
+    parser.add_argument("--check", action="store_true", help="exit 1 if HEAVY_RULES are violated")
+    args = parser.parse_args()
+
+    data_root = args.data_root if os.path.isdir(os.path.join(args.data_root, "data")) else None
+    report = run(data_root, args.pages, args.modules)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    found = violations(report)
+    for problem in found:
+        print(f"FAIL {problem}")
+    if args.check and found:
+        sys.exit(1)
@@ -0,0 +1,157 @@
+# benchmarks/synthetic.py
+#
+# Synthetic Vehicles/Customers/fCosts/fFreight tables with the same schema and quirks as
+# the real data (header=2 cost sheet with a repeated header row, "7,42" style decimals in
+# fFreight.csv), at any scale.
+# Usage: python -m benchmarks.synthetic OUT_DIR --freight-rows 1000000
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+TRUCK_TYPES = ["BOX", "SEMI-TRAILER", "TRACTOR", "TRAILER"]
+START_DATE = pd.Timestamp("2018-01-01")
+FREIGHT_CHUNK_ROWS = 1_000_000
+
+
+def make_vehicles(n_trucks=30, seed=0):
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("ABCDEFGHJKLMNPQRSTUVWXYZ"))
+    plates = ["".join(rng.choice(letters, 3)) + f"-{rng.integers(1000, 9999)}" for _ in range(n_trucks)]
+    return pd.DataFrame({
+        "Truck ID": np.arange(2, n_trucks + 2),
+        "Plate": plates,
+        "Brand": rng.choice(["VW", "Mercedes", "Volvo"], n_trucks),
+        "Truck Type": rng.choice(TRUCK_TYPES, n_trucks),
+        "Trailers Type": rng.choice(["Reefer", "Fridge", "Dry"], n_trucks),
+        "Year": rng.integers(2005, 2018, n_trucks),
+    })
+
+
+def make_customers(n_customers=40_000, n_cities=2_000, seed=0):
+    rng = np.random.default_rng(seed + 1)
+    city_lat = rng.uniform(25, 48, n_cities).round(4)
+    city_lon = rng.uniform(-124, -68, n_cities).round(4)
+    city = rng.integers(0, n_cities, n_customers)
+    return pd.DataFrame({
+        "Customer ID": np.arange(1, n_customers + 1),
+        "City": np.char.add("City ", city.astype(str)),
+        "State": rng.choice(["KY", "OH", "WV", "OK", "IN", "DE", "WY"], n_customers),
+        "Latitude": city_lat[city],
+        "Longitude": city_lon[city],
+    })
+
+
+def make_drivers(n_drivers=32):
+    return pd.DataFrame({
+        "Driver ID": np.arange(1, n_drivers + 1),
+        "Driver": ["No Driver"] + [f"Driver {i}" for i in range(2, n_drivers + 1)],
+    })
+
+
+def make_costs(vehicles, months=20, seed=0):
+    """
+    One row per truck per month, like fCosts.xlsx.
+    """
+    rng = np.random.default_rng(seed + 2)
+    dates = pd.date_range(START_DATE, periods=months, freq="MS")
+    trucks = vehicles["Truck ID"].to_numpy()
+    n = len(dates) * len(trucks)
+    km = rng.integers(1_500, 8_000, n)
+    liters = (km / rng.uniform(2.5, 6, n)).round(2)
+    return pd.DataFrame({
+        "Date": np.repeat(dates, len(trucks)),
+        "Truck ID": np.tile(trucks, len(dates)),
+        "Drive ID": rng.integers(1, 32, n),
+        "KM Traveled": km,
+        "Liters": liters,
+        "Fuel": (liters * rng.uniform(2.8, 3.4, n)).round(2),
+        "Maintenance": rng.uniform(300, 1_800, n).round(2),
+        "Fixed Costs": rng.uniform(5_000, 20_000, n),
+    })
+
+
+def _comma_decimal(values):
+    return pd.Series(np.round(values, 2)).astype(str).str.replace(".", ",", regex=False).to_numpy()
+
+
+def make_freight(rows, vehicles, customers, days=600, seed=0):
+    """
+    `rows` freight rows in fFreight.csv's raw (string, comma decimal) format.
+    """
+    rng = np.random.default_rng(seed)
+    cust_idx = rng.integers(0, len(customers), rows)
+    truck_idx = rng.integers(0, len(vehicles), rows)
+    dates = START_DATE + pd.to_timedelta(np.sort(rng.integers(1, days, rows)), unit="D")
+    plates = vehicles["Plate"].to_numpy()[truck_idx]
+    return pd.DataFrame({
+        "Date": dates.strftime("%Y/%m/%d"),
+        "Customer ID": customers["Customer ID"].to_numpy()[cust_idx],
+        "Truck ID": vehicles["Truck ID"].to_numpy()[truck_idx],
+        "Invoice Number": 774_000 + np.arange(rows),
+        "Freight ID": np.char.add(np.char.add(dates.strftime("%d/%m/%Y").to_numpy().astype(str), ":"),
+                                  plates.astype(str)),
+        "City": customers["City"].to_numpy()[cust_idx],
+        "Net Revenue": _comma_decimal(rng.uniform(1, 20, rows)),
+        "Weight (Kg)": _comma_decimal(rng.uniform(0.5, 10, rows)),
+        "Weight (Cubic)": rng.integers(1, 10, rows),
+        "Goods Value": _comma_decimal(rng.uniform(50, 500, rows)),
+    })
+
+
+def write_costs_xlsx(costs, path):
+    """
+    Writes the cost sheet with fCosts.xlsx's layout: a blank row and a year row above the
+    header (read with header=2) and the header repeated where the second year starts.
+    """
+    costs = costs.astype(object)
+    split = int((costs["Date"] < START_DATE + pd.DateOffset(years=1)).sum())
+    blank = pd.DataFrame([[np.nan] * len(costs.columns)], columns=costs.columns)
+    year = blank.copy()
+    year.iloc[0, 0] = START_DATE.year + 1
+    header = pd.DataFrame([list(costs.columns)], columns=costs.columns)
+    body = pd.concat([costs.iloc[:split], blank, year, header, costs.iloc[split:]], ignore_index=True)
+
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        body.to_excel(writer, index=False, startrow=2)
+        writer.sheets["Sheet1"].cell(row=2, column=1, value=START_DATE.year)
+
+
+def generate_dataset(data_dir, freight_rows, n_trucks=30, n_customers=None, seed=0):
+    """
+    Writes DimensionTables.xlsx, fCosts.xlsx and fFreight.csv into data_dir.
+    Freight is generated and appended in chunks, so 10M rows need bounded memory.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    n_customers = n_customers or int(min(max(freight_rows // 2, 100), 40_000))
+    vehicles = make_vehicles(n_trucks, seed)
+    customers = make_customers(n_customers, max(n_customers // 20, 10), seed)
+
+    with pd.ExcelWriter(os.path.join(data_dir, "DimensionTables.xlsx"), engine="openpyxl") as writer:
+        make_drivers().to_excel(writer, sheet_name="Drivers", index=False)
+        vehicles.to_excel(writer, sheet_name="Vehicles", index=False)
+        customers.to_excel(writer, sheet_name="Customers", index=False)
+
+    write_costs_xlsx(make_costs(vehicles, seed=seed), os.path.join(data_dir, "fCosts.xlsx"))
+
+    freight_path = os.path.join(data_dir, "fFreight.csv")
+    for start in range(0, freight_rows, FREIGHT_CHUNK_ROWS):
+        rows = min(FREIGHT_CHUNK_ROWS, freight_rows - start)
+        chunk = make_freight(rows, vehicles, customers, seed=seed + start)
+        chunk["Invoice Number"] += start
+        chunk.to_csv(freight_path, index=False, mode="w" if start == 0 else "a", header=start == 0)
+    return data_dir
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic dataset with the real schema.")
+    parser.add_argument("data_dir")
+    parser.add_argument("--freight-rows", type=int, default=100_000)
+    parser.add_argument("--trucks", type=int, default=30)
+    parser.add_argument("--customers", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    generate_dataset(args.data_dir, args.freight_rows, args.trucks, args.customers, args.seed)
+    print(f"Wrote synthetic dataset to {args.data_dir}")
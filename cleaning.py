@@ -0,0 +1,137 @@
+# cleaning.py
+
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from config import (
+    DISTANCE_KM, LITERS, FUEL, MAINTENANCE, FIXED_COSTS,
+    NET_REVENUE, WEIGHT_KG, WEIGHT_CUBIC, GOODS_VALUE
+)
+
+# Target dtype and locale of a numeric column.
+# decimal: decimal separator used in the source ("," for "7,42")
+# thousands: grouping separator to strip ("," for "1,234")
+NumericSpec = namedtuple("NumericSpec", ["dtype", "decimal", "thousands"], defaults=[".", None])
+
+COST_SCHEMA = {
+    DISTANCE_KM: NumericSpec(int),
+    LITERS: NumericSpec(float),
+    FUEL: NumericSpec(float),
+    MAINTENANCE: NumericSpec(float),
+    FIXED_COSTS: NumericSpec(float),
+}
+
+# fFreight.csv uses "," as decimal separator, except Goods Value where it is stripped
+FREIGHT_SCHEMA = {
+    NET_REVENUE: NumericSpec(float, decimal=","),
+    WEIGHT_KG: NumericSpec(float, decimal=","),
+    WEIGHT_CUBIC: NumericSpec(float, decimal=","),
+    GOODS_VALUE: NumericSpec(float, thousands=","),
+}
+
+
+def _parse_text(s, spec):
+    """
+    Parses a string series in bulk with Arrow compute kernels, falling back to
+    pd.to_numeric when some values are not plain numbers. Unparseable values become NaN.
+    """
+    text = pa.array(s, from_pandas=True)
+    if spec.thousands:
+        text = pc.replace_substring(text, spec.thousands, "")
+    if spec.decimal != ".":
+        text = pc.replace_substring(text, spec.decimal, ".")
+    try:
+        values = pc.cast(text, pa.float64()).to_numpy(zero_copy_only=False)
+    except pa.ArrowInvalid:
+        values = pd.to_numeric(text.to_pandas(), errors="coerce").to_numpy()
+    return pd.Series(values, index=s.index, dtype=float)
+
+
+def numeric_values(s, spec):
+    """
+    Parses one column as numbers without filling anything in.
+    Returns (values, NaN where missing or unparseable; mask of the missing values).
+    """
+    if pd.api.types.is_bool_dtype(s):
+        # Matches the previous astype(str) behaviour: "True"/"False" are not numbers
+        return pd.Series(np.nan, index=s.index), s.isna()
+
+    if pd.api.types.is_numeric_dtype(s):
+        # Already numeric: no string round-trip needed
+        return s, s.isna()
+
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # Parse each distinct value once (compact.py), then expand by the codes
+        parsed, missing = numeric_values(pd.Series(s.cat.categories), spec)
+        codes = s.cat.codes.to_numpy()
+        values = np.append(parsed.to_numpy(dtype=float), np.nan)[codes]
+        text_nan = np.append(missing.to_numpy(), True)[codes]
+        return pd.Series(values, index=s.index), pd.Series(text_nan, index=s.index)
+
+    if pd.api.types.is_string_dtype(s) and s.dtype != object:
+        parsed = _parse_text(s, spec)
+        text_nan = s.isna() | (s == "nan")
+    else:
+        # Object columns (e.g. Excel sheets) mix numbers and text: parse the numbers
+        # directly and only stringify the leftovers. Booleans are not numbers, as in
+        # the bool branch above (to_numeric would read True as 1)
+        parsed = pd.to_numeric(s, errors="coerce")
+        bools = s.map(type).isin([bool, np.bool_])
+        if bools.any():
+            parsed = parsed.astype(float).mask(bools)
+        leftover = parsed.isna() & s.notna() & ~bools
+        text_nan = s.isna()
+        if leftover.any():
+            text = s[leftover].astype(str)
+            parsed = parsed.astype(float)
+            parsed[leftover] = _parse_text(text, spec)
+            text_nan[leftover] = text == "nan"
+    return parsed, text_nan
+
+
+def parse_numeric(s, spec):
+    """
+    Converts one column to spec.dtype, missing and unparseable values becoming 0.
+    Returns (values, number of non-missing values that could not be parsed).
+    """
+    parsed, missing = numeric_values(s, spec)
+    failed = int((parsed.isna() & ~missing).sum())
+    return parsed.fillna(0).astype(spec.dtype), failed
+
+
+def clean_numeric(df, schema):
+    """
+    Schema-driven replacement for per-column cleaning.
+    Columns missing from `df` are created as 0, like the previous clean_num helper.
+    Returns (cleaned copy of df, {column: number of coercion failures}).
+    """
+    # Shallow copy: columns are replaced, never modified in place
+    df = df.copy(deep=False)
+    failures = {}
+    for col, spec in schema.items():
+        if col not in df.columns:
+            df[col] = pd.Series(0, index=df.index)
+            failures[col] = 0
+            continue
+        df[col], failures[col] = parse_numeric(df[col], spec)
+    return df, failures
+
+
+def parse_dates(s):
+    """
+    pd.to_datetime with unparseable values as NaT, always as datetime64 values: a
+    categorical column (compact.py) is parsed once per distinct value, then expanded.
+    """
+    parsed = pd.to_datetime(s, errors="coerce")
+    if isinstance(parsed.dtype, pd.CategoricalDtype):
+        parsed = parsed.astype(parsed.cat.categories.dtype)
+    return parsed
+
+
+def report_failures(name, failures):
+    bad = {col: n for col, n in failures.items() if n}
+    if bad:
+        print(f"{name}: values coerced to 0 -> {bad}")
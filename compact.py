@@ -0,0 +1,125 @@
+# compact.py
+#
+# Memory-lean representation of the raw and preprocessed frames (the `lean=True` mode
+# of load_raw_data and preprocess_data). Conversions are lossless:
+#   - object columns holding only numbers or only datetimes (as Excel sheets are read)
+#     get the matching numeric or datetime64 dtype
+#   - integer columns are downcast to the smallest integer type holding their range
+#   - float columns holding only whole numbers become integers, others become float32
+#     when every value survives the round trip exactly
+#   - text columns for IDs, types, cities and dates (CATEGORY_COLS) become categoricals
+#     when their values repeat enough for the codes to be smaller than the text
+#   - text/object value columns of the raw cost and freight tables (`numbers`, e.g.
+#     cleaning.FREIGHT_SCHEMA) are parsed as cleaning.py would parse them, then
+#     compacted as above, when every present value is a number. A column holding any
+#     other text (e.g. fCosts' repeated header row) keeps it, since validation.py must
+#     still see and quarantine that row; such cost sheets are one row per truck and
+#     month, a small share of the total next to fFreight.
+# Smaller frames are also cheaper for st.cache_data to hash, pickle and copy.
+#
+# Usage: python compact.py [data_dir]   (prints memory before/after per frame)
+
+import numpy as np
+import pandas as pd
+
+from cleaning import numeric_values
+from config import VEHICLE_ID, CUSTOMER_ID, TRUCK_TYPE, DATE
+
+# Repeated labels worth storing once; numeric IDs are only downcast, since merging a
+# categorical key with a plain one would fall back to object columns
+CATEGORY_COLS = [VEHICLE_ID, CUSTOMER_ID, TRUCK_TYPE, 'Plate', 'City', 'State', 'Brand', 'Trailers Type', DATE,
+                 'Freight ID']
+# Largest share of distinct values for which a categorical is worth it
+CATEGORY_MAX_UNIQUE = 0.5
+
+
+def _compact_float(s):
+    values = s.to_numpy()
+    finite = values[np.isfinite(values)]
+    if len(finite) == len(values) and np.array_equal(finite, np.trunc(finite)):
+        return pd.to_numeric(s, downcast='integer')
+    as32 = values.astype(np.float32)
+    same = (as32.astype(np.float64) == values) | (np.isnan(values) & np.isnan(as32))
+    return s.astype(np.float32) if same.all() else s
+
+
+def _parse_numbers(s, spec):
+    """
+    s parsed with cleaning.numeric_values, or None if any present value isn't a number.
+    """
+    parsed, missing = numeric_values(s, spec)
+    if (parsed.isna() & ~missing).any():
+        return None
+    return pd.Series(parsed.to_numpy(dtype=np.float64), index=s.index, name=s.name)
+
+
+def compact_frame(df, categorical=CATEGORY_COLS, numbers=None):
+    """
+    Copy of df with the smallest lossless dtypes (see the module comment). Only text
+    columns named in `categorical` become categoricals, and only text columns in
+    `numbers` ({column: cleaning.NumericSpec}) are parsed; other columns keep their values.
+    """
+    numbers = numbers or {}
+    columns = {}
+    for col in df.columns:
+        s = df[col]
+        if s.dtype == object:
+            kind = pd.api.types.infer_dtype(s, skipna=True)
+            if kind in ("integer", "floating", "mixed-integer-float"):
+                s = pd.to_numeric(s)
+            elif kind == "datetime":
+                s = pd.to_datetime(s)
+        if col in numbers and not pd.api.types.is_numeric_dtype(s) and not pd.api.types.is_bool_dtype(s):
+            parsed = _parse_numbers(s, numbers[col])
+            if parsed is not None:
+                s = parsed
+        if pd.api.types.is_bool_dtype(s) or isinstance(s.dtype, pd.CategoricalDtype):
+            pass
+        elif pd.api.types.is_integer_dtype(s):
+            s = pd.to_numeric(s, downcast='integer')
+        elif pd.api.types.is_float_dtype(s):
+            s = _compact_float(s)
+        elif (col in categorical and pd.api.types.is_string_dtype(s)
+              and s.nunique() <= CATEGORY_MAX_UNIQUE * len(s)):
+            s = s.astype('category')
+        columns[col] = s
+    return pd.DataFrame(columns, index=df.index)
+
+
+def memory_mb(df):
+    """
+    Resident size of a frame in MB, including the strings it holds.
+    """
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def memory_report(before, after):
+    """
+    Table of MB before/after and the reduction for {name: frame} pairs with the same names.
+    """
+    report = pd.DataFrame({
+        'Rows': [len(before[name]) for name in before],
+        'Before (MB)': [memory_mb(before[name]) for name in before],
+        'After (MB)': [memory_mb(after[name]) for name in before],
+    }, index=list(before))
+    report.loc['Total'] = [np.nan, report['Before (MB)'].sum(), report['After (MB)'].sum()]
+    report['Reduction'] = report['Before (MB)'] / report['After (MB)']
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+
+    from data_loader import load_raw_data
+    from preprocessing import preprocess_data
+
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "data"
+    names = ['vehicles', 'customers', 'f_cost', 'f_freight', 'merged_log', 'city_stats']
+
+    raw = load_raw_data(data_dir)
+    before = dict(zip(names, raw + preprocess_data(*raw)))
+    lean = load_raw_data(data_dir, lean=True)
+    after = dict(zip(names, lean + preprocess_data(*lean, lean=True)))
+
+    pd.set_option('display.width', 120)
+    print(memory_report(before, after).round(3))
@@ -0,0 +1,339 @@
+# compiled_model.py
+#
+# Array-backed serving format for the trained pipeline. compile_pipeline() flattens the
+# fitted ColumnTransformer (one-hot + StandardScaler) and the forest's trees into plain
+# NumPy arrays; CompiledPipeline evaluates them without importing sklearn, and
+# load_compiled() memory-maps the arrays so worker startup is just a few mmaps.
+#
+#   data/model_compiled/CURRENT        name of the export being served
+#   data/model_compiled/v<n>/          one .npy per array plus meta.json
+
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+
+COMPILED_DIR = os.path.join("data", "model_compiled")
+FORMAT_VERSION = 2  # 2: NaN routing per node (missing_left)
+CURRENT_FILE = "CURRENT"
+SMALL_FRAME_ROWS = 64
+
+_ARRAYS = ["cat_offsets", "num_mean", "num_scale",
+           "left", "right", "feature", "threshold", "missing_left", "value", "roots", "coef"]
+
+
+def _compile_preprocessor(preprocessor):
+    """
+    Extracts the one-hot categories and scaler parameters, in output column order.
+    """
+    meta = {"categorical": [], "categories": [], "numerical": []}
+    num_mean, num_scale = [], []
+    for name, transformer, columns in preprocessor.transformers_:
+        if name == "remainder" or transformer == "drop":
+            continue
+        kind = type(transformer).__name__
+        if kind == "OneHotEncoder":
+            if transformer.drop is not None or transformer.handle_unknown != "ignore":
+                raise TypeError("Only OneHotEncoder(handle_unknown='ignore') without drop can be compiled")
+            if meta["numerical"]:
+                raise TypeError("Categorical columns must come before numerical ones")
+            meta["categorical"].extend(columns)
+            meta["categories"].extend([list(map(str, c)) for c in transformer.categories_])
+        elif kind == "StandardScaler":
+            meta["numerical"].extend(columns)
+            n = len(columns)
+            num_mean.append(transformer.mean_ if transformer.with_mean else np.zeros(n))
+            num_scale.append(transformer.scale_ if transformer.with_std else np.ones(n))
+        else:
+            raise TypeError(f"Cannot compile transformer {kind}")
+
+    sizes = [len(c) for c in meta["categories"]]
+    arrays = {
+        "cat_offsets": np.cumsum([0] + sizes).astype(np.int64),
+        "num_mean": np.concatenate(num_mean) if num_mean else np.empty(0),
+        "num_scale": np.concatenate(num_scale) if num_scale else np.empty(0),
+    }
+    return meta, arrays
+
+
+def _compile_forest(model):
+    """
+    Concatenates all trees into global node arrays. Leaves point to themselves.
+    """
+    left, right, feature, threshold, missing_left, value, roots = [], [], [], [], [], [], []
+    offset = 0
+    for tree in (est.tree_ for est in model.estimators_):
+        n = tree.node_count
+        ids = np.arange(n) + offset
+        is_leaf = tree.children_left < 0
+        left.append(np.where(is_leaf, ids, tree.children_left + offset))
+        right.append(np.where(is_leaf, ids, tree.children_right + offset))
+        feature.append(np.where(is_leaf, -1, tree.feature))
+        threshold.append(tree.threshold)
+        # Where sklearn sends NaN at each split (trees fitted before sklearn 1.3: right)
+        missing_left.append(np.where(is_leaf, 0, getattr(tree, "missing_go_to_left", np.zeros(n))))
+        value.append(tree.value[:, 0, 0])
+        roots.append(offset)
+        offset += n
+
+    max_depth = max(est.tree_.max_depth for est in model.estimators_)
+    arrays = {
+        "left": np.concatenate(left).astype(np.int32),
+        "right": np.concatenate(right).astype(np.int32),
+        "feature": np.concatenate(feature).astype(np.int32),
+        "threshold": np.concatenate(threshold).astype(np.float64),
+        "missing_left": np.concatenate(missing_left).astype(bool),
+        "value": np.concatenate(value).astype(np.float64),
+        "roots": np.array(roots, dtype=np.int32),
+    }
+    return {"kind": "forest", "max_depth": int(max_depth)}, arrays
+
+
+def compile_pipeline(pipeline):
+    """
+    Returns (meta, arrays) for a fitted Pipeline(preprocessor, model).
+    Supported models: random forest / extra trees regressors and linear regressors.
+    """
+    meta, arrays = _compile_preprocessor(pipeline.named_steps["preprocessor"])
+    model = pipeline.named_steps["model"]
+
+    if hasattr(model, "estimators_") and hasattr(model.estimators_[0], "tree_"):
+        model_meta, model_arrays = _compile_forest(model)
+    elif hasattr(model, "coef_") and np.ndim(model.coef_) == 1:
+        model_meta = {"kind": "linear", "intercept": float(model.intercept_)}
+        model_arrays = {"coef": np.asarray(model.coef_, dtype=np.float64)}
+    else:
+        raise TypeError(f"Cannot compile model {type(model).__name__}")
+
+    meta.update(model_meta)
+    meta["format_version"] = FORMAT_VERSION
+    arrays.update(model_arrays)
+    return meta, arrays
+
+
+class CompiledPipeline:
+    """
+    Drop-in for the sklearn pipeline's predict() on a DataFrame.
+    """
+
+    def __init__(self, meta, arrays):
+        self.meta = meta
+        self.arrays = arrays
+        self.feature_names = meta["categorical"] + meta["numerical"]
+        self._lookups = [{c: i for i, c in enumerate(cats)} for cats in meta["categories"]]
+
+    def _columns(self, df):
+        """
+        Returns ([categorical value arrays], numerical float matrix) from df.
+        """
+        cat_cols, num_cols = self.meta["categorical"], self.meta["numerical"]
+        if len(df) <= SMALL_FRAME_ROWS:
+            # For a handful of rows one object array beats per-column access by ~10x
+            values = df.to_numpy()
+            positions = df.columns.get_indexer(cat_cols + num_cols)
+            if (positions < 0).any():
+                missing = [c for c, p in zip(cat_cols + num_cols, positions) if p < 0]
+                raise KeyError(f"Missing model features: {missing}")
+            cats = [values[:, p] for p in positions[:len(cat_cols)]]
+            num = values[:, positions[len(cat_cols):]].astype(np.float64)
+            return cats, num
+        cats = [df[col].to_numpy() for col in cat_cols]
+        num = df[num_cols].to_numpy(dtype=np.float64)
+        return cats, num
+
+    def transform(self, df):
+        """
+        Same matrix as the fitted ColumnTransformer: one-hot columns then scaled numbers.
+        """
+        a = self.arrays
+        cats, num = self._columns(df)
+        offsets = a["cat_offsets"]
+        X = np.zeros((len(df), offsets[-1] + num.shape[1]))
+
+        rows = np.arange(len(df))
+        for values, lookup, start in zip(cats, self._lookups, offsets):
+            codes = np.array([lookup.get(str(v), -1) for v in values], dtype=np.int64)
+            known = codes >= 0
+            X[rows[known], start + codes[known]] = 1.0
+
+        if num.shape[1]:
+            X[:, offsets[-1]:] = (num - a["num_mean"]) / a["num_scale"]
+        return X
+
+    def predict(self, df):
+        X = self.transform(df)
+        if self.meta["kind"] == "linear":
+            return X @ self.arrays["coef"] + self.meta["intercept"]
+        return self._predict_forest(X)
+
+    def _predict_forest(self, X):
+        a = self.arrays
+        # sklearn's trees compare float32 inputs against float64 thresholds
+        X = X.astype(np.float32).astype(np.float64)
+        left, right, feature, threshold = a["left"], a["right"], a["feature"], a["threshold"]
+        missing_left = a["missing_left"]
+
+        nodes = np.broadcast_to(np.asarray(a["roots"]), (len(X), len(a["roots"]))).copy()
+        rows = np.arange(len(X))[:, None]
+        for _ in range(self.meta["max_depth"]):
+            feat = feature[nodes]
+            active = feat >= 0
+            if not active.any():
+                break
+            x = X[rows, np.maximum(feat, 0)]
+            go_left = (x <= threshold[nodes]) | (np.isnan(x) & missing_left[nodes])
+            nodes = np.where(go_left, left[nodes], right[nodes])
+        return a["value"][nodes].mean(axis=1)
+
+
+def current_dir(path=COMPILED_DIR):
+    """
+    Directory of the export CURRENT points to (path itself for exports written before
+    versioned directories).
+    """
+    try:
+        with open(os.path.join(path, CURRENT_FILE)) as f:
+            return os.path.join(path, f.read().strip())
+    except FileNotFoundError:
+        return path
+
+
+def save_compiled(meta, arrays, path=COMPILED_DIR):
+    """
+    Writes one .npy per array (so each can be memory-mapped) plus meta.json into a new
+    version directory, then swaps CURRENT to it with os.replace: readers and crashes
+    see either the old model or the new one, never none or half of one.
+    """
+    version = f"v{time.time_ns()}"
+    tmp = os.path.join(path, version + ".tmp")
+    os.makedirs(tmp)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(array))
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    os.rename(tmp, os.path.join(path, version))
+
+    pointer = os.path.join(path, CURRENT_FILE + ".tmp")
+    with open(pointer, "w") as f:
+        f.write(version)
+    os.replace(pointer, os.path.join(path, CURRENT_FILE))
+
+    # Previous exports; workers still mapping their arrays keep them until they reload
+    for entry in os.listdir(path):
+        if entry not in (version, CURRENT_FILE):
+            entry_path = os.path.join(path, entry)
+            if os.path.isdir(entry_path):
+                shutil.rmtree(entry_path, ignore_errors=True)
+            else:
+                os.remove(entry_path)
+
+
+def load_compiled(path=COMPILED_DIR):
+    path = current_dir(path)
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    if meta.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported compiled model format {meta.get('format_version')}")
+    arrays = {}
+    for name in _ARRAYS:
+        array_path = os.path.join(path, f"{name}.npy")
+        if os.path.exists(array_path):
+            # Plain ndarray view over the mapping (np.memmap adds per-operation overhead)
+            arrays[name] = np.asarray(np.load(array_path, mmap_mode="r"))
+    return CompiledPipeline(meta, arrays)
+
+
+def retire_compiled(path, source_path):
+    """
+    Removes the CURRENT pointer of `path` and the export it names if that export was
+    compiled from source_path (same fingerprint). Returns whether it did.
+    """
+    from ingest import file_fingerprint
+
+    version_dir = current_dir(path)
+    try:
+        with open(os.path.join(version_dir, "meta.json")) as f:
+            source = json.load(f).get("source_sha256")
+    except (OSError, ValueError):
+        return False
+    if version_dir == path or source != file_fingerprint(source_path)["sha256"]:
+        return False
+    os.remove(os.path.join(path, CURRENT_FILE))
+    shutil.rmtree(version_dir, ignore_errors=True)
+    return True
+
+
+def verify_parity(pipeline, compiled, X, rtol=1e-9, atol=1e-6):
+    """
+    Raises ValueError if the compiled model disagrees with sklearn on X.
+    """
+    expected = pipeline.predict(X)
+    actual = compiled.predict(X)
+    if not np.allclose(actual, expected, rtol=rtol, atol=atol):
+        worst = np.max(np.abs(actual - expected))
+        raise ValueError(f"Compiled model differs from sklearn pipeline (max abs diff {worst})")
+    return float(np.max(np.abs(actual - expected))) if len(X) else 0.0
+
+
+def export_compiled(pipeline, X, path=COMPILED_DIR, source_path=None):
+    """
+    Compiles `pipeline`, checks it against sklearn on X and saves it.
+    source_path (the pickle it was compiled from) is fingerprinted so loaders can tell
+    whether the export still matches it. For models that can't be compiled, an export
+    of that same pickle is retired (see retire_compiled); other exports in `path` stay.
+    """
+    try:
+        meta, arrays = compile_pipeline(pipeline)
+    except TypeError as e:
+        print(f"Skipping compiled export: {e}")
+        if source_path:
+            retire_compiled(path, source_path)
+        return None
+    compiled = CompiledPipeline(meta, arrays)
+    diff = verify_parity(pipeline, compiled, X)
+    if source_path:
+        from ingest import file_fingerprint
+        meta["source_sha256"] = file_fingerprint(source_path)["sha256"]
+    save_compiled(meta, arrays, path)
+    print(f"Compiled model saved to {path} (max abs diff vs sklearn: {diff:.2e})")
+    return compiled
+
+
+def parity_sample(compiled, n=2000, seed=0):
+    """
+    Random model inputs around the scaler means (plus an unknown category), for
+    checking a pipeline when the training data isn't at hand. The last rows hold edge
+    cases: missing values, an unseen category and all-zero features.
+    """
+    rng = np.random.default_rng(seed)
+    a, meta = compiled.arrays, compiled.meta
+    data = {}
+    for col, cats in zip(meta["categorical"], meta["categories"]):
+        data[col] = rng.choice(cats + ["Unknown"], n)
+    for i, col in enumerate(meta["numerical"]):
+        data[col] = a["num_mean"][i] + a["num_scale"][i] * rng.normal(0, 1.5, n)
+    sample = pd.DataFrame(data)
+
+    edges = sample.iloc[:len(meta["numerical"]) + 2].copy().reset_index(drop=True)
+    for i, col in enumerate(meta["numerical"]):
+        edges.loc[i, col] = np.nan
+    edges.loc[len(meta["numerical"]), meta["categorical"]] = "Never seen"
+    edges.loc[len(meta["numerical"]) + 1, meta["numerical"]] = 0.0
+    return pd.concat([sample, edges], ignore_index=True)
+
+
+if __name__ == "__main__":
+    import argparse
+    import joblib
+
+    parser = argparse.ArgumentParser(description="Compile a pickled pipeline into the array format.")
+    parser.add_argument("pickle", nargs="?", default=os.path.join("data", "model_pipeline.pkl"))
+    parser.add_argument("-o", "--output", default=COMPILED_DIR)
+    args = parser.parse_args()
+
+    pipeline = joblib.load(args.pickle)
+    sample = parity_sample(CompiledPipeline(*compile_pipeline(pipeline)))
+    export_compiled(pipeline, sample, args.output, source_path=args.pickle)
@@ -1,37 +1,110 @@
 # data_loader.py
 
+import os
+import re
 import pandas as pd
 import streamlit as st
+from ingest import dataset_version, format_report, read_sources
+from instrumentation import cached
+from compact import compact_frame
+from cleaning import COST_SCHEMA, FREIGHT_SCHEMA
 
-@st.cache_data
-def load_raw_data():
+# Columns read from each source; anything else in the files is skipped
+VEHICLE_COLS = ['Truck ID', 'Plate', 'Brand', 'Truck Type', 'Trailers Type', 'Year']
+CUSTOMER_COLS = ['Customer ID', 'City', 'State', 'Latitude', 'Longitude']
+COST_COLS = ['Date', 'Truck ID', 'Drive ID', 'KM Traveled', 'Liters', 'Fuel', 'Maintenance', 'Fixed Costs']
+FREIGHT_COLS = ['Date', 'Customer ID', 'Truck ID', 'Invoice Number', 'Freight ID', 'City',
+                'Net Revenue', 'Weight (Kg)', 'Weight (Cubic)', 'Goods Value']
+
+# fCosts.xlsx and monthly workbooks like fCosts_2024-01.xlsx; other names (backups,
+# copies) are never stacked
+COST_FILE_PATTERN = re.compile(r"fCosts(_\d{4}-\d{2})?\.xlsx")
+
+def cost_paths(data_dir="data"):
     """
-    Loads all raw datasets used in the Colab notebook.
+    Cost workbooks in data_dir matching COST_FILE_PATTERN, in name order.
+    """
+    names = os.listdir(data_dir) if os.path.isdir(data_dir) else []
+    paths = sorted(os.path.join(data_dir, name) for name in names if COST_FILE_PATTERN.fullmatch(name))
+    return paths or [os.path.join(data_dir, "fCosts.xlsx")]
+
+def source_paths(data_dir="data"):
+    """
+    Raw files load_raw_data reads, e.g. for fingerprinting the dataset.
     """
+    return [
+        os.path.join(data_dir, "DimensionTables.xlsx"),
+        *cost_paths(data_dir),
+        os.path.join(data_dir, "fFreight.csv"),
+    ]
 
-    # Dimension tables
-    dimension_tables = pd.read_excel(
-        "data/DimensionTables.xlsx"
-    )
+def raw_tables(data_dir="data"):
+    """
+    (path, reader, read arguments) of every table load_raw_data reads, in order:
+    Vehicles, Customers, one entry per cost workbook, fFreight.
+    """
+    dimensions = os.path.join(data_dir, "DimensionTables.xlsx")
+    return [
+        (dimensions, "excel", {"sheet_name": "Vehicles", "usecols": VEHICLE_COLS}),
+        (dimensions, "excel", {"sheet_name": "Customers", "usecols": CUSTOMER_COLS}),
+        *[(path, "excel", {"header": 2, "usecols": COST_COLS}) for path in cost_paths(data_dir)],
+        (os.path.join(data_dir, "fFreight.csv"), "csv", {"usecols": FREIGHT_COLS}),
+    ]
+
+def data_version(data_dir="data"):
+    """
+    Short hash of the raw files' contents (a few stats once they have been hashed).
+    """
+    return dataset_version(source_paths(data_dir))
 
-    vehicles = pd.read_excel(
-        "data/DimensionTables.xlsx",
-        sheet_name="Vehicles"
-    )
+def check_columns(report):
+    """
+    Raises ValueError if read_sources' report lists columns missing from any source.
+    """
+    # A column missing from one workbook would be NaN-filled by the concat and then
+    # cleaned to 0, so refuse to load instead
+    missing = [f"{row['source']}: {', '.join(row['missing'])}" for row in report if row["missing"]]
+    if missing:
+        raise ValueError("Raw sources are missing columns: " + "; ".join(missing))
 
-    customers = pd.read_excel(
-        "data/DimensionTables.xlsx",
-        sheet_name="Customers"
-    )
+def stack_costs(costs):
+    """
+    One fCosts frame from the cost workbooks' frames, stacked in file name order.
+    """
+    return costs[0] if len(costs) == 1 else pd.concat(costs, ignore_index=True)
 
-    # Cost & freight data
-    f_cost = pd.read_excel(
-        "data/fCosts.xlsx",
-        header=2
-    )
+@cached(st.cache_data, "load_raw_data")
+def load_raw_data(data_dir="data", lean=False, max_workers=None):
+    """
+    Loads all raw datasets used in the Colab notebook.
+    Sources are parsed once and then served from the columnar cache in data/.cache;
+    stale ones are parsed together (see ingest.read_sources), with up to max_workers
+    processes. With lean, the frames use compact dtypes (see compact.py). Raises
+    ValueError if a source lacks any of the columns read from it.
+    """
+    frames, report = read_sources(raw_tables(data_dir), max_workers)
+    if any(row["parsed"] for row in report):
+        print("Parsed raw sources:")
+        print(format_report(report))
+    check_columns(report)
 
-    f_freight = pd.read_csv(
-        "data/fFreight.csv"
-    )
+    vehicles, customers, *costs, f_freight = frames
+    f_cost = stack_costs(costs)
 
+    if lean:
+        return (compact_frame(vehicles), compact_frame(customers),
+                compact_frame(f_cost, numbers=COST_SCHEMA), compact_frame(f_freight, numbers=FREIGHT_SCHEMA))
     return vehicles, customers, f_cost, f_freight
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load the raw sources and report timings per file.")
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: one per CPU)")
+    parser.add_argument("--refresh", action="store_true", help="reparse every source, ignoring the cache")
+    args = parser.parse_args()
+
+    frames, report = read_sources(raw_tables(args.data_dir), args.workers, refresh=args.refresh)
+    print(format_report(report))
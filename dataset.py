@@ -0,0 +1,54 @@
+# dataset.py
+#
+# The dataset the app serves: validated lean raw frames, preprocess_data's outputs and
+# the stats cube, built once per version and shared between workers (shared_cache.py).
+#
+# The version covers the raw files, the validation rules and the source of every
+# module the frames are computed by, so a code change is never served from frames
+# another version of the code published. Everything published under it (e.g. the
+# fact tables) must use version() so shared_cache keeps one generation per name.
+
+from data_loader import load_raw_data, data_version
+from ingest import source_version
+from periods import aggregate_periods, period_source
+from preprocessing import preprocess_data
+from stats_cube import build_cube
+from validation import validate, write_quarantine, format_summary, rules_version
+
+RAW_FRAMES = ["vehicles", "customers", "f_cost", "f_freight"]
+# Modules whose code determines frames published under version() (and how they are stored)
+DATASET_MODULES = ["dataset", "config", "ingest", "data_loader", "compact", "validation", "cleaning",
+                   "preprocessing", "periods", "stats_cube", "fact_table", "shared_cache"]
+
+
+def version(data_dir="data"):
+    """
+    Short string identifying the dataset: raw files, validation rules and code.
+    """
+    return f"{data_version(data_dir)}-{rules_version()}-{source_version(DATASET_MODULES)}"
+
+
+def validated_raw():
+    """
+    Validated lean raw frames (vehicles, customers, f_cost, f_freight). Rejected rows
+    go to data/quarantine.csv. Returns validation.ValidationResult.
+    """
+    checked = validate(*load_raw_data(lean=True))
+    write_quarantine(checked)
+    print(format_summary(checked))
+    return checked
+
+
+def build_dataset():
+    """
+    Validated lean raw frames, preprocess_data's outputs, the stats cube and the
+    validation summary, as named frames.
+    """
+    checked = validated_raw()
+    raw = checked.frames
+    vehicles, customers, f_cost, f_freight = raw
+    df, city_stats = preprocess_data(*raw, lean=True)
+    cube = build_cube(df, aggregate_periods(period_source(vehicles, f_cost, f_freight), "month"))
+    return {**dict(zip(RAW_FRAMES, raw)), "merged_log": df, "city_stats": city_stats,
+            **{f"stats.{level}": frame for level, frame in cube.items()},
+            "validation.summary": checked.summary, "validation.reasons": checked.reasons}
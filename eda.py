@@ -1,17 +1,35 @@
 # eda.py
 
+import numpy as np
 import matplotlib.pyplot as plt
-import seaborn as sns
+from matplotlib import cbook, colormaps
+from matplotlib.colors import LogNorm
 from config import TRUCK_TYPE, COST_PER_KM
+from instrumentation import timed
+from geo import density_grid
 
-def plot_truck_type_analysis_bar(df):
+COST_PER_KM_COLS = ['Costs per KM', 'Maintenance per KM', 'Fuel costs per KM', 'Fixed costs per KM']
+
+def palette(name, n):
+    """
+    n colors evenly sampled from a matplotlib colormap, excluding its ends: the same
+    colors as sns.color_palette(name, n), without importing seaborn (and scipy).
+    """
+    return colormaps[name](np.linspace(0, 1, n + 2)[1:-1])[:, :3]
+
+@timed()
+def plot_truck_type_analysis_bar(df, means=None):
     """
     Plots a bar chart of mean costs (Cost, Maintenance, Fuel, Fixed) per KM by Truck Type.
     Corresponds to user's: truck_type_analysis.plot(kind = 'bar')
+    `means` (per truck type means, e.g. from stats_cube) skips the groupby over df.
     """
-    cols = ['Costs per KM', 'Maintenance per KM', 'Fuel costs per KM', 'Fixed costs per KM']
+    cols = COST_PER_KM_COLS
     # Group by Truck Type and mean
-    truck_type_analysis = df.groupby(TRUCK_TYPE)[cols].mean()
+    if means is not None:
+        truck_type_analysis = means[cols]
+    else:
+        truck_type_analysis = df.groupby(TRUCK_TYPE, observed=True)[cols].mean()
     
     fig, ax = plt.subplots(figsize=(10, 6))
     truck_type_analysis.plot(kind='bar', ax=ax)
@@ -20,26 +38,36 @@ def plot_truck_type_analysis_bar(df):
     ax.tick_params(axis='x', rotation=45)
     return fig
 
+def box_stats(df, by=TRUCK_TYPE, column=COST_PER_KM):
+    """
+    Box plot summaries (quartiles, 1.5 IQR whiskers, fliers) of `column` per `by` group,
+    in the format matplotlib's Axes.bxp draws.
+    """
+    stats = []
+    for label, values in df.groupby(by, observed=True)[column]:
+        stats.extend(cbook.boxplot_stats(values.dropna().to_numpy(), labels=[label]))
+    return stats
+
+@timed()
 def plot_costs_per_km_boxplot(df):
     """
     Plots a boxplot of Costs per KM by Truck Type.
     Corresponds to user's: sns.boxplot(..., x='Truck Type', y='Costs per KM', ...)
+    Drawn from box_stats with the same coolwarm palette.
     """
+    stats = box_stats(df)
     fig, ax = plt.subplots(figsize=(10, 6))
-    sns.boxplot(
-        data=df, 
-        x=TRUCK_TYPE, 
-        y=COST_PER_KM, 
-        palette='coolwarm', 
-        hue=TRUCK_TYPE, 
-        ax=ax
-    )
+    boxes = ax.bxp(stats, patch_artist=True, widths=0.8,
+                   medianprops={'color': 'black'}, flierprops={'marker': 'o', 'markersize': 5})
+    for patch, color in zip(boxes['boxes'], palette('coolwarm', len(stats))):
+        patch.set_facecolor(color)
     # User's Title: 'Costs per KM by Truck Type'
     ax.set_title('Costs per KM by Truck Type', fontsize=16)
     ax.set_xlabel('Truck Type', fontsize=12)
     ax.set_ylabel('Costs per KM', fontsize=12)
     return fig
 
+@timed()
 def plot_top_10_cities(city_stats):
     """
     Plots a barplot of Top 10 Cities by Goods Value.
@@ -58,39 +86,39 @@ def plot_top_10_cities(city_stats):
     # We follow user logic:
     top_10 = city_stats[['City', 'Goods Value']].sort_values(by='Goods Value', ascending=False).head(10)
     
+    # Drawn like the user's seaborn barplot (one coolwarm color per city) with plain
+    # matplotlib, so the page never has to import seaborn
     fig, ax = plt.subplots(figsize=(10, 6))
-    sns.barplot(
-        data=top_10, 
-        x='City', 
-        y='Goods Value', 
-        palette='coolwarm', 
-        hue='City', 
-        ax=ax
-    )
+    ax.bar(top_10['City'].astype(str).to_numpy(), top_10['Goods Value'].to_numpy(),
+           width=0.8, color=palette('coolwarm', len(top_10)))
     ax.set_title('Top 10 Cities by Total Goods Value', fontsize=16)
     ax.set_xlabel('City', fontsize=12)
     ax.set_ylabel('Total Goods Value', fontsize=12)
     ax.tick_params(axis='x', rotation=45)
     return fig
 
-def plot_geo_distribution(city_stats):
+@timed()
+def plot_geo_distribution(city_stats, bins=60):
     """
-    Plots a scatter plot of geographic distribution.
-    Corresponds to user's: plt.scatter(..., 'Longitude', 'Latitude', ...)
+    Plots the geographic density of customers.
+    Replaces the user's plt.scatter(..., 'Longitude', 'Latitude', ...): points are binned
+    into a bins x bins grid (weighted by customers per city when known), so the chart
+    costs the same for ten or ten thousand locations.
     """
     if city_stats.empty or 'Latitude' not in city_stats.columns:
         fig, ax = plt.subplots()
         ax.text(0.5, 0.5, "No Geo Data Available")
         return fig
 
-    fig, ax = plt.subplots(figsize=(10, 6))
-    ax.scatter(
-        city_stats['Longitude'], 
-        city_stats['Latitude'], 
-        alpha=0.6, 
-        color='teal', 
-        edgecolor='black'
+    weights = city_stats['Customer ID'] if 'Customer ID' in city_stats.columns else None
+    counts, lat_edges, lon_edges = density_grid(
+        city_stats['Latitude'], city_stats['Longitude'], weights, bins=bins
     )
+
+    fig, ax = plt.subplots(figsize=(10, 6))
+    mesh = ax.pcolormesh(lon_edges, lat_edges, np.ma.masked_equal(counts, 0),
+                         cmap='viridis', norm=LogNorm())
+    fig.colorbar(mesh, ax=ax, label='Customers' if weights is not None else 'Locations')
     ax.set_title('Geographic Distribution of Customers', fontsize=16)
     ax.set_xlabel('Longitude', fontsize=12)
     ax.set_ylabel('Latitude', fontsize=12)
@@ -0,0 +1,160 @@
+# fact_table.py
+#
+# Denormalized, sorted fact tables for drill-downs, built once per dataset version:
+#
+#   freight   cleaned fFreight rows joined with all Vehicles and Customers attributes
+#   costs     cleaned fCosts rows joined with all Vehicles attributes
+#
+# Both are sorted by (Truck ID, Date), so a truck's rows are one contiguous block and
+# a date range inside it is a second binary search. Secondary indexes hold row
+# positions sorted by (Customer ID, Date) and by Date. Every lookup is a range scan
+# (searchsorted) returning a slice or a gather, never a filter over the whole table.
+# Tables and indexes are persisted and shared between workers with shared_cache.
+
+import numpy as np
+import pandas as pd
+
+from config import VEHICLE_ID, CUSTOMER_ID, DATE
+from preprocessing import clean_costs, clean_freight, join_costs, join_freight
+from shared_cache import shared_frames
+
+ROW = "Row"
+
+
+def _sort_facts(df):
+    return df.sort_values([VEHICLE_ID, DATE], kind="stable", na_position="last").reset_index(drop=True)
+
+
+def _position_index(df, keys):
+    """
+    Row positions of df ordered by `keys` (the last key varies fastest), with the key values.
+    """
+    order = np.lexsort([df[key].to_numpy() for key in reversed(keys)])
+    index = pd.DataFrame({key: df[key].to_numpy()[order] for key in keys})
+    index[ROW] = order.astype(np.int64)
+    return index
+
+
+def build_facts(vehicles, customers, f_cost, f_freight):
+    """
+    {name: frame} of the fact tables and their indexes (see the module comment).
+    """
+    freight = _sort_facts(join_freight(clean_freight(f_freight.copy()), vehicles, customers))
+    costs = clean_costs(f_cost.copy())
+    # Excel truck IDs may be stored as text; joins and ordering need numbers
+    costs[VEHICLE_ID] = pd.to_numeric(costs[VEHICLE_ID], errors="coerce")
+    costs = _sort_facts(join_costs(costs, vehicles))
+    return {
+        "freight": freight,
+        "costs": costs,
+        "freight_by_customer": _position_index(freight, [CUSTOMER_ID, DATE]),
+        "freight_by_date": _position_index(freight, [DATE]),
+        "costs_by_date": _position_index(costs, [DATE]),
+    }
+
+
+def _bounds(values, low, high, lo=0, hi=None):
+    """
+    Slice [lo', hi') of the sorted values[lo:hi] within [low, high]; None is unbounded.
+    """
+    hi = len(values) if hi is None else hi
+    if low is not None:
+        lo = lo + np.searchsorted(values[lo:hi], low, side="left")
+    if high is not None:
+        hi = lo + np.searchsorted(values[lo:hi], high, side="right")
+    return lo, max(lo, hi)
+
+
+def _day(value):
+    return None if value is None else np.datetime64(pd.Timestamp(value), "ns")
+
+
+class FactTable:
+    """
+    Range lookups over the fact tables. Date bounds are inclusive and may be None;
+    results are in date order.
+    """
+
+    def __init__(self, frames):
+        self.freight = frames["freight"]
+        self.costs = frames["costs"]
+        self._indexes = {name: frames[name] for name in ("freight_by_customer", "freight_by_date", "costs_by_date")}
+        self._columns = {}
+
+    def _array(self, table, column):
+        # Sorted key columns as NumPy arrays, converted once
+        key = (table, column)
+        if key not in self._columns:
+            frame = getattr(self, table) if table in ("freight", "costs") else self._indexes[table]
+            values = frame[column]
+            self._columns[key] = (values.to_numpy(dtype="datetime64[ns]") if column == DATE
+                                  else values.to_numpy(dtype=np.float64))
+        return self._columns[key]
+
+    def _truck_rows(self, table, truck_id, start, end):
+        lo, hi = _bounds(self._array(table, VEHICLE_ID), truck_id, truck_id)
+        lo, hi = _bounds(self._array(table, DATE), _day(start), _day(end), lo, hi)
+        return getattr(self, table).iloc[lo:hi]
+
+    def _indexed_rows(self, table, index, key, key_value, start, end):
+        lo, hi = 0, None
+        if key is not None:
+            lo, hi = _bounds(self._array(index, key), key_value, key_value)
+        lo, hi = _bounds(self._array(index, DATE), _day(start), _day(end), lo, hi)
+        return getattr(self, table).iloc[self._indexes[index][ROW].to_numpy()[lo:hi]]
+
+    def trips(self, truck_id, start=None, end=None):
+        """
+        Freight rows of one truck, e.g. trips(7, "2019-05-01", "2019-05-31").
+        """
+        return self._truck_rows("freight", truck_id, start, end)
+
+    def truck_costs(self, truck_id, start=None, end=None):
+        """
+        Cost rows of one truck.
+        """
+        return self._truck_rows("costs", truck_id, start, end)
+
+    def customer_freight(self, customer_id, start=None, end=None):
+        """
+        Freight rows delivered to one customer.
+        """
+        return self._indexed_rows("freight", "freight_by_customer", CUSTOMER_ID, customer_id, start, end)
+
+    def freight_between(self, start=None, end=None):
+        return self._indexed_rows("freight", "freight_by_date", None, None, start, end)
+
+    def costs_between(self, start=None, end=None):
+        return self._indexed_rows("costs", "costs_by_date", None, None, start, end)
+
+
+def load_facts(version, raw):
+    """
+    FactTable for a dataset version (dataset.version()), built from the validated
+    raw = (vehicles, customers, f_cost, f_freight) by the first process to ask and
+    memory-mapped by the rest.
+    """
+    return FactTable(shared_frames("facts", version, lambda: build_facts(*raw)))
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from dataset import RAW_FRAMES, build_dataset, version
+
+    # The app's version and validated frames, so both publish the same fact tables
+    # (shared_cache keeps only one version per name)
+    dataset_version = version()
+    frames = shared_frames("dataset", dataset_version, build_dataset)
+    raw = tuple(frames[name] for name in RAW_FRAMES)
+    start = time.perf_counter()
+    facts = load_facts(dataset_version, raw)
+    print(f"Fact tables ready in {time.perf_counter() - start:.2f}s: "
+          f"{len(facts.freight):,} freight rows, {len(facts.costs):,} cost rows")
+
+    truck = facts.freight[VEHICLE_ID].iloc[0] if len(sys.argv) < 2 else float(sys.argv[1])
+    start = time.perf_counter()
+    trips = facts.trips(truck)
+    print(f"Truck {truck:g}: {len(trips):,} trips, {len(facts.truck_costs(truck)):,} cost rows "
+          f"({(time.perf_counter() - start) * 1000:.2f} ms)")
@@ -0,0 +1,78 @@
+# figure_cache.py
+#
+# LRU cache of rendered figures (PNG bytes). Keys include the dataset version and the
+# plot parameters, so a new dataset or different parameters never serve a stale image,
+# and old entries simply age out.
+
+import collections
+import io
+import threading
+
+MAX_ENTRIES = 64
+MAX_BYTES = 64 * 2**20
+DPI = 100
+
+
+def render_png(fig, dpi=DPI):
+    """
+    Rasterizes and closes a matplotlib figure.
+    """
+    # Imported here so importing this module (e.g. on the Prediction page) stays cheap;
+    # pyplot is already loaded by whoever drew `fig`
+    import matplotlib.pyplot as plt
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", dpi=dpi, bbox_inches="tight")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def figure_key(version, name, **params):
+    return (version, name) + tuple(sorted(params.items()))
+
+
+class FigureCache:
+    """
+    Thread-safe LRU of rendered figures bounded by entry count and total bytes.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES, max_bytes=MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key))
+            self._entries[key] = data
+            self._bytes += len(data)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+        return data
+
+    def get_or_render(self, key, build):
+        """
+        Cached PNG for key, or render_png(build()) stored under it.
+        """
+        data = self.get(key)
+        if data is None:
+            data = self.put(key, render_png(build()))
+        return data
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
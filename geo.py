@@ -0,0 +1,159 @@
+# geo.py
+#
+# Great-circle helpers and a grid index over point coordinates (e.g. the Customers
+# dimension) for radius and k-nearest queries. Points are bucketed into fixed-size
+# lat/lon cells and sorted by cell, so a query gathers the few cells its search circle
+# overlaps with searchsorted and computes exact haversine distances only for those.
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = np.pi * EARTH_RADIUS_KM / 180
+CELL_DEG = 0.5
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in km; arguments are degrees and broadcast like NumPy arrays.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(a, dtype=np.float64)) for a in (lat1, lon1, lat2, lon2))
+    a = (np.sin((lat2 - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2)
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0, 1)))
+
+
+class GridIndex:
+    """
+    Fixed-cell spatial index over (lat, lon) points in degrees. Query results are
+    positions into the arrays the index was built from, nearest first.
+    """
+
+    def __init__(self, lat, lon, cell_deg=CELL_DEG):
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        if np.isnan(lat).any() or np.isnan(lon).any():
+            raise ValueError("Coordinates must not be NaN")
+        self.cell_deg = cell_deg
+        self.n_rows = int(np.ceil(180 / cell_deg))
+        self.n_cols = int(np.ceil(360 / cell_deg))
+
+        cells = self._cell_ids(self._row(lat), self._col(lon))
+        self.order = np.argsort(cells, kind="stable")
+        self.cells = cells[self.order]
+        self.lat = lat[self.order]
+        self.lon = lon[self.order]
+
+    def __len__(self):
+        return len(self.order)
+
+    def _row(self, lat):
+        return np.clip(((np.asarray(lat) + 90) // self.cell_deg).astype(np.int64), 0, self.n_rows - 1)
+
+    def _col(self, lon):
+        return ((np.asarray(lon) + 180) // self.cell_deg).astype(np.int64) % self.n_cols
+
+    def _cell_ids(self, row, col):
+        return row * self.n_cols + col
+
+    def _candidates(self, lat, lon, radius_km):
+        """
+        Sorted positions of the points in every cell the search circle can touch.
+        """
+        dlat = radius_km / KM_PER_DEGREE
+        lo_lat, hi_lat = lat - dlat, lat + dlat
+        rows = np.arange(self._row(lo_lat), self._row(hi_lat) + 1)
+
+        # Longitude span at the band's widest latitude; near the poles take every column
+        widest = max(abs(lo_lat), abs(hi_lat))
+        if widest >= 90 or dlat / np.cos(np.radians(widest)) >= 180:
+            starts = rows * self.n_cols
+            ends = starts + self.n_cols
+        else:
+            dlon = dlat / np.cos(np.radians(widest))
+            first = int(self._col(lon - dlon))
+            count = min(int(np.ceil(2 * dlon / self.cell_deg)) + 1, self.n_cols)
+            if first + count <= self.n_cols:
+                spans = [(first, first + count)]
+            else:
+                # The column range wraps around the antimeridian
+                spans = [(first, self.n_cols), (0, first + count - self.n_cols)]
+            starts = np.concatenate([rows * self.n_cols + a for a, _ in spans])
+            ends = np.concatenate([rows * self.n_cols + b for _, b in spans])
+
+        lo = np.searchsorted(self.cells, starts, side="left")
+        hi = np.searchsorted(self.cells, ends, side="left")
+        lengths = hi - lo
+        if not lengths.sum():
+            return np.empty(0, dtype=np.int64)
+        # Concatenate the ranges [lo, hi) without a Python loop
+        offsets = np.repeat(lo - np.cumsum(np.r_[0, lengths[:-1]]), lengths)
+        return np.arange(lengths.sum()) + offsets
+
+    def within(self, lat, lon, radius_km):
+        """
+        (positions, distances_km) of all points within radius_km, nearest first.
+        """
+        candidates = self._candidates(lat, lon, radius_km)
+        dist = haversine_km(lat, lon, self.lat[candidates], self.lon[candidates])
+        keep = dist <= radius_km
+        candidates, dist = candidates[keep], dist[keep]
+        order = np.argsort(dist, kind="stable")
+        return self.order[candidates[order]], dist[order]
+
+    def nearest(self, lat, lon, k=1):
+        """
+        (positions, distances_km) of the k nearest points, nearest first.
+        """
+        k = min(k, len(self))
+        if k == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        # Grow the search circle until it holds k points; the radius query is exact,
+        # so the k nearest points are then all inside it
+        radius = self.cell_deg * KM_PER_DEGREE
+        while True:
+            positions, dist = self.within(lat, lon, radius)
+            if len(positions) >= k or radius > np.pi * EARTH_RADIUS_KM:
+                return positions[:k], dist[:k]
+            radius *= 2
+
+
+def customer_index(customers, cell_deg=CELL_DEG):
+    """
+    Returns (GridIndex, customers with coordinates) for the Customers dimension.
+    Query positions index into the returned frame.
+    """
+    located = customers.dropna(subset=['Latitude', 'Longitude']).reset_index(drop=True)
+    return GridIndex(located['Latitude'], located['Longitude'], cell_deg), located
+
+
+def customers_within(index, located, lat, lon, radius_km):
+    """
+    Customers within radius_km of (lat, lon) with a 'Distance (km)' column, nearest first.
+    """
+    positions, dist = index.within(lat, lon, radius_km)
+    result = located.iloc[positions].reset_index(drop=True)
+    result['Distance (km)'] = dist
+    return result
+
+
+def cities_within(index, located, lat, lon, radius_km):
+    """
+    Cities with at least one customer within radius_km: customer count and the
+    distance to the nearest one.
+    """
+    nearby = customers_within(index, located, lat, lon, radius_km)
+    return (nearby.groupby('City', sort=False, observed=True)
+            .agg(Customers=('Customer ID', 'nunique'), **{'Distance (km)': ('Distance (km)', 'min')})
+            .reset_index())
+
+
+def density_grid(lat, lon, weights=None, bins=60):
+    """
+    Weighted 2D histogram of points: (counts[lat_bin, lon_bin], lat_edges, lon_edges).
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    valid = ~(np.isnan(lat) | np.isnan(lon))
+    if weights is not None:
+        weights = np.asarray(weights, dtype=np.float64)[valid]
+    return np.histogram2d(lat[valid], lon[valid], bins=bins, weights=weights)
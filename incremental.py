@@ -0,0 +1,263 @@
+# incremental.py
+#
+# Incremental version of preprocessing.preprocess_data: per-truck and per-city running
+# sums are kept as persisted state, new freight/cost rows are folded in, and derived
+# features are recomputed only for the trucks those rows touch.
+#
+# Each save writes a complete new generation directory and then swaps the CURRENT
+# pointer to it, so the aggregates and the list of folded batches always change together:
+#
+#   data/.cache/aggregate_state/CURRENT          name of the current generation
+#   data/.cache/aggregate_state/g<n>/            trucks.arrow, cities.arrow, features.arrow, state.json
+#
+# The previous generation is kept too, so a reader that read CURRENT just before a swap
+# can still load the files it names.
+
+import argparse
+import json
+import os
+import shutil
+import time
+
+import pandas as pd
+
+from ingest import save_frame, load_frame, save_json
+from preprocessing import (
+    TRUCK_KEYS, COST_COLS, REV_COLS, CITY_COLS,
+    clean_costs, clean_freight, join_costs, join_freight, derive_features, attach_geo
+)
+
+STATE_DIR = os.path.join("data", ".cache", "aggregate_state")
+CURRENT_FILE = "CURRENT"
+KEEP_GENERATIONS = 2
+
+# Running per-truck sums; 'Cost Rows' tells which trucks have cost data (inner join)
+TRUCK_SUM_COLS = COST_COLS + REV_COLS + ['Cost Rows', 'Num Trips']
+COUNT_COLS = ['KM Traveled', 'Cost Rows', 'Num Trips']
+
+
+def empty_state():
+    trucks = pd.DataFrame(
+        columns=TRUCK_SUM_COLS,
+        index=pd.MultiIndex.from_arrays([[], [], []], names=TRUCK_KEYS),
+        dtype=float,
+    )
+    cities = pd.DataFrame(columns=CITY_COLS, index=pd.Index([], name='City'), dtype=float)
+    return {
+        "trucks": trucks,
+        "cities": cities,
+        "features": None,
+        "vehicles_hash": None,
+        "batches": [],
+    }
+
+
+def _vehicles_hash(vehicles):
+    return str(int(pd.util.hash_pandas_object(vehicles, index=False).sum()))
+
+
+def _group_sums(df, keys, cols, count_col=None):
+    grouped = df.groupby(keys)
+    sums = grouped[cols].sum()
+    if count_col:
+        sums[count_col] = grouped.size()
+    sums = sums.reset_index()
+    # Cost sheets carry Truck ID as object; normalise so keys align with freight
+    for key in keys:
+        sums[key] = sums[key].infer_objects()
+    return sums.set_index(keys)
+
+
+def _add(base, delta):
+    delta = delta.reindex(columns=base.columns, fill_value=0)
+    if base.empty:
+        total = delta.astype(float)
+    else:
+        total = base.add(delta, fill_value=0)
+    return total.sort_index()
+
+
+def fold(state, vehicles, customers, f_cost=None, f_freight=None, refresh=True):
+    """
+    Folds new raw cost and/or freight rows into `state` (in place).
+    Returns the truck keys whose aggregates changed. With refresh=False their derived
+    features are left stale: call refresh_features once after the last batch.
+    """
+    vehicles_hash = _vehicles_hash(vehicles)
+    if state["vehicles_hash"] is None:
+        state["vehicles_hash"] = vehicles_hash
+    elif state["vehicles_hash"] != vehicles_hash:
+        raise ValueError(
+            "Vehicles dimension changed since the aggregate state was built; rebuild it from full history."
+        )
+
+    deltas = []
+    if f_cost is not None and len(f_cost):
+        f_cost_4 = join_costs(clean_costs(f_cost.copy()), vehicles)
+        deltas.append(_group_sums(f_cost_4, TRUCK_KEYS, COST_COLS, 'Cost Rows'))
+
+    if f_freight is not None and len(f_freight):
+        f_details_4 = join_freight(clean_freight(f_freight.copy()), vehicles, customers)
+        deltas.append(_group_sums(f_details_4, TRUCK_KEYS, REV_COLS, 'Num Trips'))
+        if 'City' in f_details_4.columns:
+            city_delta = f_details_4.groupby('City')[CITY_COLS].sum()
+            state["cities"] = _add(state["cities"], city_delta)
+
+    touched = pd.MultiIndex.from_arrays([[], [], []], names=TRUCK_KEYS)
+    for delta in deltas:
+        state["trucks"] = _add(state["trucks"], delta)
+        touched = touched.union(delta.index)
+
+    if refresh:
+        refresh_features(state, touched)
+    return touched
+
+
+def refresh_features(state, touched):
+    """
+    Recomputes derived features for the touched trucks only.
+    """
+    trucks = state["trucks"]
+    for col in COUNT_COLS:
+        trucks[col] = trucks[col].astype('int64')
+
+    subset = trucks.loc[trucks.index.intersection(touched)]
+    # merged_log is an inner join of cost and freight aggregates
+    subset = subset[(subset['Cost Rows'] > 0) & (subset['Num Trips'] > 0)]
+    updated = derive_features(subset.drop(columns='Cost Rows').reset_index()).set_index(TRUCK_KEYS)
+
+    features = state["features"]
+    if features is None:
+        features = updated
+    else:
+        features = pd.concat([features.drop(index=touched, errors='ignore'), updated])
+    state["features"] = features.sort_index()
+
+
+def results(state, customers):
+    """
+    Returns (merged_log, city_stats) shaped like preprocess_data's output.
+    """
+    features = state["features"]
+    if features is None:
+        merged_log = pd.DataFrame(columns=TRUCK_KEYS + COST_COLS + REV_COLS + ['Num Trips'])
+    else:
+        merged_log = features.reset_index()
+
+    if len(state["cities"]):
+        city_stats = attach_geo(state["cities"].reset_index(), customers)
+    else:
+        city_stats = pd.DataFrame()
+    return merged_log, city_stats
+
+
+def _current_dir(state_dir):
+    """
+    Directory of the current generation, or None if no state was saved yet.
+    """
+    try:
+        with open(os.path.join(state_dir, CURRENT_FILE)) as f:
+            return os.path.join(state_dir, f.read().strip())
+    except FileNotFoundError:
+        return None
+
+
+def _generation_number(entry):
+    return int(entry[1:].split(".")[0])
+
+
+def _prune_generations(state_dir, current):
+    """
+    Removes all but the KEEP_GENERATIONS newest generations, and leftovers of saves
+    interrupted before `current` was written. Newer temporary directories belong to
+    saves still in progress and are left alone.
+    """
+    entries = [e for e in os.listdir(state_dir)
+               if e.startswith("g") and os.path.isdir(os.path.join(state_dir, e))]
+    complete = sorted((e for e in entries if not e.endswith(".tmp")), key=_generation_number)
+    stale = complete[:-KEEP_GENERATIONS] + [
+        e for e in entries if e.endswith(".tmp") and _generation_number(e) < _generation_number(current)
+    ]
+    for entry in stale:
+        shutil.rmtree(os.path.join(state_dir, entry), ignore_errors=True)
+
+
+def save_state(state, state_dir=STATE_DIR):
+    """
+    Writes the state as a new generation and points CURRENT at it. A crash at any
+    point leaves the previous generation current, never a mix of the two.
+    """
+    generation = f"g{time.time_ns()}"
+    tmp_dir = os.path.join(state_dir, generation + ".tmp")
+    save_frame(state["trucks"].reset_index(), os.path.join(tmp_dir, "trucks.arrow"))
+    save_frame(state["cities"].reset_index(), os.path.join(tmp_dir, "cities.arrow"))
+    if state["features"] is not None:
+        save_frame(state["features"].reset_index(), os.path.join(tmp_dir, "features.arrow"))
+    save_json({"vehicles_hash": state["vehicles_hash"], "batches": state["batches"]},
+              os.path.join(tmp_dir, "state.json"))
+    os.rename(tmp_dir, os.path.join(state_dir, generation))
+
+    pointer = os.path.join(state_dir, CURRENT_FILE + ".tmp")
+    with open(pointer, "w") as f:
+        f.write(generation)
+    os.replace(pointer, os.path.join(state_dir, CURRENT_FILE))
+
+    _prune_generations(state_dir, generation)
+
+
+def load_state(state_dir=STATE_DIR):
+    """
+    Loads persisted state, or returns an empty one if none exists yet.
+    """
+    state_dir = _current_dir(state_dir)
+    if state_dir is None:
+        return empty_state()
+    meta_path = os.path.join(state_dir, "state.json")
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+    state = empty_state()
+    state.update(meta)
+    state["trucks"] = load_frame(os.path.join(state_dir, "trucks.arrow")).set_index(TRUCK_KEYS)
+    state["cities"] = load_frame(os.path.join(state_dir, "cities.arrow")).set_index('City')
+    features_path = os.path.join(state_dir, "features.arrow")
+    if os.path.exists(features_path):
+        state["features"] = load_frame(features_path).set_index(TRUCK_KEYS)
+    return state
+
+
+def refresh(vehicles, customers, f_cost=None, f_freight=None, batch_id=None, state_dir=STATE_DIR):
+    """
+    Loads the persisted state, folds in one batch of new rows and saves it again.
+    A batch_id that was already folded is skipped, so reruns don't double count.
+    Returns (merged_log, city_stats).
+    """
+    state = load_state(state_dir)
+    if batch_id is not None and batch_id in state["batches"]:
+        print(f"Batch {batch_id} already folded, skipping.")
+    else:
+        touched = fold(state, vehicles, customers, f_cost, f_freight)
+        if batch_id is not None:
+            state["batches"].append(batch_id)
+        save_state(state, state_dir)
+        print(f"Folded batch {batch_id}: {len(touched)} trucks updated.")
+    return results(state, customers)
+
+
+if __name__ == "__main__":
+    from ingest import file_fingerprint, read_excel_cached
+
+    parser = argparse.ArgumentParser(description="Fold new freight/cost files into the aggregate state.")
+    parser.add_argument("--freight", nargs="*", default=[], help="new fFreight CSV files")
+    parser.add_argument("--costs", nargs="*", default=[], help="new fCosts workbooks")
+    parser.add_argument("--state-dir", default=STATE_DIR)
+    args = parser.parse_args()
+
+    vehicles = read_excel_cached("data/DimensionTables.xlsx", sheet_name="Vehicles")
+    customers = read_excel_cached("data/DimensionTables.xlsx", sheet_name="Customers")
+    for path in args.costs:
+        refresh(vehicles, customers, f_cost=pd.read_excel(path, header=2),
+                batch_id=file_fingerprint(path)["sha256"], state_dir=args.state_dir)
+    for path in args.freight:
+        refresh(vehicles, customers, f_freight=pd.read_csv(path),
+                batch_id=file_fingerprint(path)["sha256"], state_dir=args.state_dir)
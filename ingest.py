@@ -0,0 +1,356 @@
+# ingest.py
+
+import functools
+import hashlib
+import importlib.util
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+# Cached copies live next to their sources, e.g. data/.cache/
+CACHE_DIRNAME = ".cache"
+
+# Object columns Arrow can't type (e.g. fCosts.xlsx with its repeated header row)
+# are stored as a string column plus a per-value "kind" column so they round-trip.
+_KIND_SUFFIX = "__kind"
+_KINDS = ["null", "int", "float", "str", "datetime", "bool"]
+
+# Last fingerprint seen per path, so repeated checks in one process only stat the file
+_fingerprints = {}
+
+
+def file_fingerprint(path, known=None):
+    """
+    Returns {size, mtime_ns, sha256} for a source file.
+    If `known` has the same size and mtime, its hash is reused instead of rereading the file.
+    """
+    stat = os.stat(path)
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    known = known or _fingerprints.get(os.path.abspath(path))
+    if known and known.get("size") == stat.st_size and known.get("mtime_ns") == stat.st_mtime_ns:
+        fingerprint["sha256"] = known["sha256"]
+        _fingerprints[os.path.abspath(path)] = fingerprint
+        return fingerprint
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    fingerprint["sha256"] = digest.hexdigest()
+    _fingerprints[os.path.abspath(path)] = fingerprint
+    return fingerprint
+
+
+def _cache_paths(path, reader, read_kwargs):
+    key = json.dumps({"reader": reader, "kwargs": read_kwargs}, sort_keys=True, default=str)
+    tag = hashlib.sha1(key.encode()).hexdigest()[:12]
+    cache_dir = os.path.join(os.path.dirname(path), CACHE_DIRNAME)
+    base = os.path.join(cache_dir, f"{os.path.basename(path)}.{tag}")
+    return base + ".arrow", base + ".json"
+
+
+def _value_kind(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "null"
+    if isinstance(value, (bool, np.bool_)):
+        return "bool"
+    if isinstance(value, (int, np.integer)):
+        return "int"
+    if isinstance(value, (float, np.floating)):
+        return "float"
+    if isinstance(value, (pd.Timestamp, np.datetime64)) or hasattr(value, "isoformat"):
+        return "datetime"
+    return "str"
+
+
+def _to_arrow(df):
+    """
+    Converts a frame to an Arrow table, encoding mixed-type object columns.
+    """
+    columns = {}
+    mixed = []
+    for col in df.columns:
+        s = df[col]
+        try:
+            columns[col] = pa.array(s, from_pandas=True)
+            continue
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            pass
+        kinds = s.map(_value_kind)
+        text = s.map(lambda v: v.isoformat() if hasattr(v, "isoformat") else str(v))
+        columns[col] = pa.array(text.where(kinds != "null", None), type=pa.string())
+        columns[col + _KIND_SUFFIX] = pa.array(
+            pd.Categorical(kinds, categories=_KINDS).codes.astype("int8")
+        )
+        mixed.append(col)
+    table = pa.table(columns)
+    return table.replace_schema_metadata({"mixed_columns": json.dumps(mixed)})
+
+
+def _from_arrow(table, **to_pandas_kwargs):
+    """
+    Inverse of _to_arrow.
+    """
+    metadata = table.schema.metadata or {}
+    mixed = json.loads(metadata.get(b"mixed_columns", b"[]"))
+    kind_cols = [col + _KIND_SUFFIX for col in mixed]
+    df = (table.drop_columns(kind_cols) if kind_cols else table).to_pandas(**to_pandas_kwargs)
+
+    for col in mixed:
+        text = df[col]
+        kinds = table.column(col + _KIND_SUFFIX).to_numpy()
+        values = np.full(len(df), np.nan, dtype=object)
+        for code, kind in enumerate(_KINDS):
+            mask = kinds == code
+            if kind == "null" or not mask.any():
+                continue
+            part = text[mask]
+            if kind == "int":
+                part = part.astype("int64")
+            elif kind == "float":
+                part = part.astype("float64")
+            elif kind == "bool":
+                part = part == "True"
+            elif kind == "datetime":
+                part = pd.to_datetime(part)
+            values[mask] = part.astype(object).to_numpy()
+        df[col] = pd.Series(values, index=df.index, name=col)
+    return df
+
+
+def _write_atomic(path, write):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _write_arrow(table, path):
+    def write(tmp):
+        # Uncompressed IPC so the file can be memory-mapped on read
+        with pa.OSFile(tmp, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    _write_atomic(path, write)
+
+
+def _read_arrow(path):
+    with pa.memory_map(path, "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+def _cached_frame(path, reader, read_kwargs):
+    """
+    The cached parse of `path` with these arguments, or None if the source changed
+    (or was never parsed).
+    """
+    arrow_path, manifest_path = _cache_paths(path, reader, read_kwargs)
+
+    manifest = None
+    if os.path.exists(manifest_path) and os.path.exists(arrow_path):
+        try:
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+
+    known = manifest["source"] if manifest else None
+    fingerprint = file_fingerprint(path, known)
+
+    if known and known["sha256"] == fingerprint["sha256"]:
+        try:
+            df = _from_arrow(_read_arrow(arrow_path))
+        except (OSError, pa.ArrowInvalid) as e:
+            print(f"Ignoring unreadable cache for {path}: {e}")
+        else:
+            if known != fingerprint:
+                # Touched but unchanged: refresh mtime so the next check skips hashing
+                manifest["source"] = fingerprint
+                _write_manifest(manifest_path, manifest)
+            return df
+    return None
+
+
+def _store_frame(path, reader, read_kwargs, df):
+    arrow_path, manifest_path = _cache_paths(path, reader, read_kwargs)
+    _write_arrow(_to_arrow(df), arrow_path)
+    _write_manifest(manifest_path, {"source": file_fingerprint(path), "reader": reader, "kwargs": read_kwargs})
+
+
+def _column_wanted(wanted, name):
+    return name in wanted
+
+
+def _parse_kwargs(read_kwargs):
+    # A usecols list is applied leniently, so one parse finds every listed column missing
+    # from the file (see missing_columns), and the list stays JSON-able for the cache key
+    kwargs = dict(read_kwargs)
+    if isinstance(kwargs.get("usecols"), list):
+        kwargs["usecols"] = functools.partial(_column_wanted, frozenset(kwargs["usecols"]))
+    return kwargs
+
+
+def _parse_file(path, reader, kwargs_list):
+    """
+    Parses one file once per entry of kwargs_list; a workbook is opened only once for
+    all its sheets (pandas' openpyxl reader works in read-only streaming mode).
+    Returns (frames, seconds). Runs in worker processes.
+    """
+    start = time.perf_counter()
+    if reader == "excel":
+        with pd.ExcelFile(path) as workbook:
+            frames = [workbook.parse(**_parse_kwargs(kwargs)) for kwargs in kwargs_list]
+    else:
+        frames = [getattr(pd, f"read_{reader}")(path, **_parse_kwargs(kwargs)) for kwargs in kwargs_list]
+    return frames, time.perf_counter() - start
+
+
+def missing_columns(df, read_kwargs):
+    """
+    Columns of read_kwargs' usecols list that the parsed frame doesn't have.
+    """
+    usecols = read_kwargs.get("usecols")
+    if not isinstance(usecols, list):
+        return []
+    return [col for col in usecols if col not in df.columns]
+
+
+def read_cached(path, reader, **read_kwargs):
+    """
+    Reads `path` with pandas' `read_<reader>` (e.g. "excel", "csv"), going through the
+    columnar cache. The source is only reparsed when its fingerprint changes.
+    """
+    df = _cached_frame(path, reader, read_kwargs)
+    if df is None:
+        df = _parse_file(path, reader, [read_kwargs])[0][0]
+        _store_frame(path, reader, read_kwargs, df)
+    return df
+
+
+def read_sources(tables, max_workers=None, refresh=False):
+    """
+    Reads [(path, reader, read_kwargs), ...] through the columnar cache. Stale tables
+    (all of them with refresh) are parsed grouped by file, so a workbook is opened
+    once for all its sheets, and different files are parsed in parallel worker processes.
+    Returns (frames in the order of `tables`, timing report: one row per file, with the
+    listed usecols each file lacks under "missing").
+    """
+    frames = [None] * len(tables)
+    report = {}
+    stale = {}
+    for i, (path, reader, read_kwargs) in enumerate(tables):
+        start = time.perf_counter()
+        frames[i] = None if refresh else _cached_frame(path, reader, read_kwargs)
+        row = report.setdefault(path, {"source": os.path.basename(path), "tables": 0, "parsed": 0,
+                                       "rows": 0, "seconds": 0.0, "missing": []})
+        row["tables"] += 1
+        row["seconds"] += time.perf_counter() - start
+        if frames[i] is None:
+            stale.setdefault((path, reader), []).append(i)
+
+    jobs = list(stale.items())
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    args = [(path, reader, [tables[i][2] for i in positions]) for (path, reader), positions in jobs]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(_parse_file, *zip(*args)))
+    else:
+        results = [_parse_file(*job_args) for job_args in args]
+
+    for ((path, reader), positions), (parsed, seconds) in zip(jobs, results):
+        report[path]["seconds"] += seconds
+        report[path]["parsed"] += len(parsed)
+        for i, df in zip(positions, parsed):
+            _store_frame(path, reader, tables[i][2], df)
+            frames[i] = df
+
+    for i, (path, _, read_kwargs) in enumerate(tables):
+        report[path]["rows"] += len(frames[i])
+        report[path]["missing"] += missing_columns(frames[i], read_kwargs)
+    return frames, list(report.values())
+
+
+def format_report(report):
+    """
+    read_sources' timing report as a text table.
+    """
+    return pd.DataFrame(report).to_string(
+        index=False, formatters={"seconds": "{:.3f}".format, "missing": lambda cols: ", ".join(cols) or "-"}
+    )
+
+
+def _write_manifest(path, manifest):
+    def write(tmp):
+        with open(tmp, "w") as f:
+            json.dump(manifest, f, default=str)
+    _write_atomic(path, write)
+
+
+def read_excel_cached(path, **read_kwargs):
+    return read_cached(path, "excel", **read_kwargs)
+
+
+def read_csv_cached(path, **read_kwargs):
+    return read_cached(path, "csv", **read_kwargs)
+
+
+def dataset_version(paths):
+    """
+    Short hash identifying the current contents of a set of source files.
+    """
+    digest = hashlib.sha1()
+    for path in sorted(paths):
+        digest.update(file_fingerprint(path)["sha256"].encode())
+    return digest.hexdigest()[:16]
+
+
+def source_version(modules):
+    """
+    Short hash of the source files of `modules` (names, not imported), for keying
+    results on the code that computed them as well as on the data.
+    """
+    digest = hashlib.sha1()
+    for name in sorted(modules):
+        with open(importlib.util.find_spec(name).origin, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:8]
+
+
+def save_frame(df, path):
+    """
+    Atomically writes a frame as an uncompressed Arrow IPC file.
+    """
+    _write_arrow(_to_arrow(df), path)
+
+
+def save_json(obj, path):
+    """
+    Atomically writes a JSON file, e.g. a manifest that marks other files complete.
+    """
+    _write_manifest(path, obj)
+
+
+def save_csv(df, path):
+    """
+    Atomically writes a frame as CSV, without its index.
+    """
+    _write_atomic(path, lambda tmp: df.to_csv(tmp, index=False))
+
+
+def load_frame(path, zero_copy=False):
+    """
+    Memory-maps a frame written by save_frame. With zero_copy, numeric columns without
+    missing values stay read-only views of the mapped file instead of being copied.
+    """
+    return _from_arrow(_read_arrow(path), split_blocks=zero_copy)
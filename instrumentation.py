@@ -0,0 +1,247 @@
+# instrumentation.py
+#
+# Lightweight timing spans and cache counters. A span costs two perf_counter calls, a
+# dict lookup and a lock; nothing is written anywhere unless asked, so this stays on in
+# production. Set FLEET_INSTRUMENTATION=0 to turn recording off entirely, or
+# FLEET_METRICS_LOG=path to also append every span to a JSON-lines log.
+#
+# Metrics are kept for the whole process and per Streamlit session:
+#   latency[name] -> Histogram (fixed millisecond buckets + recent samples)
+#   cache[name]   -> {"calls": n, "misses": n}
+
+import bisect
+import collections
+import contextlib
+import functools
+import json
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("FLEET_INSTRUMENTATION", "1") != "0"
+LOG_PATH = os.environ.get("FLEET_METRICS_LOG")
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open ended
+BUCKETS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000]
+RECENT_SAMPLES = 256
+MAX_SESSIONS = 100
+PROCESS = "process"
+
+_lock = threading.Lock()
+
+
+class Histogram:
+    """
+    Latency histogram over BUCKETS_MS plus the most recent samples (for percentiles).
+    """
+
+    __slots__ = ("count", "total", "min", "max", "buckets", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+        self.buckets = [0] * (len(BUCKETS_MS) + 1)
+        self.recent = collections.deque(maxlen=RECENT_SAMPLES)
+
+    def add(self, ms):
+        self.count += 1
+        self.total += ms
+        self.min = min(self.min, ms)
+        self.max = max(self.max, ms)
+        self.buckets[bisect.bisect_left(BUCKETS_MS, ms)] += 1
+        self.recent.append(ms)
+
+    def percentile(self, q):
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)]
+
+    def summary(self):
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count if self.count else None,
+            "min_ms": self.min if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": self.max if self.count else None,
+            "buckets": dict(zip([f"<={b}" for b in BUCKETS_MS] + [f">{BUCKETS_MS[-1]}"], self.buckets)),
+        }
+
+
+def _new_scope():
+    return {"latency": collections.defaultdict(Histogram),
+            "cache": collections.defaultdict(lambda: {"calls": 0, "misses": 0})}
+
+
+_scopes = collections.OrderedDict([(PROCESS, _new_scope())])
+
+
+_get_ctx = None
+
+
+def session_id():
+    """
+    Id of the Streamlit session running this thread, or None outside Streamlit.
+    """
+    global _get_ctx
+    if _get_ctx is None:
+        try:
+            from streamlit.runtime.scriptrunner import get_script_run_ctx
+            _get_ctx = functools.partial(get_script_run_ctx, suppress_warning=True)
+        except ImportError:
+            _get_ctx = lambda: None
+    ctx = _get_ctx()
+    return ctx.session_id if ctx is not None else None
+
+
+def _scopes_for_update(session):
+    scopes = [_scopes[PROCESS]]
+    if session is not None:
+        if session not in _scopes:
+            _scopes[session] = _new_scope()
+            if len(_scopes) > MAX_SESSIONS + 1:
+                # Drop the oldest session (position 0 is the process scope)
+                _scopes.pop(next(k for k in _scopes if k != PROCESS))
+        scopes.append(_scopes[session])
+    return scopes
+
+
+def record(name, seconds):
+    """
+    Adds one latency sample for `name`.
+    """
+    if not ENABLED:
+        return
+    ms = seconds * 1000
+    session = session_id()
+    with _lock:
+        for scope in _scopes_for_update(session):
+            scope["latency"][name].add(ms)
+    if LOG_PATH:
+        _log({"event": "span", "name": name, "ms": round(ms, 3), "session": session})
+
+
+def _count_cache(name, field):
+    if not ENABLED:
+        return
+    session = session_id()
+    with _lock:
+        for scope in _scopes_for_update(session):
+            scope["cache"][name][field] += 1
+
+
+@contextlib.contextmanager
+def span(name):
+    """
+    Times the enclosed block as `name`:  with span("preprocess.clean_costs"): ...
+    """
+    if not ENABLED:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - start)
+
+
+def timed(name=None):
+    """
+    Decorator form of span(); defaults to module.function as the name.
+    """
+    def decorator(fn):
+        label = name or f"{fn.__module__}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def cached(cache_decorator, name=None):
+    """
+    Applies a Streamlit cache decorator (st.cache_data, st.cache_resource(...)) and
+    counts calls and misses: the function body only runs on a miss, so
+    hits = calls - misses. Records `name` (the whole call, including argument hashing)
+    and `name`.compute (the body on a miss). The returned function keeps .clear().
+
+        @cached(st.cache_data, "load_raw_data")
+        def load_raw_data(...): ...
+    """
+    def decorator(fn):
+        label = name or f"{fn.__module__}.{fn.__name__}"
+
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            _count_cache(label, "misses")
+            with span(label + ".compute"):
+                return fn(*args, **kwargs)
+
+        cached_fn = cache_decorator(compute)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            _count_cache(label, "calls")
+            with span(label):
+                return cached_fn(*args, **kwargs)
+
+        wrapper.clear = cached_fn.clear
+        return wrapper
+    return decorator
+
+
+def snapshot(session=PROCESS):
+    """
+    JSON-serializable copy of the metrics for the process or one session.
+    """
+    with _lock:
+        scope = _scopes.get(session)
+        if scope is None:
+            return {"latency": {}, "cache": {}}
+        latency = {name: h.summary() for name, h in sorted(scope["latency"].items())}
+        cache = {}
+        for name, c in sorted(scope["cache"].items()):
+            hits = c["calls"] - c["misses"]
+            cache[name] = {**c, "hits": hits, "hit_rate": hits / c["calls"] if c["calls"] else None}
+    return {"latency": latency, "cache": cache}
+
+
+def sessions():
+    with _lock:
+        return [k for k in _scopes if k != PROCESS]
+
+
+def reset():
+    with _lock:
+        _scopes.clear()
+        _scopes[PROCESS] = _new_scope()
+
+
+def export_metrics(path=None):
+    """
+    Process and per-session metrics as a JSON string (also written to `path` if given).
+    """
+    report = {
+        "created_at": time.time(),
+        "pid": os.getpid(),
+        "process": snapshot(PROCESS),
+        "sessions": {s: snapshot(s) for s in sessions()},
+    }
+    text = json.dumps(report, indent=2)
+    if path:
+        with open(path, "w") as f:
+            f.write(text)
+    return text
+
+
+def _log(event):
+    event["ts"] = time.time()
+    line = json.dumps(event) + "\n"
+    with _lock:
+        with open(LOG_PATH, "a") as f:
+            f.write(line)
@@ -0,0 +1,235 @@
+# model_registry.py
+#
+# Versioned on-disk model store:
+#
+#   data/models/v0001/pipeline.pkl      sklearn pipeline
+#   data/models/v0001/compiled/         array export (compiled_model.py), if supported
+#   data/models/v0001/metadata.json     features, sklearn version, data fingerprint, metrics
+#   data/models/LATEST                  name of the version being served
+#
+# Version directories are written aside and renamed into place, and LATEST is swapped
+# with os.replace, so running workers pick up a new model on their next call without
+# ever seeing a partial one.
+
+import datetime
+import json
+import os
+import re
+import shutil
+from importlib import metadata as importlib_metadata
+
+import pandas as pd
+
+from config import CATEGORICAL_FEATURES, NUMERICAL_FEATURES, TARGET
+from compiled_model import current_dir, export_compiled, load_compiled
+
+REGISTRY_DIR = os.path.join("data", "models")
+LATEST_FILE = "LATEST"
+_VERSION_RE = re.compile(r"^v(\d{4,})$")
+
+# (registry dir, its mtime, LATEST's contents) -> resolved version. Publishing renames a
+# version into the directory, bumping its mtime; a promote within the same mtime tick
+# only shows in LATEST itself, so that (a few bytes) is read on every call too.
+_resolved = {}
+
+
+def _sklearn_version():
+    # Read from package metadata so checking compatibility doesn't import sklearn
+    try:
+        return importlib_metadata.version("scikit-learn")
+    except importlib_metadata.PackageNotFoundError:
+        return None
+
+
+def list_versions(registry_dir=REGISTRY_DIR):
+    if not os.path.isdir(registry_dir):
+        return []
+    return sorted(name for name in os.listdir(registry_dir) if _VERSION_RE.match(name))
+
+
+def read_metadata(version, registry_dir=REGISTRY_DIR):
+    with open(os.path.join(registry_dir, version, "metadata.json")) as f:
+        return json.load(f)
+
+
+def is_compatible(meta):
+    """
+    A version can be served if it was trained on the current feature list and either
+    has a compiled export or was pickled by the installed sklearn minor version.
+    """
+    features = meta.get("features", {})
+    if features.get("categorical") != CATEGORICAL_FEATURES or features.get("numerical") != NUMERICAL_FEATURES:
+        return False
+    if meta.get("compiled"):
+        return True
+    installed = _sklearn_version()
+    trained = meta.get("sklearn_version")
+    return bool(installed and trained) and installed.split(".")[:2] == trained.split(".")[:2]
+
+
+def current_version(registry_dir=REGISTRY_DIR):
+    """
+    The version LATEST points to if it is compatible, otherwise the newest compatible one.
+    Returns None when the registry has nothing servable.
+    """
+    try:
+        mtime = os.stat(registry_dir).st_mtime_ns
+    except OSError:
+        return None
+    latest = _read_latest(registry_dir)
+    key = (os.path.abspath(registry_dir), mtime, latest)
+    if key not in _resolved:
+        _resolved.clear()
+        _resolved[key] = _resolve_version(registry_dir, latest)
+    return _resolved[key]
+
+
+def _read_latest(registry_dir):
+    try:
+        with open(os.path.join(registry_dir, LATEST_FILE)) as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+
+def _resolve_version(registry_dir, latest):
+    candidates = list_versions(registry_dir)
+    if latest in candidates:
+        candidates.remove(latest)
+        candidates.append(latest)
+    for version in reversed(candidates):
+        try:
+            if is_compatible(read_metadata(version, registry_dir)):
+                return version
+        except (OSError, ValueError):
+            continue
+    return None
+
+
+def load_artifact(pickle_path, compiled_dir=None):
+    """
+    Loads a model from disk, preferring the compiled export when it was built from
+    this exact pickle. Raises if nothing usable can be loaded; never retrains.
+    """
+    if compiled_dir and os.path.exists(os.path.join(current_dir(compiled_dir), "meta.json")):
+        try:
+            compiled = load_compiled(compiled_dir)
+            if not os.path.exists(pickle_path):
+                return compiled
+            from ingest import file_fingerprint
+            if compiled.meta.get("source_sha256") == file_fingerprint(pickle_path)["sha256"]:
+                return compiled
+            print("Compiled model is stale (pickle changed). Loading pickle.")
+        except (OSError, ValueError) as e:
+            print(f"Error loading compiled model: {e}. Falling back to pickle.")
+
+    if not os.path.exists(pickle_path):
+        raise FileNotFoundError(f"Model not found: {pickle_path}")
+    import joblib
+    pipeline = joblib.load(pickle_path)
+
+    # Sanity Check: Run a dummy prediction.
+    # If the model is incompatible (e.g., version mismatch), this will raise an error.
+    dummy_data = {col: [0] for col in NUMERICAL_FEATURES}
+    for col in CATEGORICAL_FEATURES:
+        dummy_data[col] = ['Unknown']
+    pipeline.predict(pd.DataFrame(dummy_data))
+    return pipeline
+
+
+def load_version(version, registry_dir=REGISTRY_DIR):
+    path = os.path.join(registry_dir, version)
+    return load_artifact(os.path.join(path, "pipeline.pkl"), os.path.join(path, "compiled"))
+
+
+def _next_version(registry_dir):
+    versions = list_versions(registry_dir)
+    last = int(_VERSION_RE.match(versions[-1]).group(1)) if versions else 0
+    return f"v{last + 1:04d}"
+
+
+def promote(version, registry_dir=REGISTRY_DIR):
+    """
+    Atomically points LATEST at `version` (also used to roll back).
+    """
+    if version not in list_versions(registry_dir):
+        raise ValueError(f"Unknown model version {version}")
+    tmp = os.path.join(registry_dir, LATEST_FILE + ".tmp")
+    with open(tmp, "w") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(registry_dir, LATEST_FILE))
+
+
+def publish(pipeline, X, metrics=None, data_fingerprint=None, registry_dir=REGISTRY_DIR, make_latest=True,
+            n_train_rows=None):
+    """
+    Stores a fitted pipeline as a new version and (by default) promotes it.
+    X is used to check the compiled export against sklearn; n_train_rows is the size of
+    the split the pipeline was fitted on. Returns the version name.
+    """
+    import joblib
+
+    os.makedirs(registry_dir, exist_ok=True)
+    staging = os.path.join(registry_dir, f".staging-{os.getpid()}")
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    pickle_path = os.path.join(staging, "pipeline.pkl")
+    joblib.dump(pipeline, pickle_path)
+    compiled = export_compiled(pipeline, X, os.path.join(staging, "compiled"), source_path=pickle_path)
+
+    meta = {
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        "model": type(pipeline.named_steps["model"]).__name__,
+        "features": {
+            "categorical": CATEGORICAL_FEATURES,
+            "numerical": NUMERICAL_FEATURES,
+            "target": TARGET,
+        },
+        "sklearn_version": _sklearn_version(),
+        "data_fingerprint": data_fingerprint,
+        "metrics": metrics or {},
+        "compiled": compiled is not None,
+        "n_train_rows": n_train_rows,
+    }
+
+    # Claim the next free version name; rename fails if another trainer took it
+    while True:
+        version = _next_version(registry_dir)
+        meta["version"] = version
+        with open(os.path.join(staging, "metadata.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+        try:
+            os.rename(staging, os.path.join(registry_dir, version))
+            break
+        except OSError:
+            if not os.path.exists(os.path.join(registry_dir, version)):
+                raise
+
+    if make_latest:
+        promote(version, registry_dir)
+    print(f"Published model {version} to {registry_dir}")
+    return version
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect the model registry.")
+    parser.add_argument("--registry", default=REGISTRY_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("list", help="list versions with their metrics")
+    promote_parser = sub.add_parser("promote", help="serve a given version (or roll back)")
+    promote_parser.add_argument("version")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        serving = current_version(args.registry)
+        for version in list_versions(args.registry):
+            meta = read_metadata(version, args.registry)
+            marker = "*" if version == serving else " "
+            status = "" if is_compatible(meta) else " (incompatible)"
+            print(f"{marker} {version}  {meta.get('model')}  {meta.get('created_at')}  {meta.get('metrics')}{status}")
+    else:
+        promote(args.version, args.registry)
+        print(f"LATEST -> {args.version}")
@@ -0,0 +1,145 @@
+# periods.py
+#
+# Time-windowed variant of preprocess_data's truck aggregation: one row per truck and
+# period (day, week or month) with the same derived features.
+#
+# period_source() cleans the cost and freight rows once and sorts them by date, so a
+# date range is two binary searches and only rows inside the window are touched.
+# aggregate_periods() then sorts the window by (truck, period) and sums each run of
+# equal keys with np.add.reduceat, instead of grouping and merging per query.
+
+import numpy as np
+import pandas as pd
+
+from preprocessing import (
+    TRUCK_KEYS, COST_COLS, REV_COLS, clean_costs, clean_freight, derive_features
+)
+
+GRAINS = ["day", "week", "month"]
+# 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday
+_WEEK_SHIFT = 3
+
+
+def _period_codes(dates, grain):
+    """
+    Integer period number of each datetime64 value.
+    """
+    if grain == "month":
+        return dates.astype("datetime64[M]").astype(np.int64)
+    days = dates.astype("datetime64[D]").astype(np.int64)
+    if grain == "day":
+        return days
+    if grain == "week":
+        return (days + _WEEK_SHIFT) // 7
+    raise ValueError(f"Unknown time grain {grain!r}, expected one of {GRAINS}")
+
+
+def _period_starts(codes, grain):
+    if grain == "month":
+        return codes.astype("datetime64[M]").astype("datetime64[ns]")
+    if grain == "week":
+        codes = codes * 7 - _WEEK_SHIFT
+    return codes.astype("datetime64[D]").astype("datetime64[ns]")
+
+
+def _sorted_rows(df, columns, truck_index):
+    """
+    Date, truck position and value arrays of df's rows with a date and a known truck,
+    sorted by date.
+    """
+    truck_pos = truck_index.get_indexer(df['Truck ID'])
+    dates = df['Date'].to_numpy(dtype="datetime64[ns]")
+    keep = (truck_pos >= 0) & ~np.isnat(dates)
+    order = np.argsort(dates[keep], kind="stable")
+    # groupby().sum() skips NaN, so missing values count as 0
+    values = df.loc[keep, columns].to_numpy(dtype=np.float64)
+    values[np.isnan(values)] = 0
+    return {
+        "dates": dates[keep][order],
+        "truck": truck_pos[keep][order],
+        "values": values[order],
+        "columns": columns,
+    }
+
+
+def period_source(vehicles, f_cost, f_freight):
+    """
+    Cleaned, date-sorted cost and freight rows for aggregate_periods. Build once per
+    dataset and reuse for every grain and range.
+    """
+    trucks = vehicles[TRUCK_KEYS].dropna().drop_duplicates('Truck ID').reset_index(drop=True)
+    truck_index = pd.Index(trucks['Truck ID'])
+    return {
+        "trucks": trucks,
+        "costs": _sorted_rows(clean_costs(f_cost.copy()), COST_COLS, truck_index),
+        "freight": _sorted_rows(clean_freight(f_freight.copy()), REV_COLS, truck_index),
+    }
+
+
+def date_bounds(source):
+    """
+    (first, last) date in the source, or (None, None) if it is empty.
+    """
+    dates = [rows["dates"][[0, -1]] for rows in (source["costs"], source["freight"]) if len(rows["dates"])]
+    if not dates:
+        return None, None
+    dates = np.concatenate(dates)
+    return pd.Timestamp(dates.min()), pd.Timestamp(dates.max())
+
+
+def _window(rows, start, end):
+    """
+    Slice bounds of rows dated in [start, end]; either bound may be None.
+    """
+    dates = rows["dates"]
+    lo = 0 if start is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(start)), side="left")
+    hi = len(dates) if end is None else np.searchsorted(dates, np.datetime64(pd.Timestamp(end)), side="right")
+    return lo, hi
+
+
+def _segment_sums(rows, start, end, grain):
+    """
+    For each (truck, period) present in the window, in sorted order, returns the truck
+    positions, period codes, column sums and row counts.
+    """
+    lo, hi = _window(rows, start, end)
+    periods = _period_codes(rows["dates"][lo:hi], grain)
+    truck = rows["truck"][lo:hi].astype(np.int64)
+    if not len(periods):
+        return truck, periods, np.empty((0, len(rows["columns"]))), np.empty(0, dtype=np.int64)
+
+    # One int64 key per (truck, period): sort once, then reduce each run of equal keys
+    first = periods.min()
+    keys = truck * (periods.max() - first + 1) + (periods - first)
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    sums = np.add.reduceat(rows["values"][lo:hi][order], starts, axis=0)
+    counts = np.diff(np.r_[starts, len(keys)])
+    return truck[order][starts], periods[order][starts], sums, counts
+
+
+def aggregate_periods(source, grain="month", start=None, end=None):
+    """
+    One row per truck and period with cost/revenue sums turned into per-trip averages
+    and the derived features (as in preprocess_data), plus 'Period' (the period start)
+    and 'Num Trips'. Only rows dated within [start, end] are read, so the first and
+    last periods may be partial.
+    """
+    cost_truck, cost_period, cost_sums, _ = _segment_sums(source["costs"], start, end, grain)
+    rev_truck, rev_period, rev_sums, trips = _segment_sums(source["freight"], start, end, grain)
+
+    # Inner join of the two sorted key sets, like preprocess_data's merge
+    cost_keys = pd.MultiIndex.from_arrays([cost_truck, cost_period])
+    rev_keys = pd.MultiIndex.from_arrays([rev_truck, rev_period])
+    both = cost_keys.intersection(rev_keys, sort=True)
+    ci = cost_keys.get_indexer(both)
+    ri = rev_keys.get_indexer(both)
+
+    truck = both.get_level_values(0).to_numpy()
+    periods = source["trucks"].iloc[truck].reset_index(drop=True)
+    periods['Period'] = _period_starts(both.get_level_values(1).to_numpy(), grain)
+    periods[COST_COLS] = cost_sums[ci]
+    periods[REV_COLS] = rev_sums[ri]
+    periods['Num Trips'] = trips[ri]
+    return derive_features(periods)
@@ -1,51 +1,158 @@
 # predict.py
+#
+# Only what serving needs is imported here: joblib and sklearn load when the model is
+# first unpickled (model_registry / compiled_model), never at import time.
 
-import joblib
-import pandas as pd
-from config import CATEGORICAL_FEATURES, NUMERICAL_FEATURES
+import os
 
-import streamlit as st
-import joblib
+import numpy as np
 import pandas as pd
-import os
-from config import CATEGORICAL_FEATURES, NUMERICAL_FEATURES
+import streamlit as st
+from config import CATEGORICAL_FEATURES, NUMERICAL_FEATURES, TARGET
+from scenario_utils import create_scenario_frame, truck_type_defaults
+from compiled_model import COMPILED_DIR, current_dir
+from model_registry import REGISTRY_DIR, current_version, load_artifact, load_version
+from prediction_cache import get_cache
+from instrumentation import cached, span, timed
+
+LEGACY_MODEL_PATH = "data/model_pipeline.pkl"
+
+@cached(st.cache_resource(max_entries=4), "load_model")
+def _load_model(version):
+    if version is None:
+        # Registry empty: serve the model shipped in data/ (compiled copy if it matches)
+        return load_artifact(LEGACY_MODEL_PATH, COMPILED_DIR)
+    return load_version(version)
 
-@st.cache_resource
 def get_pipeline():
     """
-    Robust pipeline loader. 
-    1. Tries to load from disk.
-    2. If fails (AttributeError/Version mismatch), Retrains model immediately.
+    Returns the model currently published in the registry (see model_registry.py).
+    The version is re-resolved on every call (a single stat), so a newly promoted model
+    is swapped into running workers without a restart. Loading never retrains: if no
+    compatible model exists, this raises and `python train_model.py` must be run.
     """
-    model_path = "data/model_pipeline.pkl"
     try:
-        if not os.path.exists(model_path):
-            raise FileNotFoundError("Model not found")
-        pipeline = joblib.load(model_path)
-        
-        # Sanity Check: Run a dummy prediction.
-        # If the model is incompatible (e.g., version mismatch), this will raise an error.
-        # We catch it below and force retraining.
-        dummy_data = {col: [0] for col in NUMERICAL_FEATURES}
-        for col in CATEGORICAL_FEATURES:
-            dummy_data[col] = ['Unknown']
-        dummy_df = pd.DataFrame(dummy_data)
-        
-        pipeline.predict(dummy_df)
-        
-        return pipeline
-        
+        return _load_model(current_version())
     except Exception as e:
-        print(f"Error loading/validating model: {e}. Retraining...")
-        from train_model import train_pipeline
-        return train_pipeline()
+        raise RuntimeError(f"No usable model ({e}). Train one with `python train_model.py`.") from e
 
-def predict_cost(input_data):
+def model_id():
+    """
+    Identity of the served model artifact: registry version plus a hash of its pickle
+    (a stat per call once hashed), so cached predictions die with the model.
+    """
+    from ingest import file_fingerprint
+    version = current_version()
+    if version is not None:
+        return f"{version}:{file_fingerprint(os.path.join(REGISTRY_DIR, version, 'pipeline.pkl'))['sha256'][:16]}"
+    path = LEGACY_MODEL_PATH if os.path.exists(LEGACY_MODEL_PATH) else os.path.join(current_dir(COMPILED_DIR), "meta.json")
+    return f"legacy:{file_fingerprint(path)['sha256'][:16]}"
+
+def predict_cost(input_data, use_cache=True):
+    """
+    Predicts one scenario. Single rows with all model features are memoized per model
+    (see prediction_cache.py).
+    """
     pipeline = get_pipeline()
     
     if isinstance(input_data, dict):
         input_df = pd.DataFrame([input_data])
     else:
         input_df = input_data
-        
-    return pipeline.predict(input_df)[0]
+
+    def infer():
+        with span("predict.inference"):
+            return pipeline.predict(input_df)[0]
+
+    features = CATEGORICAL_FEATURES + NUMERICAL_FEATURES
+    positions = input_df.columns.get_indexer(features)
+    if use_cache and len(input_df) == 1 and (positions >= 0).all():
+        # One object array is much cheaper than per-column access for a single row
+        row = dict(zip(features, input_df.to_numpy()[0, positions]))
+        return get_cache().get_or_compute(model_id(), row, infer)
+    return infer()
+
+def predict_scenario(scenario_data, truck_type_means, defaults_id):
+    """
+    create_scenario_input + predict_cost, memoized on the raw scenario inputs so a
+    repeated submit skips building the input frame as well as inference.
+    defaults_id must identify truck_type_means (e.g. the dataset version).
+    """
+    from scenario_utils import create_scenario_input
+    return get_cache().get_or_compute(
+        model_id(),
+        dict(sorted(scenario_data.items())),
+        lambda: predict_cost(create_scenario_input(scenario_data, truck_type_means)),
+        namespace=f"scenario:{defaults_id}",
+    )
+
+def _predict_chunks(pipeline, X, chunk_size):
+    return np.concatenate([
+        pipeline.predict(X.iloc[start:start + chunk_size])
+        for start in range(0, len(X), chunk_size)
+    ]) if len(X) else np.empty(0)
+
+def _predict_shard(X, chunk_size):
+    # Runs in a worker process; get_pipeline loads the model once per process
+    return _predict_chunks(get_pipeline(), X, chunk_size)
+
+@timed()
+def predict_batch(scenarios, truck_type_means, chunk_size=50_000, n_jobs=1):
+    """
+    Scores a DataFrame of scenarios (Truck Type plus optional feature overrides).
+    Defaults and derived features are filled for all rows at once, then rows are
+    predicted in chunks of `chunk_size`, optionally sharded over `n_jobs` processes.
+    Returns a Series of predicted Net Profit aligned with `scenarios`.
+    """
+    input_df = create_scenario_frame(scenarios, truck_type_means)
+    X = input_df[CATEGORICAL_FEATURES + NUMERICAL_FEATURES]
+
+    if n_jobs == -1:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, len(X) // chunk_size + 1))
+
+    if n_jobs == 1:
+        predictions = _predict_chunks(get_pipeline(), X, chunk_size)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        shards = np.array_split(np.arange(len(X)), n_jobs)
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = pool.map(_predict_shard, [X.iloc[idx] for idx in shards], [chunk_size] * n_jobs)
+            predictions = np.concatenate(list(parts))
+
+    return pd.Series(predictions, index=scenarios.index, name=TARGET)
+
+def _read_table(path):
+    return pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Predict Net Profit for a file of scenarios.")
+    parser.add_argument("scenarios", help="CSV or Parquet with a 'Truck Type' column and optional feature overrides")
+    parser.add_argument("-o", "--output", help="where to write scenarios + prediction (CSV or Parquet)")
+    parser.add_argument("--chunk-size", type=int, default=50_000)
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes, -1 for all cores")
+    args = parser.parse_args()
+
+    from data_loader import load_raw_data
+    from preprocessing import preprocess_data
+
+    df, _ = preprocess_data(*load_raw_data())
+    scenarios = _read_table(args.scenarios)
+
+    start = time.perf_counter()
+    scenarios[TARGET] = predict_batch(
+        scenarios, truck_type_defaults(df), chunk_size=args.chunk_size, n_jobs=args.jobs
+    )
+    elapsed = time.perf_counter() - start
+    print(f"Scored {len(scenarios):,} scenarios in {elapsed:.2f}s")
+
+    if args.output:
+        if args.output.endswith(".parquet"):
+            scenarios.to_parquet(args.output, index=False)
+        else:
+            scenarios.to_csv(args.output, index=False)
+    else:
+        print(scenarios.head())
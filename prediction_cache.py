@@ -0,0 +1,160 @@
+# prediction_cache.py
+#
+# Memoized single-scenario predictions. Keys are the served model's identity plus the
+# model's input features with numbers rounded to ROUND_DIGITS significant digits, so
+# resubmitting the same scenario skips inference. Entries expire after a TTL and the
+# least recently used ones are evicted past max_entries. Entries of different models
+# live side by side (e.g. two processes serving different versions during a rollout);
+# those of a retired model simply age out.
+#
+# One cache per process (shared by all Streamlit sessions); with a db_path it is also
+# backed by a SQLite file, so restarts and other processes can reuse results. Expired
+# rows are removed from the file by prune(), run when a cache is opened.
+
+import collections
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+ROUND_DIGITS = 6
+MAX_ENTRIES = 10_000
+TTL_SECONDS = 24 * 3600
+DB_PATH = os.environ.get("FLEET_PREDICTION_CACHE_DB")  # e.g. data/.cache/predictions.sqlite
+
+
+def canonical_key(row):
+    """
+    Stable string for a mapping of feature -> value (numbers rounded, order preserved).
+    """
+    items = []
+    for name, value in row.items():
+        if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+            value = float(f"{float(value):.{ROUND_DIGITS}g}")
+        else:
+            value = str(value)
+        items.append((str(name), value))
+    return json.dumps(items)
+
+
+class PredictionCache:
+    def __init__(self, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS, db_path=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.model_id = None  # last model looked up, for summary()
+        self.stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS predictions ("
+                "model_id TEXT, key TEXT, value REAL, created REAL, PRIMARY KEY (model_id, key))"
+            )
+            self._db.commit()
+            self.prune()
+
+    def prune(self, now=None):
+        """
+        Removes expired entries of every model, in memory and in the SQLite file.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [key for key, (_, expires) in self._entries.items() if expires <= now]
+            for key in expired:
+                del self._entries[key]
+            removed = len(expired)
+            if self._db:
+                removed += self._db.execute("DELETE FROM predictions WHERE created <= ?", (now - self.ttl,)).rowcount
+                self._db.commit()
+            self.stats["expired"] += removed
+            return removed
+
+    def get(self, model_id, key):
+        now = time.time()
+        with self._lock:
+            self.model_id = model_id
+            entry = self._entries.get((model_id, key))
+            if entry is not None and entry[1] > now:
+                self._entries.move_to_end((model_id, key))
+                self.stats["hits"] += 1
+                return entry[0]
+            if entry is not None:
+                del self._entries[(model_id, key)]
+            if self._db:
+                row = self._db.execute(
+                    "SELECT value, created FROM predictions WHERE model_id = ? AND key = ?", (model_id, key)
+                ).fetchone()
+                if row and row[1] + self.ttl > now:
+                    self._store((model_id, key), row[0], row[1] + self.ttl)
+                    self.stats["disk_hits"] += 1
+                    return row[0]
+            self.stats["misses"] += 1
+            return None
+
+    def _store(self, key, value, expires):
+        self._entries[key] = (value, expires)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def put(self, model_id, key, value):
+        now = time.time()
+        value = float(value)
+        with self._lock:
+            self.model_id = model_id
+            self._store((model_id, key), value, now + self.ttl)
+            if self._db:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO predictions VALUES (?, ?, ?, ?)", (model_id, key, value, now)
+                )
+                self._db.commit()
+
+    def get_or_compute(self, model_id, row, compute, namespace="features"):
+        """
+        Cached prediction for a mapping of inputs, or compute() stored under it.
+        `namespace` separates different kinds of inputs for the same model.
+        """
+        key = namespace + ":" + canonical_key(row)
+        value = self.get(model_id, key)
+        if value is None:
+            value = compute()
+            self.put(model_id, key, value)
+        return value
+
+    def summary(self):
+        with self._lock:
+            lookups = self.stats["hits"] + self.stats["disk_hits"] + self.stats["misses"]
+            hits = self.stats["hits"] + self.stats["disk_hits"]
+            return {**self.stats, "entries": len(self._entries), "model_id": self.model_id,
+                    "hit_rate": hits / lookups if lookups else None}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._db:
+                self._db.execute("DELETE FROM predictions")
+                self._db.commit()
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """
+    The process-wide cache (SQLite-backed when FLEET_PREDICTION_CACHE_DB is set).
+    """
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = PredictionCache(db_path=DB_PATH)
+        return _cache
@@ -1,74 +1,70 @@
 import numpy as np
 import pandas as pd
 from config import (
-    ROUTE_ID, VEHICLE_ID, CUSTOMER_ID, TOTAL_COST, DISTANCE_KM, 
+    ROUTE_ID, VEHICLE_ID, CUSTOMER_ID, TOTAL_COST, DISTANCE_KM,
     COST_PER_KM, DATE, FUEL, MAINTENANCE, FIXED_COSTS,
     LITERS, NET_REVENUE, WEIGHT_KG, WEIGHT_CUBIC, GOODS_VALUE,
     KM_PER_LITER, MAINTENANCE_PER_KM, COSTS_PER_KG, REVENUE_PER_KM,
     REVENUE_PER_KG, FUEL_COSTS_PER_KM, FIXED_COSTS_PER_KM, NET_PROFIT
 )
+from cleaning import clean_numeric, parse_dates, report_failures, COST_SCHEMA, FREIGHT_SCHEMA
+from compact import compact_frame
+from instrumentation import cached, span
 import streamlit as st
 
-@st.cache_data
-def preprocess_data(vehicles, customers, f_cost, f_freight):
-    # Prevent SettingWithCopyWarning by working on explicit copies
-    f_cost = f_cost.copy()
-    f_freight = f_freight.copy()
-    vehicles = vehicles.copy()
-    customers = customers.copy()
+# Truck level grouping keys and the columns summed per truck / per city
+TRUCK_KEYS = ['Truck ID', 'Truck Type', 'Plate']
+COST_COLS = ['KM Traveled', 'Liters', 'Fuel', 'Maintenance', 'Fixed Costs']
+REV_COLS = ['Net Revenue', 'Weight (Kg)', 'Weight (Cubic)', 'Goods Value']
+CITY_COLS = ['Weight (Kg)', 'Weight (Cubic)', 'Goods Value']
 
-    # --- User provided cleaning logic ---
-    
-    # --- User provided cleaning logic ---
-    
+
+def clean_costs(f_cost):
+    """
+    Drops repeated header rows, cleans numbers and parses dates of fCosts.
+    """
     # Remove repeated headers in data if any
     if 'KM Traveled' in f_cost.columns:
          f_cost = f_cost[f_cost['KM Traveled'].astype(str) != 'KM Traveled'].copy()
 
-    # Safe cleaning helper
-    def clean_num(df, col, to_type=float, replace_comma_dot=False, replace_comma_empty=False):
-        if col not in df.columns: return pd.Series(0, index=df.index)
-        s = df[col].astype(str)
-        if replace_comma_dot:
-            s = s.str.replace(',', '.')
-        if replace_comma_empty:
-            s = s.str.replace(',', '')
-        # Handle 'nan' string
-        s = s.replace('nan', '0')
-        return pd.to_numeric(s, errors='coerce').fillna(0).astype(to_type)
-
-    # f_cost Cleaning
-    f_cost['KM Traveled'] = clean_num(f_cost, 'KM Traveled', int)
-    f_cost['Liters'] = clean_num(f_cost, 'Liters', float)
-    f_cost['Fuel'] = clean_num(f_cost, 'Fuel', float)
-    f_cost['Maintenance'] = clean_num(f_cost, 'Maintenance', float)
-    f_cost['Fixed Costs'] = clean_num(f_cost, 'Fixed Costs', float)
-    
+    # f_cost Cleaning (see cleaning.COST_SCHEMA)
+    f_cost, failures = clean_numeric(f_cost, COST_SCHEMA)
+    report_failures("fCosts", failures)
+
     # Ensure Date
-    f_cost['Date'] = pd.to_datetime(f_cost['Date'], errors='coerce')
+    f_cost['Date'] = parse_dates(f_cost['Date'])
+    return f_cost
 
 
+def clean_freight(f_freight):
+    """
+    Cleans numbers and parses dates of fFreight.
+    """
     # f_freight (f_details_1) Cleaning
     # User: replace(',', '.') for Net Revenue, Weight. replace(',', '') for Goods Value.
-    f_freight['Net Revenue'] = clean_num(f_freight, 'Net Revenue', float, replace_comma_dot=True)
-    f_freight['Weight (Kg)'] = clean_num(f_freight, 'Weight (Kg)', float, replace_comma_dot=True)
-    f_freight['Weight (Cubic)'] = clean_num(f_freight, 'Weight (Cubic)', float, replace_comma_dot=True)
-    f_freight['Goods Value'] = clean_num(f_freight, 'Goods Value', float, replace_comma_empty=True)
-    
-    f_freight['Date'] = pd.to_datetime(f_freight['Date'], errors='coerce')
+    f_freight, failures = clean_numeric(f_freight, FREIGHT_SCHEMA)
+    report_failures("fFreight", failures)
+
+    f_freight['Date'] = parse_dates(f_freight['Date'])
     f_freight['Net Revenue'] = f_freight['Net Revenue'] * 1000 # User logic
-    
+    return f_freight
+
+
+def join_freight(f_freight, vehicles, customers):
+    """
+    Joins cleaned freight rows with the vehicle and customer dimensions.
+    """
     # Dimensional Joins
     # Vehicles (dimension_tab2) on Truck ID
     # Note: Column names in Vehicles might have whitespace, handled below
-    
+
     # Freight Flow
     # f_details_2 = f_details_1.merge(dimension_tab2,how = 'left', on = 'Truck ID' )
     f_details_2 = f_freight.merge(vehicles, how='left', on='Truck ID')
-    
+
     # f_details_3 = f_details_2.merge(dimension_tab3,how = 'left', on = 'Customer ID' )
     f_details_3 = f_details_2.merge(customers, how='left', on='Customer ID')
-    
+
     # Rename and Drop
     # f_details_4 = f_details_3.rename(columns={"Year_x": "Year", "Year_y": "Truck Age" , 'City_x' : 'City'})
     # Need to check if these columns exist. Assuming standard schema.
@@ -76,83 +72,141 @@ def preprocess_data(vehicles, customers, f_cost, f_freight):
     f_details_4 = f_details_3.rename(columns=renames)
     if 'City_y' in f_details_4.columns:
         f_details_4.drop('City_y', axis=1, inplace=True)
-        
-    # --- Aggregation for Model (Truck Level) ---
-    
+    return f_details_4
+
+
+def join_costs(f_cost, vehicles):
+    """
+    Joins cleaned cost rows with the vehicle dimension.
+    """
     # f_cost_3 = f_cost_2.merge(dimension_tab2, how = 'left', on = 'Truck ID')
     f_cost_3 = f_cost.merge(vehicles, how='left', on='Truck ID')
-    
-    # f_cost_4 rename Drive ID -> Driver ID 
+
+    # f_cost_4 rename Drive ID -> Driver ID
     # (Skip Driver join as it's not used for main model dataframe, only for a specific driver analysis if needed)
-    f_cost_4 = f_cost_3 # simplify
-    
-    # Group By
-    # f_cost_TruckID = ... sum()
-    cost_cols = ['KM Traveled', 'Liters', 'Fuel', 'Maintenance', 'Fixed Costs']
-    f_cost_TruckID = f_cost_4.groupby(['Truck ID', 'Truck Type', 'Plate'])[cost_cols].sum()
-    
-    # f_details_TruckID = ... sum()
-    rev_cols = ['Net Revenue', 'Weight (Kg)', 'Weight (Cubic)', 'Goods Value']
-    f_details_TruckID = f_details_4.groupby(['Truck ID', 'Truck Type', 'Plate'])[rev_cols].sum()
-    
-    # merged_log = inner join
-    merged_log = f_cost_TruckID.merge(f_details_TruckID, how='inner', on=['Truck ID', 'Truck Type', 'Plate'])
-    merged_log = merged_log.reset_index() # make them columns
-    
-    # --- Normalize for Single Delivery (Per Trip) ---
-    # Calculate Number of Trips per Truck from Freight Data (f_details_4)
-    # Each row in f_details_4 (freight+dim) is a trip/order
-    trip_counts = f_details_4.groupby(['Truck ID', 'Truck Type', 'Plate']).size().reset_index(name='Num Trips')
-    
-    # Merge trip counts
-    merged_log = merged_log.merge(trip_counts, on=['Truck ID', 'Truck Type', 'Plate'], how='left')
-    merged_log['Num Trips'] = merged_log['Num Trips'].fillna(1) # Safety
-    
+    return f_cost_3
+
+
+def derive_features(merged_log):
+    """
+    Turns per-truck sums (COST_COLS, REV_COLS and 'Num Trips') into per-trip averages
+    and the derived ratio features. Works row by row, so it can be applied to any subset of trucks.
+    """
+    merged_log = merged_log.copy()
+
     # Columns to normalize (Absolute Sums -> Average Per Trip)
     absolute_cols = [
-        'KM Traveled', 'Liters', 'Fuel', 'Maintenance', 'Fixed Costs', 
+        'KM Traveled', 'Liters', 'Fuel', 'Maintenance', 'Fixed Costs',
         'Net Revenue', 'Weight (Kg)', 'Weight (Cubic)', 'Goods Value'
     ]
-    
+
     for col in absolute_cols:
          if col in merged_log.columns:
              merged_log[col] = merged_log[col] / merged_log['Num Trips']
-             
+
     # --- Feature Calculations (User Logic) ---
     # Derived features (Ratios) remain mathematically similar but calculated on per-trip averages
-    # e.g., (AvgCost / AvgKM) is approx (TotalCost / TotalKM) 
-    
+    # e.g., (AvgCost / AvgKM) is approx (TotalCost / TotalKM)
+
     merged_log['KM per Liter'] = merged_log['KM Traveled'] / merged_log['Liters'].replace(0, np.nan)
     merged_log['Maintenance per KM'] = merged_log['Maintenance'] / merged_log['KM Traveled'].replace(0, np.nan)
-    
+
     # Recalculate Total Costs (Per Trip)
     merged_log['Total Costs'] = merged_log['Fuel'] + merged_log['Maintenance'] + merged_log['Fixed Costs']
-    
+
     merged_log['Costs per KM'] = merged_log['Total Costs'] / merged_log['KM Traveled'].replace(0, np.nan)
     merged_log['Costs per kg'] = merged_log['Total Costs'] / merged_log['Weight (Kg)'].replace(0, np.nan)
     merged_log['Revenue per KM'] = merged_log['Net Revenue'] / merged_log['KM Traveled'].replace(0, np.nan)
-    merged_log['Revenue per kg'] = merged_log['Maintenance'] / merged_log['Weight (Kg)'].replace(0, np.nan) 
-    
+    merged_log['Revenue per kg'] = merged_log['Maintenance'] / merged_log['Weight (Kg)'].replace(0, np.nan)
+
     # Net Profit (Per Trip)
     merged_log['Net Profit'] = merged_log['Net Revenue'] - merged_log['Total Costs']
-    
+
     merged_log['Fuel costs per KM'] = merged_log['Fuel'] / merged_log['KM Traveled'].replace(0, np.nan)
     merged_log['Fixed costs per KM'] = merged_log['Fixed Costs'] / merged_log['KM Traveled'].replace(0, np.nan)
 
     merged_log = merged_log.fillna(0)
     merged_log = merged_log.replace([np.inf, -np.inf], 0)
-    
+    return merged_log
+
+
+def attach_geo(city_stats, customers):
+    """
+    Adds Latitude/Longitude and the number of customers to per-city sums.
+    """
+    # Merge with city geo (dimension_tab3_city_group)
+    # dimension_tab3 (customers)
+    # dimension_tab3_city_group = dimension_tab3.groupby(['City','Latitude', 'Longitude'])['Customer ID'].nunique().reset_index()
+    if 'Latitude' in customers.columns and 'Longitude' in customers.columns:
+         geo_stats = customers.groupby(['City', 'Latitude', 'Longitude'], observed=True)['Customer ID'].nunique().reset_index()
+         city_stats = city_stats.merge(geo_stats, on='City', how='left')
+    return city_stats
+
+
+@cached(st.cache_data, "preprocess_data")
+def preprocess_data(vehicles, customers, f_cost, f_freight, lean=False):
+    """
+    Returns (merged_log, city_stats). With lean, both use compact dtypes (see compact.py).
+    """
+    # Prevent SettingWithCopyWarning by working on explicit copies
+    f_cost = f_cost.copy()
+    f_freight = f_freight.copy()
+    vehicles = vehicles.copy()
+    customers = customers.copy()
+
+    # Only the dimension columns used below take part in the joins (freight rows
+    # carry their own City, so customers only add it when it is missing). Both
+    # outputs are unchanged by this, with or without lean: the other dimension
+    # columns were never aggregated.
+    vehicle_keys = vehicles[TRUCK_KEYS]
+    customer_keys = customers[['Customer ID'] + ([] if 'City' in f_freight.columns else ['City'])]
+
+    # --- User provided cleaning logic ---
+    with span("preprocess.clean_costs"):
+        f_cost = clean_costs(f_cost)
+    with span("preprocess.clean_freight"):
+        f_freight = clean_freight(f_freight)
+
+    with span("preprocess.join_freight"):
+        f_details_4 = join_freight(f_freight, vehicle_keys, customer_keys)
+
+    # --- Aggregation for Model (Truck Level) ---
+    with span("preprocess.join_costs"):
+        f_cost_4 = join_costs(f_cost, vehicle_keys)
+
+    with span("preprocess.aggregate_trucks"):
+        # Group By
+        # f_cost_TruckID = ... sum()
+        f_cost_TruckID = f_cost_4.groupby(TRUCK_KEYS, observed=True)[COST_COLS].sum()
+
+        # f_details_TruckID = ... sum()
+        f_details_TruckID = f_details_4.groupby(TRUCK_KEYS, observed=True)[REV_COLS].sum()
+
+        # merged_log = inner join
+        merged_log = f_cost_TruckID.merge(f_details_TruckID, how='inner', on=TRUCK_KEYS)
+        merged_log = merged_log.reset_index() # make them columns
+
+        # --- Normalize for Single Delivery (Per Trip) ---
+        # Calculate Number of Trips per Truck from Freight Data (f_details_4)
+        # Each row in f_details_4 (freight+dim) is a trip/order
+        trip_counts = f_details_4.groupby(TRUCK_KEYS, observed=True).size().reset_index(name='Num Trips')
+
+        # Merge trip counts
+        merged_log = merged_log.merge(trip_counts, on=TRUCK_KEYS, how='left')
+        merged_log['Num Trips'] = merged_log['Num Trips'].fillna(1) # Safety
+
+    with span("preprocess.derive_features"):
+        merged_log = derive_features(merged_log)
+
     # --- City Stats for EDA ---
     # f_details_CustomerID = f_details_4.groupby(['City'])[['Weight (Kg)', 'Weight (Cubic)', 'Goods Value']].sum().reset_index()
-    if 'City' in f_details_4.columns:
-        city_stats = f_details_4.groupby(['City'])[['Weight (Kg)', 'Weight (Cubic)', 'Goods Value']].sum().reset_index()
-        # Merge with city geo (dimension_tab3_city_group)
-        # dimension_tab3 (customers)
-        # dimension_tab3_city_group = dimension_tab3.groupby(['City','Latitude', 'Longitude'])['Customer ID'].nunique().reset_index()
-        if 'Latitude' in customers.columns and 'Longitude' in customers.columns:
-             geo_stats = customers.groupby(['City', 'Latitude', 'Longitude'])['Customer ID'].nunique().reset_index()
-             city_stats = city_stats.merge(geo_stats, on='City', how='left')
-    else:
-        city_stats = pd.DataFrame()
+    with span("preprocess.city_stats"):
+        if 'City' in f_details_4.columns:
+            city_stats = f_details_4.groupby(['City'], observed=True)[CITY_COLS].sum().reset_index()
+            city_stats = attach_geo(city_stats, customers)
+        else:
+            city_stats = pd.DataFrame()
 
+    if lean:
+        merged_log, city_stats = compact_frame(merged_log), compact_frame(city_stats)
     return merged_log, city_stats
@@ -0,0 +1,108 @@
+# routes.py
+#
+# Dispatch planning: predicted Net Profit for every (route, truck type) pair.
+# A route is a trip from a depot to one customer (ROUTE_ID is the Customer ID); its
+# distance is the haversine distance to the customer's coordinates. Scenarios for all
+# pairs are built as one frame and scored with predict_batch.
+
+import numpy as np
+import pandas as pd
+
+from config import ROUTE_ID, CUSTOMER_ID, TRUCK_TYPE, DISTANCE_KM, LITERS, FUEL, MAINTENANCE, TARGET
+from geo import haversine_km
+from predict import predict_batch
+
+# Per trip quantities that grow with distance; the rest keep the type's trip average
+DISTANCE_SCALED = [LITERS, FUEL, MAINTENANCE]
+
+
+def customer_routes(customers, depot_lat, depot_lon, round_trip=True):
+    """
+    One route per customer with coordinates: ROUTE_ID, City, and DISTANCE_KM from the depot.
+    """
+    routes = customers.dropna(subset=['Latitude', 'Longitude'])
+    km = haversine_km(depot_lat, depot_lon, routes['Latitude'], routes['Longitude'])
+    return pd.DataFrame({
+        ROUTE_ID: routes[CUSTOMER_ID].to_numpy(),
+        'City': routes['City'].to_numpy() if 'City' in routes.columns else None,
+        DISTANCE_KM: km * 2 if round_trip else km,
+    })
+
+
+def route_scenarios(distances, truck_type_means, scale_with_distance=True):
+    """
+    Scenarios for every (distance, truck type) pair, type-major.
+    With scale_with_distance, fuel, liters and maintenance are the type's per-km
+    averages times the distance instead of its per-trip averages.
+    """
+    types = truck_type_means.index.to_numpy()
+    scenarios = pd.DataFrame({
+        TRUCK_TYPE: np.repeat(types, len(distances)),
+        DISTANCE_KM: np.tile(distances, len(types)),
+    })
+    if scale_with_distance:
+        per_km = truck_type_means[DISTANCE_SCALED].div(truck_type_means[DISTANCE_KM].replace(0, np.nan), axis=0)
+        for col in DISTANCE_SCALED:
+            scenarios[col] = np.repeat(per_km[col].to_numpy(), len(distances)) * scenarios[DISTANCE_KM].to_numpy()
+    return scenarios
+
+
+def route_matrix(routes, truck_type_means, scale_with_distance=True, chunk_size=50_000, n_jobs=1):
+    """
+    Predicted Net Profit per route (rows, indexed by ROUTE_ID) and truck type (columns),
+    plus 'Best Truck Type' and 'Best Net Profit'. Routes at the same distance are
+    priced once: customers in the same city share coordinates.
+    """
+    distances, inverse = np.unique(routes[DISTANCE_KM].to_numpy(), return_inverse=True)
+    scenarios = route_scenarios(distances, truck_type_means, scale_with_distance)
+    profit = predict_batch(scenarios, truck_type_means, chunk_size=chunk_size, n_jobs=n_jobs)
+
+    types = truck_type_means.index
+    per_distance = profit.to_numpy().reshape(len(types), len(distances)).T
+    matrix = pd.DataFrame(per_distance[inverse], index=pd.Index(routes[ROUTE_ID], name=ROUTE_ID), columns=types)
+    matrix.columns.name = None
+
+    best = np.argmax(matrix.to_numpy(), axis=1)
+    matrix['Best Truck Type'] = types.to_numpy()[best]
+    matrix['Best ' + TARGET] = matrix[list(types)].to_numpy()[np.arange(len(matrix)), best]
+    return matrix
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from data_loader import load_raw_data
+    from preprocessing import preprocess_data
+    from scenario_utils import truck_type_defaults
+
+    parser = argparse.ArgumentParser(description="Price every customer route for every truck type.")
+    parser.add_argument("--depot", type=float, nargs=2, metavar=("LAT", "LON"),
+                        help="depot coordinates (default: median customer location)")
+    parser.add_argument("--one-way", action="store_true", help="price one-way trips instead of round trips")
+    parser.add_argument("--per-trip-costs", action="store_true",
+                        help="keep the type's per-trip fuel/maintenance instead of scaling them by distance")
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes, -1 for all cores")
+    parser.add_argument("-o", "--output", help="CSV or Parquet to write the matrix to")
+    args = parser.parse_args()
+
+    vehicles, customers, f_cost, f_freight = load_raw_data()
+    df, _ = preprocess_data(vehicles, customers, f_cost, f_freight)
+    depot = args.depot or (customers['Latitude'].median(), customers['Longitude'].median())
+
+    means = truck_type_defaults(df)
+    start = time.perf_counter()
+    routes = customer_routes(customers, *depot, round_trip=not args.one_way)
+    matrix = route_matrix(routes, means, not args.per_trip_costs, n_jobs=args.jobs)
+    matrix.insert(0, 'City', routes['City'].to_numpy())
+    matrix.insert(1, DISTANCE_KM, routes[DISTANCE_KM].to_numpy())
+    print(f"Priced {len(matrix):,} routes x {len(means)} truck types in {time.perf_counter() - start:.2f}s")
+
+    if args.output:
+        if args.output.endswith(".parquet"):
+            matrix.reset_index().to_parquet(args.output, index=False)
+        else:
+            matrix.to_csv(args.output)
+    else:
+        print(matrix['Best Truck Type'].value_counts())
+        print(matrix.head())
@@ -12,66 +12,68 @@ def create_scenario_input(scenario_data, truck_type_means):
     Creates a DataFrame for a new scenario, filling missing numerical features
     based on Truck Type averages, and recalculating derived features.
     
-    Adapted from user provided logic.
+    Adapted from user provided logic. Single-row wrapper around create_scenario_frame.
     """
-    input_df_row = pd.DataFrame([scenario_data])
+    return create_scenario_frame(pd.DataFrame([scenario_data]), truck_type_means)
 
-    # Determine the base for filling in data
-    # We assume scenario_data has 'Truck Type'
-    if TRUCK_TYPE in scenario_data and scenario_data[TRUCK_TYPE] in truck_type_means.index:
-        # Use truck type's average data as a base
-        base_data = truck_type_means.loc[scenario_data[TRUCK_TYPE]].copy()
-        input_df_row[TRUCK_TYPE] = scenario_data[TRUCK_TYPE]
-    else:
-        # Fallback if unknown truck type or not provided (should handle in UI)
-        # For now, if missing, we can't easily fill defaults without a type. 
-        # But let's assume UI enforces it.
-        pass
+# Label used for scenarios without a Truck Type; the model's one-hot encoder ignores it
+UNKNOWN_TRUCK_TYPE = "Unknown"
 
-    # Fill in numerical features from base_data if not explicitly provided
-    for col in NUMERICAL_FEATURES:
-        if col not in input_df_row.columns or pd.isna(input_df_row.loc[0, col]):
-            if col in base_data:
-                 input_df_row[col] = base_data[col]
-            else:
-                 input_df_row[col] = 0 # Safety fallback
+def truck_type_defaults(df):
+    """
+    Per truck type means of the model features, used as scenario defaults.
+    """
+    return df.groupby(TRUCK_TYPE, observed=True)[NUMERICAL_FEATURES].mean()
 
-    # Recalculate derived features based on potentially new base values
-    # Ensure required columns are numeric and handle potential division by zero
-    
-    # helper to safe get and fill
-    def get_val(col, default=0):
-        return pd.to_numeric(input_df_row[col], errors='coerce').fillna(default)
+def create_scenario_frame(scenarios, truck_type_means):
+    """
+    Vectorized create_scenario_input for a whole DataFrame of scenarios.
 
-    km = get_val(DISTANCE_KM, 0)
-    liters = get_val(LITERS, 1) # avoid div by zero default
-    fuel = get_val(FUEL, 0)
-    maint = get_val(MAINTENANCE, 0)
-    fixed = get_val(FIXED_COSTS, 0)
-    net_rev = get_val(NET_REVENUE, 0)
-    weight = get_val(WEIGHT_KG, 1) # avoid div by zero default
+    Any NUMERICAL_FEATURES columns present are overrides; missing/NaN values are
+    filled from the row's Truck Type averages in one join. Rows whose Truck Type is
+    missing or not in truck_type_means fall back to the fleet-wide average (the mean
+    over all types) and are labelled UNKNOWN_TRUCK_TYPE if no type was given.
+    Derived features are then recalculated as column arithmetic.
+    """
+    scenarios = scenarios.reset_index(drop=True)
+    input_df = scenarios.copy()
+    if TRUCK_TYPE not in input_df.columns:
+        input_df[TRUCK_TYPE] = UNKNOWN_TRUCK_TYPE
+    input_df[TRUCK_TYPE] = input_df[TRUCK_TYPE].fillna(UNKNOWN_TRUCK_TYPE)
 
-    # Recalculate derived features
-    input_df_row[KM_PER_LITER] = km / liters
-    input_df_row[MAINTENANCE_PER_KM] = maint / km.replace(0, np.nan)
-    
-    # Recalculate Total Costs
-    input_df_row[TOTAL_COST] = fuel + maint + fixed
-    
-    total_cost = input_df_row[TOTAL_COST]
-    
-    input_df_row[COST_PER_KM] = total_cost / km.replace(0, np.nan)
-    input_df_row[COSTS_PER_KG] = total_cost / weight.replace(0, np.nan)
-    input_df_row[REVENUE_PER_KM] = net_rev / km.replace(0, np.nan)
-    # Using Net Revenue / Weight for Revenue per kg
-    input_df_row[REVENUE_PER_KG] = net_rev / weight.replace(0, np.nan)
-    
-    input_df_row[FUEL_COSTS_PER_KM] = fuel / km.replace(0, np.nan)
-    input_df_row[FIXED_COSTS_PER_KM] = fixed / km.replace(0, np.nan)
+    # One join instead of a .loc lookup per scenario
+    means = truck_type_means.reindex(columns=NUMERICAL_FEATURES)
+    base = means.reindex(input_df[TRUCK_TYPE].to_numpy()).reset_index(drop=True)
+    base = base.fillna(means.mean())
+
+    for col in NUMERICAL_FEATURES:
+        if col in scenarios.columns:
+            input_df[col] = pd.to_numeric(scenarios[col], errors='coerce').fillna(base[col])
+        else:
+            input_df[col] = base[col]
+
+    km = input_df[DISTANCE_KM].fillna(0)
+    liters = input_df[LITERS].fillna(1) # avoid div by zero default
+    fuel = input_df[FUEL].fillna(0)
+    maint = input_df[MAINTENANCE].fillna(0)
+    fixed = input_df[FIXED_COSTS].fillna(0)
+    net_rev = input_df[NET_REVENUE].fillna(0)
+    weight = input_df[WEIGHT_KG].fillna(1) # avoid div by zero default
+
+    km_nz = km.replace(0, np.nan)
+    liters_nz = liters.replace(0, np.nan)
+    weight_nz = weight.replace(0, np.nan)
 
-    # Fill any NaNs created by division by zero with 0
-    input_df_row = input_df_row.fillna(0)
+    # Same formulas as create_scenario_input
+    input_df[KM_PER_LITER] = km / liters_nz
+    input_df[MAINTENANCE_PER_KM] = maint / km_nz
+    input_df[TOTAL_COST] = fuel + maint + fixed
+    total_cost = input_df[TOTAL_COST]
+    input_df[COST_PER_KM] = total_cost / km_nz
+    input_df[COSTS_PER_KG] = total_cost / weight_nz
+    input_df[REVENUE_PER_KM] = net_rev / km_nz
+    input_df[REVENUE_PER_KG] = net_rev / weight_nz
+    input_df[FUEL_COSTS_PER_KM] = fuel / km_nz
+    input_df[FIXED_COSTS_PER_KM] = fixed / km_nz
 
-    # Ensure only necessary columns for model are returned (plus identifiers if needed)
-    # The model expects CATEGORICAL + NUMERICAL (preprocessor handles selection but good to be clean)
-    return input_df_row
+    return input_df.fillna(0)
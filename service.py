@@ -0,0 +1,284 @@
+# service.py
+#
+# Standalone HTTP prediction service (stdlib asyncio, no web framework).
+#
+#   POST /predict   {"Truck Type": "BOX", "KM Traveled": 120}  -> {"Net Profit": ...}
+#                   or {"scenarios": [{...}, ...]}              -> {"Net Profit": [...]}
+#   GET  /metrics   request/batch counts, throughput, latency and batch size histograms
+#   GET  /health
+#
+# Concurrent requests are coalesced into micro-batches (up to --max-batch scenarios or
+# --max-wait-ms after the first one) and scored with one vectorized predict_batch call
+# in a worker thread, so the event loop keeps accepting requests during inference.
+# Scenarios are validated per request (400 on bad input); if a batch still fails, its
+# scenarios are rescored one by one so only the failing request gets the error.
+#
+# Usage: python service.py --port 8000 [--max-batch 256] [--max-wait-ms 5] [--workers 2]
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+import instrumentation
+from config import TRUCK_TYPE, NUMERICAL_FEATURES, DISTANCE_KM, LITERS, WEIGHT_KG
+
+MAX_BATCH = 256
+MAX_WAIT_MS = 5.0
+MAX_BODY_BYTES = 1 << 20
+# Overrides that derived features divide by; scenario_utils.create_scenario_frame turns
+# a zero into 0-valued ratios (as predict_scenario does), a negative makes no sense
+DIVISOR_FEATURES = [DISTANCE_KM, LITERS, WEIGHT_KG]
+
+
+class MicroBatcher:
+    """
+    Collects scenarios from concurrent callers and scores them together.
+    """
+
+    def __init__(self, score, max_batch=MAX_BATCH, max_wait_ms=MAX_WAIT_MS, workers=1):
+        self.score = score
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="predict")
+        self.workers = asyncio.Semaphore(workers)
+        self.queue = asyncio.Queue()
+        self.counts = {"requests": 0, "scenarios": 0, "batches": 0, "errors": 0}
+        self.batch_sizes = instrumentation.Histogram()
+        self.started = time.time()
+
+    async def predict(self, scenarios):
+        """
+        Scores a list of scenario dicts; returns their predictions in order.
+        """
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in scenarios]
+        for scenario, future in zip(scenarios, futures):
+            self.queue.put_nowait((scenario, future))
+        self.counts["requests"] += 1
+        self.counts["scenarios"] += len(scenarios)
+        return await asyncio.gather(*futures)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(batch) < self.max_batch:
+                # Take whatever is already queued, then wait out the rest of the window
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            # Wait for a free worker before taking the next batch, so batches keep
+            # growing under load instead of piling up in the executor
+            await self.workers.acquire()
+            loop.create_task(self._score(batch))
+
+    def _score_each(self, scenarios):
+        """
+        Scores scenarios one at a time: (True, prediction) or (False, exception) each.
+        """
+        results = []
+        for scenario in scenarios:
+            try:
+                results.append((True, self.score([scenario])[0]))
+            except Exception as e:
+                results.append((False, e))
+        return results
+
+    async def _score(self, batch):
+        scenarios = [scenario for scenario, _ in batch]
+        loop = asyncio.get_running_loop()
+        try:
+            with instrumentation.span("service.batch"):
+                predictions = await loop.run_in_executor(self.pool, self.score, scenarios)
+            results = [(True, prediction) for prediction in predictions]
+        except Exception as e:
+            # One bad scenario must not fail the other requests batched with it
+            results = [(False, e)] if len(batch) == 1 else await loop.run_in_executor(
+                self.pool, self._score_each, scenarios)
+        finally:
+            self.workers.release()
+        for (_, future), (ok, value) in zip(batch, results):
+            if future.done():
+                continue
+            if ok:
+                try:
+                    value = float(value)
+                except (TypeError, ValueError) as e:
+                    ok, value = False, e
+            if ok:
+                future.set_result(value)
+            else:
+                self.counts["errors"] += 1
+                future.set_exception(value)
+        self.counts["batches"] += 1
+        self.batch_sizes.add(len(batch))
+
+    def metrics(self):
+        uptime = time.time() - self.started
+        batches = self.batch_sizes.summary()
+        batches = {k.replace("_ms", ""): v for k, v in batches.items() if k != "buckets"}
+        return {
+            "uptime_s": uptime,
+            **self.counts,
+            "requests_per_s": self.counts["requests"] / uptime if uptime else None,
+            "batch_size": batches,
+            "latency": instrumentation.snapshot()["latency"],
+            "config": {"max_batch": self.max_batch, "max_wait_ms": self.max_wait * 1000},
+        }
+
+
+def make_scorer():
+    """
+    Loads the served model and the truck type defaults once; returns scenarios -> predictions.
+    """
+    from data_loader import load_raw_data
+    from preprocessing import preprocess_data
+    from predict import get_pipeline, predict_batch
+    from scenario_utils import truck_type_defaults
+
+    get_pipeline()
+    truck_type_means = truck_type_defaults(preprocess_data(*load_raw_data())[0])
+
+    def score(scenarios):
+        return predict_batch(pd.DataFrame(scenarios), truck_type_means).to_numpy()
+    return score
+
+
+def _parse_scenarios(body):
+    payload = json.loads(body or b"{}")
+    single = isinstance(payload, dict) and "scenarios" not in payload
+    scenarios = [payload] if single else payload.get("scenarios") if isinstance(payload, dict) else payload
+    if not isinstance(scenarios, list) or not scenarios or not all(isinstance(s, dict) for s in scenarios):
+        raise ValueError("expected a scenario object or {\"scenarios\": [objects]}")
+    for scenario in scenarios:
+        _check_scenario(scenario)
+    return scenarios, single
+
+
+def _finite(value):
+    try:
+        return math.isfinite(value)
+    except OverflowError:  # JSON integers beyond float range
+        return False
+
+
+def _check_scenario(scenario):
+    """
+    Raises ValueError unless the scenario has a Truck Type and only finite numeric
+    feature overrides (null keeps the default), not negative where they are divisors.
+    """
+    if not isinstance(scenario.get(TRUCK_TYPE), str) or not scenario[TRUCK_TYPE]:
+        raise ValueError(f"each scenario needs a '{TRUCK_TYPE}' string")
+    for name, value in scenario.items():
+        if name == TRUCK_TYPE or value is None:
+            continue
+        if name not in NUMERICAL_FEATURES:
+            raise ValueError(f"unknown feature '{name}'")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not _finite(value):
+            raise ValueError(f"'{name}' must be a finite number")
+        if name in DIVISOR_FEATURES and value < 0:
+            raise ValueError(f"'{name}' must not be negative")
+
+
+async def _read_request(reader):
+    """
+    Returns (method, path, headers, body), or None when the client closed the connection.
+    """
+    line = await reader.readline()
+    if not line:
+        return None
+    method, path, _ = line.decode("latin-1").split(" ", 2)
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        headers[name.strip().lower()] = value.strip()
+    length = int(headers.get("content-length", 0))
+    if length > MAX_BODY_BYTES:
+        raise ValueError("request body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, path, headers, body
+
+
+def _response(status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    reason = {200: "OK", 400: "Bad Request", 404: "Not Found", 500: "Internal Server Error"}[status]
+    head = (f"HTTP/1.1 {status} {reason}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\nConnection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+async def handle(batcher, method, path, body):
+    if method == "GET" and path == "/health":
+        return 200, {"status": "ok"}
+    if method == "GET" and path == "/metrics":
+        return 200, batcher.metrics()
+    if method == "POST" and path == "/predict":
+        try:
+            scenarios, single = _parse_scenarios(body)
+        except ValueError as e:
+            return 400, {"error": str(e)}
+        with instrumentation.span("service.request"):
+            predictions = await batcher.predict(scenarios)
+        return 200, {"Net Profit": predictions[0] if single else predictions}
+    return 404, {"error": f"no route for {method} {path}"}
+
+
+async def serve_connection(batcher, reader, writer):
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except (ValueError, asyncio.IncompleteReadError) as e:
+                writer.write(_response(400, {"error": str(e) or "malformed request"}, False))
+                break
+            if request is None:
+                break
+            method, path, headers, body = request
+            keep_alive = headers.get("connection", "").lower() != "close"
+            try:
+                status, payload = await handle(batcher, method, path, body)
+            except Exception as e:
+                status, payload = 500, {"error": str(e)}
+            writer.write(_response(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def main(host, port, max_batch, max_wait_ms, workers):
+    batcher = MicroBatcher(make_scorer(), max_batch, max_wait_ms, workers)
+    server = await asyncio.start_server(lambda r, w: serve_connection(batcher, r, w), host, port)
+    print(f"Serving predictions on http://{host}:{port} (max batch {max_batch}, max wait {max_wait_ms} ms)")
+    async with server:
+        await asyncio.gather(server.serve_forever(), batcher.run())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP prediction service with request micro-batching.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--workers", type=int, default=1, help="inference threads")
+    args = parser.parse_args()
+    asyncio.run(main(args.host, args.port, args.max_batch, args.max_wait_ms, args.workers))
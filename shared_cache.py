@@ -0,0 +1,106 @@
+# shared_cache.py
+#
+# Cross-process frame cache for several app workers on one host. st.cache_data and
+# st.cache_resource are per process, so without this every replica parses the sources
+# and runs preprocess_data itself and holds its own copy of the results.
+#
+# The first worker to ask for a (name, version) takes an exclusive file lock, builds
+# the frames and writes them as uncompressed Arrow files plus a manifest;
+# workers arriving meanwhile block on the lock and then attach to the finished files.
+# Frames are memory-mapped with zero_copy, so numeric columns are read-only views of
+# the OS page cache, shared by all workers instead of duplicated per process.
+#
+#   data/.cache/shared/<name>/<version>/<frame>.arrow
+#   data/.cache/shared/<name>/<version>/manifest.json    written last: the version is complete
+#   data/.cache/shared/<name>/<version>.lock
+
+import json
+import os
+import shutil
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: no locking, concurrent first builds just overwrite each other
+    fcntl = None
+
+from ingest import load_frame, save_frame, save_json
+
+SHARED_DIR = os.path.join("data", ".cache", "shared")
+
+
+@contextmanager
+def file_lock(path):
+    """
+    Exclusive advisory lock on `path`, held for the duration of the block. The OS
+    releases it if the holder dies, so a crashed build never blocks the others.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_manifest(version_dir):
+    try:
+        with open(os.path.join(version_dir, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _attach(version_dir, manifest):
+    frames = {}
+    for name, index in manifest["frames"].items():
+        frame = load_frame(os.path.join(version_dir, f"{name}.arrow"), zero_copy=True)
+        frames[name] = frame.set_index(index) if index else frame
+    return frames
+
+
+def _publish(version_dir, frames):
+    manifest = {"frames": {}}
+    for name, frame in frames.items():
+        # Non-default indexes (e.g. the stats cube's levels) are stored as columns
+        index = [] if frame.index.names == [None] else list(frame.index.names)
+        save_frame(frame.reset_index() if index else frame, os.path.join(version_dir, f"{name}.arrow"))
+        manifest["frames"][name] = index
+    save_json(manifest, os.path.join(version_dir, "manifest.json"))
+
+
+def _prune(name_dir, keep):
+    """
+    Removes the files of other versions (superseded datasets). Workers still mapping
+    them keep their pages until they move on: unlinking a mapped file is safe.
+    """
+    for entry in os.listdir(name_dir):
+        if entry != keep and not entry.endswith(".lock"):
+            shutil.rmtree(os.path.join(name_dir, entry), ignore_errors=True)
+
+
+def shared_frames(name, version, build, shared_dir=SHARED_DIR):
+    """
+    Returns {frame name: frame} for (name, version), running build() -> {frame name: frame}
+    at most once across all processes sharing `shared_dir`. Attached frames are read-only.
+    """
+    name_dir = os.path.join(shared_dir, name)
+    version_dir = os.path.join(name_dir, version)
+    manifest = _read_manifest(version_dir)
+    if manifest is None:
+        with file_lock(os.path.join(name_dir, f"{version}.lock")):
+            # Another worker may have finished while we waited for the lock
+            manifest = _read_manifest(version_dir)
+            if manifest is None:
+                print(f"Building shared frames {name} for {version}")
+                _publish(version_dir, build())
+                _prune(name_dir, version)
+                manifest = _read_manifest(version_dir)
+    return _attach(version_dir, manifest)
+
+
+def clear(shared_dir=SHARED_DIR):
+    shutil.rmtree(shared_dir, ignore_errors=True)
@@ -0,0 +1,58 @@
+# stats_cube.py
+#
+# Materialized per-truck-type statistics, computed once per dataset version:
+#
+#   by_type        rows (Truck Type, stat),         columns NUMERICAL_FEATURES
+#   by_type_month  rows (Truck Type, Period, stat), columns NUMERICAL_FEATURES
+#
+# stat is one of STATS. The app builds the cube with the rest of the dataset and shares
+# it between workers and restarts (see dataset.py and shared_cache.py); widget
+# interactions only index into it.
+
+import pandas as pd
+
+from config import NUMERICAL_FEATURES, TRUCK_TYPE
+
+STATS = ["count", "mean", "min", "q25", "median", "q75", "max"]
+LEVELS = {"by_type": [TRUCK_TYPE], "by_type_month": [TRUCK_TYPE, "Period"]}
+
+
+def describe(df, keys, columns=NUMERICAL_FEATURES):
+    """
+    STATS of `columns` per group of `keys`, as rows (*keys, stat).
+    """
+    grouped = df.groupby(keys, observed=True)[columns]
+    parts = {
+        "count": grouped.count(),
+        "mean": grouped.mean(),
+        "min": grouped.min(),
+        "q25": grouped.quantile(0.25),
+        "median": grouped.median(),
+        "q75": grouped.quantile(0.75),
+        "max": grouped.max(),
+    }
+    cube = pd.concat(parts, names=["stat"]).astype("float64")
+    # Put the stat level last so cube.xs(stat, level="stat") gives one row per group
+    cube = cube.reorder_levels(keys + ["stat"]).sort_index()
+    return cube
+
+
+def build_cube(df, periods=None):
+    """
+    Returns {"by_type": ..., "by_type_month": ...} from the truck-level frame `df`
+    (preprocess_data) and optionally the truck x month frame `periods`
+    (periods.aggregate_periods).
+    """
+    cube = {"by_type": describe(df, LEVELS["by_type"])}
+    if periods is not None and not periods.empty:
+        cube["by_type_month"] = describe(periods, LEVELS["by_type_month"])
+    return cube
+
+
+def stat(cube, name, level="by_type"):
+    """
+    One statistic as a frame indexed by the level's keys, e.g.
+    stat(cube, "mean") is the truck type means used for scenario defaults.
+    """
+    return cube[level].xs(name, level="stat")
+
@@ -0,0 +1,68 @@
+# streaming.py
+#
+# Chunked variant of preprocess_data for fFreight files larger than memory: freight is
+# read in bounded batches, each batch is cleaned and joined against the (small) vehicle
+# and customer dimensions and reduced straight into the truck and city aggregates.
+
+import pandas as pd
+
+from incremental import empty_state, fold, refresh_features, results
+
+# Cleaning copies a batch and the two joins widen it, so a batch needs several times
+# its raw in-memory size while it is being processed
+BATCH_OVERHEAD = 6
+MIN_CHUNK_ROWS = 1_000
+SAMPLE_ROWS = 5_000
+
+
+def estimate_chunk_rows(path, memory_limit_mb, **read_kwargs):
+    """
+    Number of freight rows per batch that keeps processing under memory_limit_mb.
+    """
+    sample = pd.read_csv(path, nrows=SAMPLE_ROWS, **read_kwargs)
+    if sample.empty:
+        return MIN_CHUNK_ROWS
+    bytes_per_row = sample.memory_usage(index=False, deep=True).sum() / len(sample)
+    rows = int(memory_limit_mb * 1024 * 1024 / (bytes_per_row * BATCH_OVERHEAD))
+    return max(rows, MIN_CHUNK_ROWS)
+
+
+def preprocess_chunked(vehicles, customers, f_cost, freight_path, memory_limit_mb=256, chunk_rows=None,
+                       **read_kwargs):
+    """
+    Same output as preprocess_data(vehicles, customers, f_cost, pd.read_csv(freight_path,
+    **read_kwargs)) without ever holding the whole freight file. Batches are summed
+    separately, so values may differ in the last bits (rtol 1e-12, see
+    tests/test_streaming.py).
+    """
+    if chunk_rows is None:
+        chunk_rows = estimate_chunk_rows(freight_path, memory_limit_mb, **read_kwargs)
+    print(f"Reading {freight_path} in batches of {chunk_rows:,} rows")
+
+    state = empty_state()
+    touched = fold(state, vehicles, customers, f_cost=f_cost, refresh=False)
+    with pd.read_csv(freight_path, chunksize=chunk_rows, **read_kwargs) as reader:
+        for chunk in reader:
+            touched = touched.union(fold(state, vehicles, customers, f_freight=chunk, refresh=False))
+    # Derived features only depend on the final sums
+    refresh_features(state, touched)
+    return results(state, customers)
+
+
+def load_preprocessed_chunked(data_dir="data", memory_limit_mb=256):
+    """
+    Streaming counterpart of preprocess_data(*load_raw_data()): the same sources and
+    columns (every cost workbook, see data_loader.cost_paths), checked the same way.
+    """
+    from data_loader import raw_tables, check_columns, stack_costs
+    from ingest import read_sources
+
+    # Everything but fFreight goes through the columnar cache; a usecols list makes
+    # read_csv itself raise on missing freight columns
+    *tables, (freight_path, _, freight_kwargs) = raw_tables(data_dir)
+    frames, report = read_sources(tables)
+    check_columns(report)
+    vehicles, customers, *costs = frames
+    return preprocess_chunked(
+        vehicles, customers, stack_costs(costs), freight_path, memory_limit_mb, **freight_kwargs
+    )
@@ -0,0 +1,193 @@
+# sweeps.py
+#
+# What-if sensitivity sweeps: predicted Net Profit over a grid of one or two scenario
+# variables (e.g. KM Traveled x Weight (Kg)) for every truck type. The grid of
+# scenarios is never built in full: sweep_batches yields it batch_size rows at a time
+# and each batch is scored with predict_batch, so memory stays bounded by the batch
+# size; only the result (one float per grid point) is kept. Variables that are not
+# swept take the truck type's averages, as in create_scenario_input.
+
+import numpy as np
+import pandas as pd
+
+from config import DISTANCE_KM, WEIGHT_KG, GOODS_VALUE, TRUCK_TYPE, TARGET
+from predict import predict_batch
+
+SWEEP_VARIABLES = [DISTANCE_KM, WEIGHT_KG, GOODS_VALUE]
+BATCH_SIZE = 20_000  # ~70 MB peak while scoring a batch
+
+
+def sweep_batches(truck_types, axes, base=None, batch_size=BATCH_SIZE):
+    """
+    Yields (offset, scenarios) covering every (truck type, *axis values) point in C
+    order (truck type slowest), batch_size rows at a time. `axes` maps each swept
+    variable to its values; `base` holds fixed overrides for other variables.
+    """
+    types = np.asarray(list(truck_types), dtype=object)
+    values = [np.asarray(v, dtype=np.float64) for v in axes.values()]
+    shape = (len(types),) + tuple(len(v) for v in values)
+    total = int(np.prod(shape))
+    for start in range(0, total, batch_size):
+        index = np.unravel_index(np.arange(start, min(start + batch_size, total)), shape)
+        batch = pd.DataFrame({TRUCK_TYPE: types[index[0]]})
+        for col, value in (base or {}).items():
+            batch[col] = value
+        for col, vals, i in zip(axes, values, index[1:]):
+            batch[col] = vals[i]
+        yield start, batch
+
+
+def _cell_edges(values):
+    """
+    Boundaries of the heatmap cells centered on sorted grid values (len(values) + 1).
+    """
+    mid = (values[1:] + values[:-1]) / 2
+    first = values[0] - (mid[0] - values[0]) if len(mid) else values[0] - 0.5
+    last = values[-1] + (values[-1] - mid[-1]) if len(mid) else values[-1] + 0.5
+    return np.concatenate([[first], mid, [last]])
+
+
+class Sweep:
+    """
+    Predicted Net Profit on a grid: `profit` is shaped (truck types, *axes) for the
+    one or two swept variables in `axes` ({variable: values}, the first one is x).
+    """
+
+    def __init__(self, truck_type_means, axes, truck_types=None, base=None, batch_size=BATCH_SIZE):
+        if not 1 <= len(axes) <= 2:
+            raise ValueError("Sweep one or two variables")
+        self.truck_types = list(truck_type_means.index if truck_types is None else truck_types)
+        self.axes = {col: np.asarray(vals, dtype=np.float64) for col, vals in axes.items()}
+        shape = (len(self.truck_types),) + tuple(len(v) for v in self.axes.values())
+        profit = np.empty(int(np.prod(shape)))
+        for start, batch in sweep_batches(self.truck_types, self.axes, base, batch_size):
+            profit[start:start + len(batch)] = predict_batch(batch, truck_type_means, chunk_size=batch_size).to_numpy()
+        self.profit = profit.reshape(shape)
+
+    @property
+    def x(self):
+        return next(iter(self.axes))
+
+    @property
+    def y(self):
+        return list(self.axes)[1] if len(self.axes) == 2 else None
+
+    def curves(self):
+        """
+        One variable: Net Profit per x value (rows) and truck type (columns).
+        """
+        if self.y is not None:
+            raise ValueError("curves() is for one-variable sweeps; use grid() or break_even()")
+        return pd.DataFrame(self.profit.T, index=pd.Index(self.axes[self.x], name=self.x), columns=self.truck_types)
+
+    def grid(self, truck_type):
+        """
+        Two variables: Net Profit of one truck type, rows y values and columns x values.
+        """
+        profit = self.profit[self.truck_types.index(truck_type)]
+        return pd.DataFrame(profit.T, index=pd.Index(self.axes[self.y], name=self.y),
+                            columns=pd.Index(self.axes[self.x], name=self.x))
+
+    def break_even(self):
+        """
+        x at which Net Profit first changes sign (linearly interpolated between grid
+        points), NaN where it never does: a Series per truck type for one variable, a
+        frame of curves (rows y values, columns truck types) for two.
+        """
+        x = self.axes[self.x]
+        # Put x last: (truck types, [y,] x)
+        profit = np.moveaxis(self.profit, 1, -1)
+        positive = profit >= 0
+        change = positive[..., 1:] != positive[..., :-1]
+        first = np.argmax(change, axis=-1)[..., None]
+        p0 = np.take_along_axis(profit, first, axis=-1)[..., 0]
+        p1 = np.take_along_axis(profit, first + 1, axis=-1)[..., 0]
+        x0, x1 = x[first[..., 0]], x[first[..., 0] + 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            crossing = np.where(change.any(axis=-1), x0 - p0 * (x1 - x0) / (p1 - p0), np.nan)
+        name = f"Break-even {self.x}"
+        if self.y is None:
+            return pd.Series(crossing, index=pd.Index(self.truck_types, name=TRUCK_TYPE), name=name)
+        curves = pd.DataFrame(crossing.T, index=pd.Index(self.axes[self.y], name=self.y), columns=self.truck_types)
+        curves.columns.name = name
+        return curves
+
+    def heatmap_spec(self, truck_type):
+        """
+        Two variables: Vega-Lite spec (for st.vega_lite_chart, so the app needs no
+        plotting library) of grid(truck_type) as a heatmap, losses red and profits
+        green split at 0, with the break-even curve drawn over it.
+        """
+        grid = self.grid(truck_type)
+        x_edges, y_edges = _cell_edges(self.axes[self.x]), _cell_edges(self.axes[self.y])
+        xi, yi = np.meshgrid(np.arange(len(grid.columns)), np.arange(len(grid.index)))
+        cells = pd.DataFrame({
+            "x": x_edges[xi.ravel()], "x2": x_edges[xi.ravel() + 1],
+            "y": y_edges[yi.ravel()], "y2": y_edges[yi.ravel() + 1],
+            TARGET: grid.to_numpy().ravel(),
+        })
+        curve = self.break_even()[truck_type].dropna()
+        curve = pd.DataFrame({"x": curve.to_numpy(), "y": curve.index.to_numpy()})
+        x_axis = {"field": "x", "type": "quantitative", "title": self.x, "scale": {"zero": False, "nice": False}}
+        y_axis = {"field": "y", "type": "quantitative", "title": self.y, "scale": {"zero": False, "nice": False}}
+        return {
+            "title": f"Predicted {TARGET} ({truck_type})",
+            "layer": [
+                {
+                    "data": {"values": cells.to_dict("records")},
+                    "mark": "rect",
+                    "encoding": {
+                        "x": x_axis, "x2": {"field": "x2"}, "y": y_axis, "y2": {"field": "y2"},
+                        "color": {"field": TARGET, "type": "quantitative",
+                                  "scale": {"scheme": "redyellowgreen", "domainMid": 0}},
+                        "tooltip": [{"field": TARGET, "type": "quantitative", "format": ",.0f"}],
+                    },
+                },
+                {
+                    "data": {"values": curve.to_dict("records")},
+                    "mark": {"type": "line", "color": "black"},
+                    "encoding": {"x": x_axis, "y": y_axis, "order": {"field": "y"}},
+                },
+            ],
+        }
+
+    def to_frame(self):
+        """
+        Long format: one row per grid point with Truck Type, the swept variables and TARGET.
+        """
+        index = pd.MultiIndex.from_product([self.truck_types, *self.axes.values()], names=[TRUCK_TYPE, *self.axes])
+        return pd.DataFrame({TARGET: self.profit.ravel()}, index=index).reset_index()
+
+
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    from data_loader import load_raw_data
+    from preprocessing import preprocess_data
+    from scenario_utils import truck_type_defaults
+
+    parser = argparse.ArgumentParser(description="Net Profit sensitivity to one or two scenario variables.")
+    parser.add_argument("--x", nargs=4, required=True, metavar=("VARIABLE", "START", "STOP", "STEPS"))
+    parser.add_argument("--y", nargs=4, metavar=("VARIABLE", "START", "STOP", "STEPS"))
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("-o", "--output", help="CSV or Parquet for the full grid (long format)")
+    args = parser.parse_args()
+
+    axes = {}
+    for spec in filter(None, [args.x, args.y]):
+        axes[spec[0]] = np.linspace(float(spec[1]), float(spec[2]), int(spec[3]))
+
+    df, _ = preprocess_data(*load_raw_data())
+    means = truck_type_defaults(df)
+    start = time.perf_counter()
+    sweep = Sweep(means, axes, batch_size=args.batch_size)
+    print(f"Scored {sweep.profit.size:,} points in {time.perf_counter() - start:.2f}s")
+    print(sweep.break_even())
+
+    if args.output:
+        frame = sweep.to_frame()
+        if args.output.endswith(".parquet"):
+            frame.to_parquet(args.output, index=False)
+        else:
+            frame.to_csv(args.output, index=False)
@@ -0,0 +1,81 @@
+# tests/conftest.py
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CITIES = {"Mineola": (38.89, -91.57), "Bayport": (40.74, -73.05), "Suwanee": (34.05, -84.07)}
+
+
+def make_raw(seed=0, trucks=6, n_customers=30, months=4, trips=600):
+    """
+    Small (vehicles, customers, f_cost, f_freight) shaped like load_raw_data's output:
+    cost numbers as Excel objects, freight numbers as text with "," decimals.
+    """
+    rng = np.random.default_rng(seed)
+    vehicles = pd.DataFrame({
+        "Truck ID": np.arange(1, trucks + 1),
+        "Plate": [f"PLT-{i:04d}" for i in range(trucks)],
+        "Brand": rng.choice(["VW", "Volvo"], trucks),
+        "Truck Type": (["TRUCK", "SEMI-TRAILER"] * trucks)[:trucks],
+        "Trailers Type": "Reefer",
+        "Year": rng.integers(2008, 2018, trucks),
+    })
+    cities = rng.choice(list(CITIES), n_customers)
+    customers = pd.DataFrame({
+        "Customer ID": np.arange(1, n_customers + 1),
+        "City": cities,
+        "State": "KY",
+        "Latitude": [CITIES[c][0] for c in cities],
+        "Longitude": [CITIES[c][1] for c in cities],
+    })
+    dates = pd.date_range("2018-01-01", periods=months, freq="MS")
+    f_cost = pd.DataFrame({
+        "Date": np.repeat(dates, trucks).to_pydatetime(),
+        "Truck ID": np.tile(vehicles["Truck ID"], months),
+        "Drive ID": np.tile(np.arange(trucks), months),
+        "KM Traveled": rng.integers(1000, 7000, trucks * months),
+        "Liters": rng.uniform(300, 2000, trucks * months).round(2),
+        "Fuel": rng.uniform(1000, 7000, trucks * months).round(2),
+        "Maintenance": rng.uniform(100, 2000, trucks * months).round(2),
+        "Fixed Costs": rng.uniform(5000, 15000, trucks * months),
+    }).astype(object)
+    customer = rng.integers(1, n_customers + 1, trips)
+    f_freight = pd.DataFrame({
+        "Date": dates[rng.integers(0, months, trips)].strftime("%Y/%m/%d"),
+        "Customer ID": customer,
+        "Truck ID": rng.integers(1, trucks + 1, trips),
+        "Invoice Number": np.arange(700000, 700000 + trips),
+        "Freight ID": "x",
+        "City": cities[customer - 1],
+        "Net Revenue": [f"{v:.2f}".replace(".", ",") for v in rng.uniform(1, 20, trips)],
+        "Weight (Kg)": [f"{v:.2f}".replace(".", ",") for v in rng.uniform(1, 10, trips)],
+        "Weight (Cubic)": rng.integers(1, 7, trips),
+        "Goods Value": [f"{v:.2f}".replace(".", ",") for v in rng.uniform(100, 500, trips)],
+    })
+    return vehicles, customers, f_cost, f_freight
+
+
+def write_sources(data_dir, raw, costs):
+    """
+    Writes the raw frames as the files load_raw_data reads; `costs` maps a cost
+    workbook name to its frame.
+    """
+    vehicles, customers, _, f_freight = raw
+    with pd.ExcelWriter(data_dir / "DimensionTables.xlsx") as writer:
+        vehicles.to_excel(writer, sheet_name="Vehicles", index=False)
+        customers.to_excel(writer, sheet_name="Customers", index=False)
+    for name, f_cost in costs.items():
+        f_cost.to_excel(data_dir / name, index=False, startrow=2)
+    f_freight.to_csv(data_dir / "fFreight.csv", index=False)
+
+
+@pytest.fixture
+def raw():
+    return make_raw()
@@ -0,0 +1,37 @@
+# tests/test_cleaning.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_cleaning import legacy_clean_num
+from cleaning import COST_SCHEMA, FREIGHT_SCHEMA, clean_numeric
+
+EDGE_VALUES = [None, np.nan, "nan", "", " ", "1.234,5", "1,234", "7,42", "12", " 12 ", "abc",
+               True, False, np.True_, 7, 0, 1, 3.5, -2.25]
+TEXT_VALUES = [v for v in EDGE_VALUES if isinstance(v, str) or v is None]
+
+
+def legacy(df, schema):
+    return pd.DataFrame({
+        col: legacy_clean_num(df, col, spec.dtype, replace_comma_dot=spec.decimal == ",",
+                              replace_comma_empty=spec.thousands == ",")
+        for col, spec in schema.items()
+    })
+
+
+@pytest.mark.parametrize("schema", [COST_SCHEMA, FREIGHT_SCHEMA], ids=["costs", "freight"])
+@pytest.mark.parametrize("kind", ["object", "category", "string", "bool"])
+def test_clean_numeric_matches_legacy_clean_num(schema, kind):
+    if kind == "object":
+        column = pd.Series(EDGE_VALUES, dtype=object)
+    elif kind == "category":
+        column = pd.Series([str(v) if isinstance(v, bool) else v for v in EDGE_VALUES]).astype("category")
+    elif kind == "string":
+        column = pd.Series(TEXT_VALUES, dtype="string")
+    else:
+        column = pd.Series([True, False, True])
+    df = pd.DataFrame({col: column for col in schema})
+
+    cleaned, _ = clean_numeric(df, schema)
+    pd.testing.assert_frame_equal(cleaned[list(schema)], legacy(df, schema))
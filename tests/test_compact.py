@@ -0,0 +1,53 @@
+# tests/test_compact.py
+
+import pandas as pd
+
+from cleaning import COST_SCHEMA, FREIGHT_SCHEMA
+from compact import compact_frame, memory_mb
+from preprocessing import clean_costs, clean_freight, preprocess_data
+from validation import validate
+
+
+def _lean(raw):
+    vehicles, customers, f_cost, f_freight = raw
+    # As load_raw_data(lean=True)
+    return (compact_frame(vehicles), compact_frame(customers),
+            compact_frame(f_cost, numbers=COST_SCHEMA), compact_frame(f_freight, numbers=FREIGHT_SCHEMA))
+
+
+def test_lean_dates_parse_to_datetimes(raw):
+    _, _, f_cost, f_freight = _lean(raw)
+    assert isinstance(f_freight["Date"].dtype, pd.CategoricalDtype)
+    for cleaned in (clean_costs(f_cost.copy()), clean_freight(f_freight.copy())):
+        assert pd.api.types.is_datetime64_any_dtype(cleaned["Date"])
+        assert cleaned["Date"].dt.month.notna().all()
+
+
+def test_lean_preprocess_matches_full(raw):
+    full = preprocess_data(*raw)
+    lean = preprocess_data(*_lean(raw), lean=True)
+    for expected, actual in zip(full, lean):
+        pd.testing.assert_frame_equal(actual, expected, check_dtype=False, check_categorical=False, rtol=1e-6)
+
+
+def test_value_columns_are_parsed_when_all_numbers(raw):
+    _, _, f_cost, f_freight = raw
+    _, _, lean_cost, lean_freight = _lean(raw)
+    for col in list(COST_SCHEMA) + list(FREIGHT_SCHEMA):
+        frame = lean_cost if col in COST_SCHEMA else lean_freight
+        assert pd.api.types.is_numeric_dtype(frame[col]), col
+    assert memory_mb(lean_cost) * 3 < memory_mb(f_cost)
+    assert memory_mb(lean_freight) * 2.5 < memory_mb(f_freight)
+
+
+def test_text_in_value_columns_is_kept_for_validation(raw):
+    vehicles, customers, f_cost, f_freight = raw
+    f_cost = f_cost.copy()
+    f_cost.loc[3, "Fuel"] = "n/a"
+    f_cost.loc[5] = list(f_cost.columns)  # repeated header row
+    lean = _lean((vehicles, customers, f_cost, f_freight))
+    assert lean[2]["Fuel"].dtype == object
+
+    full, compact = validate(vehicles, customers, f_cost, f_freight), validate(*lean)
+    pd.testing.assert_frame_equal(compact.summary, full.summary)
+    pd.testing.assert_frame_equal(compact.reasons, full.reasons)
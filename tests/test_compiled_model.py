@@ -0,0 +1,72 @@
+# tests/test_compiled_model.py
+
+import os
+
+import numpy as np
+import pytest
+
+from compiled_model import CURRENT_FILE, export_compiled, load_compiled, parity_sample, save_compiled
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PICKLE_PATH = os.path.join(REPO_DIR, "data", "model_pipeline.pkl")
+COMPILED_PATH = os.path.join(REPO_DIR, "data", "model_compiled")
+
+
+@pytest.fixture(scope="module")
+def models():
+    joblib = pytest.importorskip("joblib")
+    if not (os.path.exists(PICKLE_PATH) and os.path.exists(COMPILED_PATH)):
+        pytest.skip("shipped model not present")
+    return joblib.load(PICKLE_PATH), load_compiled(COMPILED_PATH)
+
+
+def test_compiled_matches_sklearn(models):
+    pipeline, compiled = models
+    # Random rows plus NaN in each feature, an unseen Truck Type and all-zero features
+    X = parity_sample(compiled, n=500, seed=7)
+    assert X.isna().any().any() and (X[compiled.meta["numerical"]] == 0).all(axis=1).any()
+    np.testing.assert_allclose(compiled.predict(X), pipeline.predict(X), rtol=1e-9, atol=1e-6)
+
+
+def test_single_rows_match_sklearn(models):
+    pipeline, compiled = models
+    X = parity_sample(compiled, n=5, seed=3)
+    for i in range(len(X)):
+        row = X.iloc[[i]]
+        np.testing.assert_allclose(compiled.predict(row), pipeline.predict(row), rtol=1e-9, atol=1e-6)
+
+
+def test_save_swaps_whole_export(tmp_path):
+    path = str(tmp_path / "compiled")
+    meta = {"categorical": [], "categories": [], "numerical": ["x"], "kind": "linear",
+            "intercept": 1.0, "format_version": 2}
+    arrays = {"cat_offsets": np.array([0]), "num_mean": np.zeros(1), "num_scale": np.ones(1)}
+    save_compiled(meta, {**arrays, "coef": np.array([2.0])}, path)
+    first = open(os.path.join(path, CURRENT_FILE)).read()
+    save_compiled(meta, {**arrays, "coef": np.array([3.0])}, path)
+
+    assert sorted(os.listdir(path)) == sorted([CURRENT_FILE, open(os.path.join(path, CURRENT_FILE)).read()])
+    assert first not in os.listdir(path)
+    assert load_compiled(path).arrays["coef"][0] == 3.0
+
+
+def test_uncompilable_model_only_retires_its_own_export(models, tmp_path):
+    from sklearn.dummy import DummyRegressor
+    from sklearn.pipeline import Pipeline
+
+    pipeline, compiled = models
+    path = str(tmp_path / "compiled")
+    served, other = tmp_path / "served.pkl", tmp_path / "other.pkl"
+    served.write_bytes(b"served")
+    other.write_bytes(b"other")
+    export_compiled(pipeline, parity_sample(compiled, n=50), path, source_path=str(served))
+    dummy = Pipeline([("preprocessor", pipeline.named_steps["preprocessor"]), ("model", DummyRegressor())])
+
+    # A different pickle (e.g. a comparison candidate) leaves the served export alone
+    assert export_compiled(dummy, None, path, source_path=str(other)) is None
+    assert export_compiled(dummy, None, path) is None
+    assert load_compiled(path).meta["numerical"] == compiled.meta["numerical"]
+
+    # The same pickle turning uncompilable retires its export, not the directory
+    assert export_compiled(dummy, None, path, source_path=str(served)) is None
+    assert os.path.isdir(path) and not os.listdir(path)
@@ -0,0 +1,30 @@
+# tests/test_data_loader.py
+
+import os
+
+import pytest
+
+from conftest import write_sources
+from data_loader import cost_paths, load_raw_data
+
+
+def test_cost_paths_skip_backups(tmp_path):
+    for name in ["fCosts_2024-02.xlsx", "fCosts_2024-01.xlsx", "fCosts_backup.xlsx",
+                 "fCosts_2024-01 (copy).xlsx", "old_fCosts.xlsx"]:
+        (tmp_path / name).touch()
+    assert [os.path.basename(p) for p in cost_paths(str(tmp_path))] == [
+        "fCosts_2024-01.xlsx", "fCosts_2024-02.xlsx"
+    ]
+
+
+def test_missing_cost_column_raises(raw, tmp_path):
+    f_cost = raw[2]
+    months = f_cost["Date"].astype(str).str[:7]
+    first, second = sorted(months.unique())[:2]
+    write_sources(tmp_path, raw, {
+        f"fCosts_{first}.xlsx": f_cost[months == first],
+        f"fCosts_{second}.xlsx": f_cost[months == second].drop(columns="Liters"),
+    })
+
+    with pytest.raises(ValueError, match=rf"fCosts_{second}\.xlsx: Liters"):
+        load_raw_data(str(tmp_path), max_workers=1)
@@ -0,0 +1,32 @@
+# tests/test_dataset.py
+
+import json
+import os
+import subprocess
+import sys
+
+import dataset
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Imported for caching and timing only; they don't change the frames
+NOT_VERSIONED = {"instrumentation"}
+
+
+def test_version_covers_every_module_building_the_dataset():
+    script = (
+        "import json, os, sys\n"
+        f"sys.path.insert(0, {REPO_DIR!r})\n"
+        "import dataset, fact_table\n"
+        "print(json.dumps(sorted(name for name, m in list(sys.modules.items())\n"
+        f"    if os.path.dirname(os.path.abspath(getattr(m, '__file__', None) or '/')) == {REPO_DIR!r})))\n"
+    )
+    loaded = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    modules = set(json.loads(loaded.stdout.strip().splitlines()[-1]))
+    assert modules - NOT_VERSIONED <= set(dataset.DATASET_MODULES)
+
+
+def test_version_changes_with_module_source(monkeypatch):
+    monkeypatch.setattr(dataset, "data_version", lambda data_dir: "data")
+    before = dataset.version()
+    monkeypatch.setattr(dataset, "DATASET_MODULES", dataset.DATASET_MODULES[:-1])
+    assert dataset.version() != before
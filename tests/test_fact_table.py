@@ -0,0 +1,51 @@
+# tests/test_fact_table.py
+
+import pandas as pd
+import pytest
+
+from fact_table import FactTable, build_facts
+from shared_cache import shared_frames
+
+# Inclusive bounds on the first day of a month, so rows on both edges count
+WINDOWS = [(None, None), ("2018-02-01", "2018-03-01"), ("2018-02-02", None), (None, "2018-01-01"),
+           ("2019-01-01", "2019-12-31")]
+
+
+@pytest.fixture(params=["built", "shared"])
+def facts(raw, tmp_path, request):
+    if request.param == "built":
+        return FactTable(build_facts(*raw))
+    # Memory-mapped from the published Arrow files, as the app reads them
+    return FactTable(shared_frames("facts", "v1", lambda: build_facts(*raw), str(tmp_path)))
+
+
+def between(df, start, end):
+    mask = pd.Series(True, index=df.index)
+    if start is not None:
+        mask &= df["Date"] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df["Date"] <= pd.Timestamp(end)
+    return mask
+
+
+def by_date(df):
+    return df.sort_values("Date", kind="stable")
+
+
+@pytest.mark.parametrize("start, end", WINDOWS)
+def test_truck_lookups_match_filtering(facts, start, end):
+    for truck in [1, 4, 99]:
+        for found, table in [(facts.trips(truck, start, end), facts.freight),
+                             (facts.truck_costs(truck, start, end), facts.costs)]:
+            expected = table[(table["Truck ID"] == truck) & between(table, start, end)]
+            pd.testing.assert_frame_equal(found, by_date(expected))
+
+
+@pytest.mark.parametrize("start, end", WINDOWS)
+def test_customer_and_date_lookups_match_filtering(facts, start, end):
+    freight, costs = facts.freight, facts.costs
+    for customer in [1, 7, 1000]:
+        expected = freight[(freight["Customer ID"] == customer) & between(freight, start, end)]
+        pd.testing.assert_frame_equal(facts.customer_freight(customer, start, end), by_date(expected))
+    pd.testing.assert_frame_equal(facts.freight_between(start, end), by_date(freight[between(freight, start, end)]))
+    pd.testing.assert_frame_equal(facts.costs_between(start, end), by_date(costs[between(costs, start, end)]))
@@ -0,0 +1,82 @@
+# tests/test_geo.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from geo import GridIndex, cities_within, customer_index, haversine_km
+
+# (lat, lon) query points, including both sides of the antimeridian and the poles
+QUERIES = [(38.9, -91.6), (0.0, 179.9), (-12.0, -179.8), (89.9, 10.0), (-89.7, -120.0), (60.0, 0.0)]
+
+
+@pytest.fixture
+def points():
+    rng = np.random.default_rng(0)
+    lat = np.degrees(np.arcsin(rng.uniform(-1, 1, 3000)))
+    lon = rng.uniform(-180, 180, 3000)
+    # Clusters straddling the antimeridian and around both poles
+    lat = np.r_[lat, rng.uniform(-5, 5, 200), rng.uniform(88, 90, 100), rng.uniform(-90, -88, 100)]
+    lon = np.r_[lon, rng.choice([-1, 1], 200) * rng.uniform(179, 180, 200), rng.uniform(-180, 180, 200)]
+    return lat, lon
+
+
+def brute_force(lat, lon, qlat, qlon):
+    return haversine_km(qlat, qlon, lat, lon)
+
+
+def test_haversine():
+    assert haversine_km(0, 0, 0, 0) == 0
+    # A quarter of a meridian
+    assert haversine_km(0, 0, 90, 0) == pytest.approx(np.pi * 6371.0088 / 2)
+    assert haversine_km(0, 179.5, 0, -179.5) == pytest.approx(haversine_km(0, 0, 0, 1))
+
+
+@pytest.mark.parametrize("radius_km", [10, 150, 800, 5000])
+@pytest.mark.parametrize("cell_deg", [0.5, 2.0])
+def test_within_matches_brute_force(points, radius_km, cell_deg):
+    lat, lon = points
+    index = GridIndex(lat, lon, cell_deg)
+    for qlat, qlon in QUERIES:
+        positions, dist = index.within(qlat, qlon, radius_km)
+        expected = brute_force(lat, lon, qlat, qlon)
+        assert set(positions) == set(np.flatnonzero(expected <= radius_km)), (qlat, qlon)
+        np.testing.assert_allclose(dist, expected[positions])
+        assert (np.diff(dist) >= 0).all()
+
+
+@pytest.mark.parametrize("k", [1, 5, 50])
+def test_nearest_matches_brute_force(points, k):
+    lat, lon = points
+    index = GridIndex(lat, lon)
+    for qlat, qlon in QUERIES:
+        positions, dist = index.nearest(qlat, qlon, k)
+        expected = np.sort(brute_force(lat, lon, qlat, qlon))[:k]
+        np.testing.assert_allclose(dist, expected)
+        np.testing.assert_allclose(brute_force(lat, lon, qlat, qlon)[positions], dist)
+
+
+def test_nearest_with_few_points():
+    index = GridIndex([10.0, -40.0], [20.0, 170.0])
+    positions, dist = index.nearest(0.0, 0.0, k=5)
+    assert list(positions) == [0, 1]
+    assert len(GridIndex([], []).nearest(0.0, 0.0)[0]) == 0
+
+
+def test_nan_coordinates_are_rejected():
+    with pytest.raises(ValueError):
+        GridIndex([1.0, np.nan], [1.0, 2.0])
+
+
+def test_cities_within():
+    customers = pd.DataFrame({
+        "Customer ID": [1, 2, 3, 4],
+        "City": ["Mineola", "Mineola", "Bayport", "Nowhere"],
+        "Latitude": [38.89, 38.90, 40.74, np.nan],
+        "Longitude": [-91.57, -91.58, -73.05, np.nan],
+    })
+    index, located = customer_index(customers)
+    cities = cities_within(index, located, 38.89, -91.57, 100)
+    assert cities["City"].tolist() == ["Mineola"]
+    assert cities["Customers"].tolist() == [2]
+    assert cities["Distance (km)"].iloc[0] == 0
@@ -0,0 +1,83 @@
+# tests/test_incremental.py
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import incremental
+from preprocessing import preprocess_data
+
+
+def _batches(df, n):
+    return [df.iloc[idx] for idx in np.array_split(np.arange(len(df)), n)]
+
+
+def _sorted(df, keys):
+    return df.sort_values(keys).reset_index(drop=True)
+
+
+def test_folding_batches_matches_full_preprocess(raw, tmp_path):
+    vehicles, customers, f_cost, f_freight = raw
+    for i, batch in enumerate(_batches(f_cost, 2)):
+        incremental.refresh(vehicles, customers, f_cost=batch, batch_id=f"cost-{i}", state_dir=str(tmp_path))
+    for i, batch in enumerate(_batches(f_freight, 3)):
+        merged_log, city_stats = incremental.refresh(vehicles, customers, f_freight=batch,
+                                                     batch_id=f"freight-{i}", state_dir=str(tmp_path))
+
+    expected_log, expected_cities = preprocess_data(vehicles, customers, f_cost, f_freight)
+    keys = ["Truck ID", "Truck Type", "Plate"]
+    pd.testing.assert_frame_equal(_sorted(merged_log, keys)[expected_log.columns], _sorted(expected_log, keys),
+                                  check_dtype=False, rtol=1e-12)
+    pd.testing.assert_frame_equal(_sorted(city_stats, ["City"])[expected_cities.columns],
+                                  _sorted(expected_cities, ["City"]), check_dtype=False, rtol=1e-12)
+
+
+def test_batches_are_folded_once(raw, tmp_path):
+    vehicles, customers, f_cost, f_freight = raw
+    incremental.refresh(vehicles, customers, f_cost=f_cost, batch_id="costs", state_dir=str(tmp_path))
+    once = incremental.refresh(vehicles, customers, f_freight=f_freight, batch_id="freight", state_dir=str(tmp_path))
+    again = incremental.refresh(vehicles, customers, f_freight=f_freight, batch_id="freight", state_dir=str(tmp_path))
+    pd.testing.assert_frame_equal(once[0], again[0])
+
+
+def test_interrupted_save_keeps_previous_state(raw, tmp_path, monkeypatch):
+    vehicles, customers, f_cost, f_freight = raw
+    incremental.refresh(vehicles, customers, f_cost=f_cost, batch_id="costs", state_dir=str(tmp_path))
+    before = incremental.load_state(str(tmp_path))
+
+    def crash(*args):
+        raise OSError("disk full")
+
+    # Frames of the new generation are written, then the save dies before state.json
+    monkeypatch.setattr(incremental, "save_json", crash)
+    with pytest.raises(OSError):
+        incremental.refresh(vehicles, customers, f_freight=f_freight, batch_id="freight", state_dir=str(tmp_path))
+    monkeypatch.undo()
+
+    after = incremental.load_state(str(tmp_path))
+    assert after["batches"] == before["batches"] == ["costs"]
+    pd.testing.assert_frame_equal(after["trucks"], before["trucks"])
+
+
+def test_previous_generation_survives_a_save(raw, tmp_path):
+    vehicles, customers, f_cost, f_freight = raw
+    state_dir = str(tmp_path)
+    batches = _batches(f_freight, 3)
+    incremental.refresh(vehicles, customers, f_cost=f_cost, batch_id="costs", state_dir=state_dir)
+    for i, batch in enumerate(batches):
+        # A reader that resolved CURRENT just before this save
+        previous = incremental._current_dir(state_dir)
+        incremental.refresh(vehicles, customers, f_freight=batch, batch_id=i, state_dir=state_dir)
+        assert os.path.exists(os.path.join(previous, "trucks.arrow"))
+
+    generations = [e for e in os.listdir(state_dir) if e != incremental.CURRENT_FILE]
+    assert len(generations) == incremental.KEEP_GENERATIONS
+    assert incremental.load_state(state_dir)["batches"] == ["costs", 0, 1, 2]
+
+
+def test_missing_pointer_means_no_state(tmp_path):
+    # Loose files without a CURRENT pointer are not a saved state
+    (tmp_path / "state.json").write_text('{"batches": ["old"], "vehicles_hash": null}')
+    assert incremental.load_state(str(tmp_path))["batches"] == []
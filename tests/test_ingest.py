@@ -0,0 +1,68 @@
+# tests/test_ingest.py
+
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+import ingest
+
+
+def mixed_frame():
+    # As fCosts.xlsx is read: numbers, dates and a repeated header row in object columns
+    return pd.DataFrame({
+        "Date": [datetime.datetime(2019, 1, 1), pd.Timestamp("2019-02-01"), "Date", None],
+        "KM Traveled": [1200, 1.5, "KM Traveled", np.nan],
+        "Flag": [True, False, "Flag", 3],
+        "Plain": [1.0, 2.0, 3.0, 4.0],
+    })
+
+
+def test_mixed_object_columns_round_trip(tmp_path):
+    df = mixed_frame()
+    path = str(tmp_path / "frame.arrow")
+    ingest.save_frame(df, path)
+    loaded = ingest.load_frame(path)
+
+    # Dates come back as Timestamps and missing values as NaN; the rest keep their type
+    expected = df.assign(Date=[pd.Timestamp("2019-01-01"), pd.Timestamp("2019-02-01"), "Date", np.nan])
+    pd.testing.assert_frame_equal(loaded, expected, check_dtype=False)
+    for col in ["Date", "KM Traveled", "Flag"]:
+        assert [type(v) for v in loaded[col]] == [type(v) for v in expected[col]], col
+    assert loaded["Plain"].dtype == np.float64
+
+
+def test_cache_is_reused_until_the_source_changes(tmp_path, monkeypatch):
+    path = tmp_path / "fFreight.csv"
+    pd.DataFrame({"a": [1, 2], "b": ["x", "y"]}).to_csv(path, index=False)
+    parses = []
+    parse_file = ingest._parse_file
+
+    def counting(*args):
+        parses.append(args[0])
+        return parse_file(*args)
+    monkeypatch.setattr(ingest, "_parse_file", counting)
+
+    first = ingest.read_csv_cached(str(path))
+    assert ingest.read_csv_cached(str(path)).equals(first) and len(parses) == 1
+    # Different read arguments are a different cache entry
+    assert list(ingest.read_csv_cached(str(path), usecols=["a"]).columns) == ["a"] and len(parses) == 2
+
+    # Touched but unchanged: hashed again, not reparsed
+    os.utime(path, ns=(1, 1))
+    assert ingest.read_csv_cached(str(path)).equals(first) and len(parses) == 2
+
+    pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]}).to_csv(path, index=False)
+    changed = ingest.read_csv_cached(str(path))
+    assert len(changed) == 3 and len(parses) == 3
+
+
+def test_unreadable_cache_is_reparsed(tmp_path):
+    path = tmp_path / "fFreight.csv"
+    pd.DataFrame({"a": [1, 2]}).to_csv(path, index=False)
+    ingest.read_csv_cached(str(path))
+    arrow_path, _ = ingest._cache_paths(str(path), "csv", {})
+    with open(arrow_path, "wb") as f:
+        f.write(b"not arrow")
+    assert ingest.read_csv_cached(str(path))["a"].tolist() == [1, 2]
@@ -0,0 +1,72 @@
+# tests/test_model_registry.py
+
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("sklearn")
+
+import model_registry
+from config import CATEGORICAL_FEATURES, NUMERICAL_FEATURES, TARGET
+from preprocessing import preprocess_data
+
+
+@pytest.fixture
+def training():
+    from conftest import make_raw
+
+    df = pd.concat([preprocess_data(*make_raw(seed=seed))[0] for seed in range(4)], ignore_index=True)
+    return df[CATEGORICAL_FEATURES + NUMERICAL_FEATURES], df[TARGET]
+
+
+def fit(X, y, n_estimators):
+    from sklearn.ensemble import RandomForestRegressor
+    from sklearn.pipeline import Pipeline
+    from train_model import make_preprocessor
+
+    pipeline = Pipeline([("preprocessor", make_preprocessor()),
+                         ("model", RandomForestRegressor(n_estimators=n_estimators, random_state=0))])
+    return pipeline.fit(X, y)
+
+
+def test_publish_promote_and_hot_swap(training, tmp_path):
+    X, y = training
+    registry = str(tmp_path / "models")
+    first, second = fit(X, y, 3), fit(X[:15], y[:15], 5)
+
+    assert model_registry.publish(first, X, registry_dir=registry, n_train_rows=len(X)) == "v0001"
+    assert model_registry.current_version(registry) == "v0001"
+    assert model_registry.publish(second, X, registry_dir=registry, n_train_rows=15) == "v0002"
+    assert model_registry.current_version(registry) == "v0002"
+
+    meta = model_registry.read_metadata("v0002", registry)
+    assert meta["n_train_rows"] == 15 and meta["compiled"] and meta["version"] == "v0002"
+    np.testing.assert_allclose(model_registry.load_version("v0002", registry).predict(X), second.predict(X))
+
+    # Roll back within the same directory mtime tick: only LATEST changes
+    mtime = os.stat(registry).st_mtime_ns
+    model_registry.promote("v0001", registry)
+    os.utime(registry, ns=(mtime, mtime))
+    assert model_registry.current_version(registry) == "v0001"
+    np.testing.assert_allclose(model_registry.load_version("v0001", registry).predict(X), first.predict(X))
+
+    with pytest.raises(ValueError):
+        model_registry.promote("v0009", registry)
+
+
+def test_incompatible_latest_falls_back(training, tmp_path):
+    X, y = training
+    registry = str(tmp_path / "models")
+    model_registry.publish(fit(X, y, 3), X, registry_dir=registry)
+    model_registry.publish(fit(X, y, 4), X, registry_dir=registry)
+
+    meta = model_registry.read_metadata("v0002", registry)
+    meta["features"]["numerical"] = NUMERICAL_FEATURES[:-1]
+    path = os.path.join(registry, "v0002", "metadata.json")
+    with open(path, "w") as f:
+        json.dump(meta, f)
+    os.utime(registry, ns=(0, 0))  # make sure the cached resolution is dropped
+    assert model_registry.current_version(registry) == "v0001"
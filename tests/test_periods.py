@@ -0,0 +1,75 @@
+# tests/test_periods.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import make_raw
+from periods import GRAINS, aggregate_periods, date_bounds, period_source
+from preprocessing import COST_COLS, REV_COLS, TRUCK_KEYS, clean_costs, clean_freight, derive_features
+
+# pandas period frequencies of the grains; weeks end on Sunday, so they start on Monday
+FREQ = {"day": "D", "week": "W-SUN", "month": "M"}
+
+
+@pytest.fixture
+def daily():
+    # Dates spread over ten weeks, so every grain has several periods per truck
+    vehicles, customers, f_cost, f_freight = make_raw(months=12)
+    rng = np.random.default_rng(1)
+    days = pd.Timestamp("2018-01-01") + pd.to_timedelta(rng.integers(0, 70, len(f_cost) + len(f_freight)), "D")
+    f_cost["Date"] = list(days[:len(f_cost)].to_pydatetime())
+    f_freight["Date"] = days[len(f_cost):].strftime("%Y/%m/%d")
+    return vehicles, customers, f_cost, f_freight
+
+
+def reference(vehicles, f_cost, f_freight, grain, start=None, end=None):
+    """
+    aggregate_periods with pandas: group cleaned rows by truck and period, inner join.
+    """
+    def grouped(frame, columns):
+        frame = frame.merge(vehicles[TRUCK_KEYS], on="Truck ID")
+        frame = frame[frame["Date"].between(start or frame["Date"].min(), end or frame["Date"].max())]
+        frame["Period"] = frame["Date"].dt.to_period(FREQ[grain]).dt.start_time.astype("datetime64[ns]")
+        return frame.groupby(TRUCK_KEYS + ["Period"])[columns]
+
+    costs = grouped(clean_costs(f_cost.copy()), COST_COLS).sum()
+    freight = grouped(clean_freight(f_freight.copy()), REV_COLS)
+    revenue = freight.sum()
+    revenue["Num Trips"] = freight.size()
+    return derive_features(costs.join(revenue, how="inner").reset_index())
+
+
+@pytest.mark.parametrize("grain", GRAINS)
+def test_matches_groupby(daily, grain):
+    vehicles, _, f_cost, f_freight = daily
+    periods = aggregate_periods(period_source(vehicles, f_cost, f_freight), grain)
+    pd.testing.assert_frame_equal(periods, reference(vehicles, f_cost, f_freight, grain), check_dtype=False)
+
+
+@pytest.mark.parametrize("grain", GRAINS)
+def test_date_window(daily, grain):
+    vehicles, _, f_cost, f_freight = daily
+    start, end = pd.Timestamp("2018-01-10"), pd.Timestamp("2018-02-18")
+    periods = aggregate_periods(period_source(vehicles, f_cost, f_freight), grain, start, end)
+    expected = reference(vehicles, f_cost, f_freight, grain, start, end)
+    pd.testing.assert_frame_equal(periods, expected, check_dtype=False)
+
+
+def test_weeks_start_on_monday():
+    vehicles, _, f_cost, f_freight = make_raw(trucks=1, months=2, trips=2)
+    # Sunday 2018-01-07 and Monday 2018-01-08 fall in different weeks
+    f_cost["Date"] = [pd.Timestamp("2018-01-07").to_pydatetime(), pd.Timestamp("2018-01-08").to_pydatetime()]
+    f_freight["Date"] = ["2018/01/07", "2018/01/08"]
+    source = period_source(vehicles, f_cost, f_freight)
+
+    weeks = aggregate_periods(source, "week")
+    assert weeks["Period"].tolist() == [pd.Timestamp("2018-01-01"), pd.Timestamp("2018-01-08")]
+    assert weeks["Num Trips"].tolist() == [1, 1]
+    assert date_bounds(source) == (pd.Timestamp("2018-01-07"), pd.Timestamp("2018-01-08"))
+
+
+def test_unknown_grain(raw):
+    vehicles, _, f_cost, f_freight = raw
+    with pytest.raises(ValueError, match="Unknown time grain"):
+        aggregate_periods(period_source(vehicles, f_cost, f_freight), "year")
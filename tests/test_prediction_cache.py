@@ -0,0 +1,30 @@
+# tests/test_prediction_cache.py
+
+from prediction_cache import PredictionCache
+
+
+def test_models_share_the_file_without_evicting_each_other(tmp_path):
+    db = str(tmp_path / "predictions.sqlite")
+    old, new = PredictionCache(db_path=db), PredictionCache(db_path=db)
+    # Interleaved like two workers serving different versions during a rollout
+    for i in range(3):
+        old.put("v1", f"k{i}", i)
+        new.put("v2", f"k{i}", 10 + i)
+        assert old.get("v1", f"k{i}") == i
+        assert new.get("v2", f"k{i}") == 10 + i
+
+    fresh = PredictionCache(db_path=db)
+    assert fresh.get("v1", "k0") == 0 and fresh.get("v2", "k0") == 10
+    # Switching models keeps the other model's entries in memory too
+    assert old.get("v2", "k1") == 11 and old.get("v1", "k1") == 1
+    assert old.summary()["entries"] == 4
+
+
+def test_prune_removes_expired_rows_of_all_models(tmp_path):
+    db = str(tmp_path / "predictions.sqlite")
+    cache = PredictionCache(ttl=60, db_path=db)
+    cache.put("v1", "a", 1.0)
+    cache.put("v2", "b", 2.0)
+    assert cache.prune() == 0
+    assert cache.prune(now=cache._entries[("v1", "a")][1] + 1) == 4  # two in memory, two on disk
+    assert PredictionCache(ttl=60, db_path=db).get("v1", "a") is None
@@ -0,0 +1,76 @@
+# tests/test_routes.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import routes
+from config import DISTANCE_KM, FUEL, LITERS, MAINTENANCE, ROUTE_ID, TARGET, TRUCK_TYPE
+
+MEANS = pd.DataFrame({
+    DISTANCE_KM: [100.0, 400.0],
+    LITERS: [20.0, 160.0],
+    FUEL: [30.0, 200.0],
+    MAINTENANCE: [5.0, 40.0],
+}, index=pd.Index(["BOX", "TRUCK"], name=TRUCK_TYPE))
+
+
+def fuel_profit(scenarios, truck_type_means, chunk_size=None, n_jobs=1):
+    # Net Profit = distance - fuel, with the type's per-trip fuel when it is not given
+    fuel = scenarios[FUEL] if FUEL in scenarios else scenarios[TRUCK_TYPE].map(truck_type_means[FUEL])
+    return (scenarios[DISTANCE_KM] - fuel).astype(float)
+
+
+@pytest.fixture(autouse=True)
+def model(monkeypatch):
+    monkeypatch.setattr(routes, "predict_batch", fuel_profit)
+
+
+def test_scenarios_scale_with_distance():
+    scenarios = routes.route_scenarios(np.array([50.0, 200.0]), MEANS)
+    assert scenarios[TRUCK_TYPE].tolist() == ["BOX", "BOX", "TRUCK", "TRUCK"]
+    assert scenarios[DISTANCE_KM].tolist() == [50, 200, 50, 200]
+    # Per km averages of the type times the distance
+    np.testing.assert_allclose(scenarios[LITERS], [10, 40, 20, 80])
+    np.testing.assert_allclose(scenarios[FUEL], [15, 60, 25, 100])
+    np.testing.assert_allclose(scenarios[MAINTENANCE], [2.5, 10, 5, 20])
+
+
+def test_scenarios_without_scaling_keep_trip_averages():
+    scenarios = routes.route_scenarios(np.array([50.0, 200.0]), MEANS, scale_with_distance=False)
+    assert list(scenarios.columns) == [TRUCK_TYPE, DISTANCE_KM]
+
+
+def test_zero_distance_type_is_not_scaled():
+    means = MEANS.assign(**{DISTANCE_KM: [0.0, 400.0]})
+    scenarios = routes.route_scenarios(np.array([50.0]), means)
+    assert np.isnan(scenarios[FUEL].iloc[0]) and scenarios[FUEL].iloc[1] == 25
+
+
+def test_route_matrix_prices_each_distance_once(monkeypatch):
+    customers = pd.DataFrame({
+        "Customer ID": [1, 2, 3, 4],
+        "City": ["Mineola", "Mineola", "Bayport", "Nowhere"],
+        "Latitude": [1.0, 1.0, 2.0, np.nan],
+        "Longitude": [0.0, 0.0, 0.0, np.nan],
+    })
+    trips = routes.customer_routes(customers, 0.0, 0.0)
+    assert trips[ROUTE_ID].tolist() == [1, 2, 3]
+    one_way = routes.customer_routes(customers, 0.0, 0.0, round_trip=False)
+    np.testing.assert_allclose(trips[DISTANCE_KM], one_way[DISTANCE_KM] * 2)
+
+    priced = []
+
+    def counting(scenarios, *args, **kwargs):
+        priced.append(len(scenarios))
+        return fuel_profit(scenarios, *args)
+    monkeypatch.setattr(routes, "predict_batch", counting)
+    matrix = routes.route_matrix(trips, MEANS)
+    # Two distinct distances x two truck types
+    assert priced == [4]
+
+    km = trips[DISTANCE_KM].to_numpy()
+    np.testing.assert_allclose(matrix["BOX"], km * (1 - 0.3))
+    np.testing.assert_allclose(matrix["TRUCK"], km * (1 - 0.5))
+    assert (matrix["Best Truck Type"] == "BOX").all()
+    np.testing.assert_allclose(matrix["Best " + TARGET], matrix["BOX"])
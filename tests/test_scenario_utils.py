@@ -0,0 +1,57 @@
+# tests/test_scenario_utils.py
+
+import numpy as np
+import pandas as pd
+
+from config import NUMERICAL_FEATURES, TRUCK_TYPE, DISTANCE_KM, LITERS, WEIGHT_KG, KM_PER_LITER, FUEL
+from benchmarks.bench_scenarios import legacy_create_scenario_input
+from scenario_utils import UNKNOWN_TRUCK_TYPE, create_scenario_frame, create_scenario_input
+
+
+def _means():
+    return pd.DataFrame({col: [1.0] for col in NUMERICAL_FEATURES}, index=pd.Index(["Truck"], name=TRUCK_TYPE))
+
+
+def test_zero_divisors_give_finite_features():
+    scenarios = pd.DataFrame([
+        {TRUCK_TYPE: "Truck", LITERS: 0},
+        {TRUCK_TYPE: "Truck", DISTANCE_KM: 0, WEIGHT_KG: 0},
+        {TRUCK_TYPE: "Truck", DISTANCE_KM: 10, LITERS: 2},
+    ])
+    frame = create_scenario_frame(scenarios, _means())
+    assert np.isfinite(frame[NUMERICAL_FEATURES].to_numpy(dtype=float)).all()
+    assert frame[KM_PER_LITER].tolist() == [0.0, 0.0, 5.0]
+
+
+def _type_means():
+    rng = np.random.default_rng(0)
+    return pd.DataFrame(rng.uniform(1, 500, (2, len(NUMERICAL_FEATURES))), columns=NUMERICAL_FEATURES,
+                        index=pd.Index(["BOX", "TRUCK"], name=TRUCK_TYPE))
+
+
+SCENARIOS = [
+    {TRUCK_TYPE: "BOX"},
+    {TRUCK_TYPE: "TRUCK", DISTANCE_KM: 120.0, WEIGHT_KG: 3.5},
+    {TRUCK_TYPE: "BOX", DISTANCE_KM: 0.0, FUEL: 80.0},
+    {TRUCK_TYPE: "TRUCK", LITERS: np.nan, FUEL: "95.5"},
+    {TRUCK_TYPE: "TRUCK", WEIGHT_KG: 0.0},
+]
+
+
+def test_frame_rows_match_the_per_row_version():
+    means = _type_means()
+    frame = create_scenario_frame(pd.DataFrame(SCENARIOS), means)
+    for i, scenario in enumerate(SCENARIOS):
+        legacy = legacy_create_scenario_input(scenario, means)
+        single = create_scenario_input(scenario, means)
+        for col in NUMERICAL_FEATURES:
+            assert np.isclose(frame.loc[i, col], float(legacy.loc[0, col])), (i, col)
+            assert single.loc[0, col] == frame.loc[i, col], (i, col)
+        assert frame.loc[i, TRUCK_TYPE] == scenario[TRUCK_TYPE]
+
+
+def test_unknown_truck_type_uses_the_fleet_average():
+    means = _type_means()
+    frame = create_scenario_frame(pd.DataFrame([{TRUCK_TYPE: "VAN"}, {TRUCK_TYPE: None}]), means)
+    np.testing.assert_allclose(frame[DISTANCE_KM], means[DISTANCE_KM].mean())
+    assert frame[TRUCK_TYPE].tolist() == ["VAN", UNKNOWN_TRUCK_TYPE]
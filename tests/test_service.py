@@ -0,0 +1,96 @@
+# tests/test_service.py
+
+import asyncio
+import json
+
+import pytest
+
+from service import MicroBatcher, handle, _parse_scenarios
+
+
+@pytest.mark.parametrize("scenario", [
+    {"KM Traveled": 100},
+    {"Truck Type": ""},
+    {"Truck Type": "BOX", "Liters": -1},
+    {"Truck Type": "BOX", "KM Traveled": -5},
+    {"Truck Type": "BOX", "Weight (Kg)": -0.5},
+    {"Truck Type": "BOX", "Fuel": "12"},
+    {"Truck Type": "BOX", "Fuel": [1, 2]},
+    {"Truck Type": "BOX", "Fuel": True},
+    {"Truck Type": "BOX", "Fuel": 10 ** 400},
+    {"Truck Type": "BOX", "Colour": 1},
+])
+def test_invalid_scenarios_are_rejected(scenario):
+    with pytest.raises(ValueError):
+        _parse_scenarios(json.dumps(scenario).encode())
+
+
+def test_valid_scenarios_parse():
+    scenarios, single = _parse_scenarios(b'{"scenarios": [{"Truck Type": "BOX", "Liters": 1.5, "Fuel": null}]}')
+    assert scenarios == [{"Truck Type": "BOX", "Liters": 1.5, "Fuel": None}] and not single
+
+
+def test_zero_divisors_match_predict_scenario():
+    import pandas as pd
+    from config import NUMERICAL_FEATURES
+    from scenario_utils import create_scenario_frame
+
+    scenario = {"Truck Type": "BOX", "Liters": 0, "KM Traveled": 0, "Weight (Kg)": 0}
+    scenarios, _ = _parse_scenarios(json.dumps(scenario).encode())
+    means = pd.DataFrame([[1.0] * len(NUMERICAL_FEATURES)], index=pd.Index(["BOX"], name="Truck Type"),
+                         columns=NUMERICAL_FEATURES)
+    frame = create_scenario_frame(pd.DataFrame(scenarios), means)
+    assert frame[NUMERICAL_FEATURES].notna().all().all()
+    assert frame[NUMERICAL_FEATURES].abs().max().max() < float("inf")
+
+
+def _score(scenarios):
+    if any(s.get("Fuel") == 13 for s in scenarios):
+        raise ValueError("Input X contains infinity")
+    return [s.get("Fuel", 1) * 2.0 for s in scenarios]
+
+
+def test_bad_scenario_only_fails_its_own_request():
+    async def run():
+        batcher = MicroBatcher(_score, max_batch=16, max_wait_ms=50)
+        runner = asyncio.ensure_future(batcher.run())
+        results = await asyncio.gather(
+            batcher.predict([{"Truck Type": "BOX", "Fuel": 1}]),
+            batcher.predict([{"Truck Type": "BOX", "Fuel": 13}]),
+            batcher.predict([{"Truck Type": "BOX", "Fuel": 2}, {"Truck Type": "BOX", "Fuel": 3}]),
+            return_exceptions=True,
+        )
+        runner.cancel()
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+    assert results[0] == [2.0]
+    assert isinstance(results[1], ValueError)
+    assert results[2] == [4.0, 6.0]
+    assert batcher.counts["batches"] == 1 and batcher.counts["errors"] == 1
+
+
+def test_invalid_request_gets_400():
+    status, payload = asyncio.run(handle(None, "POST", "/predict", b'{"Truck Type": "Truck", "Liters": -1}'))
+    assert status == 400 and "Liters" in payload["error"]
+
+
+def test_unconvertible_prediction_fails_only_its_request():
+    def score(scenarios):
+        return [None if s.get("Fuel") == 13 else s.get("Fuel", 1) * 2.0 for s in scenarios]
+
+    async def run():
+        batcher = MicroBatcher(score, max_batch=16, max_wait_ms=50)
+        runner = asyncio.ensure_future(batcher.run())
+        results = await asyncio.wait_for(asyncio.gather(
+            batcher.predict([{"Truck Type": "BOX", "Fuel": 13}]),
+            batcher.predict([{"Truck Type": "BOX", "Fuel": 2}]),
+            return_exceptions=True,
+        ), timeout=5)
+        runner.cancel()
+        return batcher, results
+
+    batcher, results = asyncio.run(run())
+    assert isinstance(results[0], TypeError)
+    assert results[1] == [4.0]
+    assert batcher.counts["batches"] == 1 and batcher.counts["errors"] == 1
@@ -0,0 +1,60 @@
+# tests/test_shared_cache.py
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from shared_cache import shared_frames
+
+
+def frames():
+    return {
+        "log": pd.DataFrame({"KM Traveled": np.arange(5.0), "City": list("abcde")}),
+        "stats": pd.DataFrame({"Trips": [3, 4]}, index=pd.Index(["BOX", "TRUCK"], name="Truck Type")),
+    }
+
+
+def test_publish_then_attach(tmp_path):
+    shared_dir = str(tmp_path)
+    builds = []
+
+    def build():
+        builds.append(1)
+        return frames()
+
+    published = shared_frames("dataset", "v1", build, shared_dir=shared_dir)
+    attached = shared_frames("dataset", "v1", build, shared_dir=shared_dir)
+    assert len(builds) == 1
+
+    for name, frame in frames().items():
+        pd.testing.assert_frame_equal(published[name], frame, check_dtype=False)
+        pd.testing.assert_frame_equal(attached[name], frame, check_dtype=False)
+    # Numeric columns are read-only views of the mapped file
+    assert not attached["log"]["KM Traveled"].to_numpy().flags.writeable
+
+
+def test_new_version_prunes_the_old_one(tmp_path):
+    shared_dir = str(tmp_path)
+    shared_frames("dataset", "v1", frames, shared_dir=shared_dir)
+    shared_frames("other", "v1", frames, shared_dir=shared_dir)
+    shared_frames("dataset", "v2", frames, shared_dir=shared_dir)
+
+    assert sorted(os.listdir(tmp_path / "dataset")) == ["v1.lock", "v2", "v2.lock"]
+    # Other names are left alone
+    assert "v1" in os.listdir(tmp_path / "other")
+
+
+def test_incomplete_version_is_rebuilt(tmp_path):
+    shared_dir = str(tmp_path)
+    shared_frames("dataset", "v1", frames, shared_dir=shared_dir)
+    # A build that died before writing its manifest
+    os.remove(tmp_path / "dataset" / "v1" / "manifest.json")
+    builds = []
+
+    def build():
+        builds.append(1)
+        return frames()
+    rebuilt = shared_frames("dataset", "v1", build, shared_dir=shared_dir)
+    assert len(builds) == 1
+    pd.testing.assert_frame_equal(rebuilt["stats"], frames()["stats"], check_dtype=False)
@@ -0,0 +1,33 @@
+# tests/test_stats_cube.py
+
+import pandas as pd
+
+from config import NUMERICAL_FEATURES, TRUCK_TYPE
+from periods import aggregate_periods, period_source
+from preprocessing import preprocess_data
+from shared_cache import shared_frames
+from stats_cube import build_cube, stat
+
+
+def test_cube_matches_groupby(raw):
+    vehicles, customers, f_cost, f_freight = raw
+    df, _ = preprocess_data(*raw)
+    periods = aggregate_periods(period_source(vehicles, f_cost, f_freight), "month")
+    cube = build_cube(df, periods)
+
+    grouped = df.groupby(TRUCK_TYPE)[NUMERICAL_FEATURES]
+    pd.testing.assert_frame_equal(stat(cube, "mean"), grouped.mean(), check_dtype=False)
+    pd.testing.assert_frame_equal(stat(cube, "q75"), grouped.quantile(0.75), check_dtype=False)
+    pd.testing.assert_frame_equal(stat(cube, "count"), grouped.count(), check_dtype=False)
+
+    monthly = periods.groupby([TRUCK_TYPE, "Period"], observed=True)[NUMERICAL_FEATURES].median()
+    pd.testing.assert_frame_equal(stat(cube, "median", "by_type_month"), monthly, check_dtype=False)
+
+
+def test_cube_survives_sharing(raw, tmp_path):
+    df, _ = preprocess_data(*raw)
+    cube = build_cube(df)
+    # The app publishes the cube levels as shared frames (see dataset.py)
+    shared = shared_frames("dataset", "v1", lambda: cube, str(tmp_path))
+    pd.testing.assert_frame_equal(shared["by_type"], cube["by_type"])
+    pd.testing.assert_frame_equal(stat(shared, "mean"), stat(cube, "mean"))
@@ -0,0 +1,62 @@
+# tests/test_streaming.py
+
+import pandas as pd
+import pytest
+
+from conftest import write_sources
+from data_loader import load_raw_data
+from preprocessing import preprocess_data
+from streaming import load_preprocessed_chunked, preprocess_chunked
+
+KEYS = ["Truck ID", "Truck Type", "Plate"]
+
+
+def test_chunked_matches_preprocess_data(raw, tmp_path):
+    vehicles, customers, f_cost, f_freight = raw
+    path = tmp_path / "fFreight.csv"
+    f_freight.to_csv(path, index=False)
+
+    merged_log, city_stats = preprocess_chunked(vehicles, customers, f_cost, str(path), chunk_rows=97)
+    expected_log, expected_cities = preprocess_data(vehicles, customers, f_cost, pd.read_csv(path))
+
+    pd.testing.assert_frame_equal(
+        merged_log.sort_values(KEYS).reset_index(drop=True)[expected_log.columns],
+        expected_log.sort_values(KEYS).reset_index(drop=True),
+        check_dtype=False, rtol=1e-12,
+    )
+    pd.testing.assert_frame_equal(
+        city_stats.sort_values("City").reset_index(drop=True)[expected_cities.columns],
+        expected_cities.sort_values("City").reset_index(drop=True),
+        check_dtype=False, rtol=1e-12,
+    )
+
+
+def monthly_costs(f_cost):
+    months = f_cost["Date"].astype(str).str[:7]
+    return {f"fCosts_{month}.xlsx": f_cost[months == month] for month in sorted(months.unique())}
+
+
+def test_load_chunked_reads_every_cost_workbook(raw, tmp_path):
+    write_sources(tmp_path, raw, monthly_costs(raw[2]))
+
+    merged_log, city_stats = load_preprocessed_chunked(str(tmp_path))
+    expected_log, expected_cities = preprocess_data(*load_raw_data(str(tmp_path), max_workers=1))
+
+    assert merged_log["Num Trips"].sum() == expected_log["Num Trips"].sum()
+    pd.testing.assert_frame_equal(
+        merged_log.sort_values(KEYS).reset_index(drop=True)[expected_log.columns],
+        expected_log.sort_values(KEYS).reset_index(drop=True),
+        check_dtype=False, rtol=1e-12,
+    )
+
+
+def test_load_chunked_checks_columns(raw, tmp_path):
+    vehicles, customers, f_cost, f_freight = raw
+    write_sources(tmp_path, (vehicles, customers, f_cost, f_freight.drop(columns="Goods Value")),
+                  monthly_costs(f_cost))
+    with pytest.raises(ValueError, match="Goods Value"):
+        load_preprocessed_chunked(str(tmp_path))
+
+    write_sources(tmp_path, raw, {"fCosts.xlsx": f_cost.drop(columns="Fuel")})
+    with pytest.raises(ValueError, match="fCosts.xlsx: Fuel"):
+        load_preprocessed_chunked(str(tmp_path))
@@ -0,0 +1,72 @@
+# tests/test_sweeps.py
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import sweeps
+from config import DISTANCE_KM, WEIGHT_KG, TRUCK_TYPE, TARGET
+
+MEANS = pd.DataFrame({DISTANCE_KM: [100.0, 200.0], WEIGHT_KG: [5.0, 8.0]},
+                     index=pd.Index(["BOX", "TRUCK"], name=TRUCK_TYPE))
+# Net Profit = 10 * Weight (Kg) - KM Traveled + offset per truck type
+OFFSET = {"BOX": 0.0, "TRUCK": -50.0}
+
+
+def linear_profit(scenarios, truck_type_means, chunk_size=None):
+    return (10 * scenarios[WEIGHT_KG] - scenarios[DISTANCE_KM] + scenarios[TRUCK_TYPE].map(OFFSET)).astype(float)
+
+
+@pytest.fixture(autouse=True)
+def model(monkeypatch):
+    monkeypatch.setattr(sweeps, "predict_batch", linear_profit)
+
+
+def test_heatmap_spec_covers_the_grid():
+    km, kg = np.linspace(0, 100, 11), np.linspace(0, 12, 4)
+    sweep = sweeps.Sweep(MEANS, {DISTANCE_KM: km, WEIGHT_KG: kg}, batch_size=7)
+    spec = sweep.heatmap_spec("TRUCK")
+    cells, curve = (pd.DataFrame(layer["data"]["values"]) for layer in spec["layer"])
+
+    assert len(cells) == len(km) * len(kg)
+    np.testing.assert_allclose(np.sort(cells[TARGET]), np.sort(sweep.grid("TRUCK").to_numpy().ravel()))
+    # Cells are centered on the grid values and tile the swept range without gaps
+    np.testing.assert_allclose(np.unique((cells["x"] + cells["x2"]) / 2), km)
+    assert cells["x"].min() == -5 and cells["x2"].max() == 105
+    # Break-even: 10 * kg - km - 50 = 0, inside the range for kg = 8 and 12 only
+    np.testing.assert_allclose(curve.sort_values("y")[["x", "y"]].to_numpy(), [[30, 8], [70, 12]])
+
+
+def test_break_even_one_variable():
+    km = np.linspace(0, 100, 21)
+    sweep = sweeps.Sweep(MEANS, {DISTANCE_KM: km}, base={WEIGHT_KG: 4.0}, batch_size=5)
+    np.testing.assert_allclose(sweep.curves()["BOX"], 40 - km)
+
+    # 40 - km = 0 for BOX; TRUCK (40 - km - 50) never breaks even
+    even = sweep.break_even()
+    assert even["BOX"] == pytest.approx(40)
+    assert np.isnan(even["TRUCK"])
+    assert even.name == f"Break-even {DISTANCE_KM}"
+
+
+def test_break_even_interpolates_between_grid_points():
+    # Grid points 0, 30, 60, 90 never hit the crossing at km = 10 * kg exactly
+    km, kg = np.linspace(0, 90, 4), np.array([1.0, 2.5, 4.4])
+    sweep = sweeps.Sweep(MEANS, {DISTANCE_KM: km, WEIGHT_KG: kg}, batch_size=3)
+    curves = sweep.break_even()
+    np.testing.assert_allclose(curves["BOX"], 10 * kg)
+    # TRUCK: 10 * kg - km - 50 < 0 for every kg here, even at km = 0
+    assert curves["TRUCK"].isna().all()
+    with pytest.raises(ValueError):
+        sweep.curves()
+
+
+def test_grid_and_long_format_match_the_model():
+    km, kg = np.linspace(0, 100, 6), np.linspace(1, 9, 5)
+    sweep = sweeps.Sweep(MEANS, {DISTANCE_KM: km, WEIGHT_KG: kg}, batch_size=4)
+    grid = sweep.grid("TRUCK")
+    np.testing.assert_allclose(grid.to_numpy(), 10 * kg[:, None] - km[None, :] - 50)
+
+    frame = sweep.to_frame()
+    assert len(frame) == 2 * len(km) * len(kg)
+    np.testing.assert_allclose(frame[TARGET], linear_profit(frame, MEANS))
@@ -0,0 +1,55 @@
+# tests/test_train_model.py
+
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import KFold, cross_val_score
+from sklearn.pipeline import Pipeline
+
+from conftest import make_raw
+from config import CATEGORICAL_FEATURES, NUMERICAL_FEATURES, TARGET
+from preprocessing import preprocess_data
+from train_model import MODEL_GRID, compare_models, expand_grid, make_preprocessor
+
+GRID = {
+    "ridge": (Ridge, {"alpha": [0.1, 10.0]}),
+    "linear": (LinearRegression, {}),
+}
+
+
+def training_data(raw):
+    df, _ = preprocess_data(*raw)
+    return df[CATEGORICAL_FEATURES + NUMERICAL_FEATURES], df[TARGET]
+
+
+def test_expand_grid():
+    labels = [label for label, _, _ in expand_grid(GRID)]
+    assert labels == ["ridge alpha=0.1", "ridge alpha=10.0", "linear"]
+    # random_state is left out of the labels
+    assert all("random_state" not in label for label, _, _ in expand_grid())
+    # 2 x 2 forests, 2 boosting rates, 3 ridge alphas, 1 linear
+    assert len(list(expand_grid())) == len(list(expand_grid(MODEL_GRID))) == 10
+
+
+def test_compare_models_matches_cross_validation():
+    # One row per truck: enough trucks for every fold to have several
+    X, y = training_data(make_raw(trucks=40, trips=2000))
+    results = compare_models(X, y, grid=GRID, n_splits=4, n_jobs=1).set_index("model")
+    assert sorted(results.index) == ["linear", "ridge alpha=0.1", "ridge alpha=10.0"]
+    assert results["rmse"].is_monotonic_increasing
+
+    # Same folds, with the preprocessor fitted inside each fold by a pipeline
+    folds = KFold(n_splits=4, shuffle=True, random_state=42)
+    for label, estimator, params in expand_grid(GRID):
+        pipeline = Pipeline([("preprocessor", make_preprocessor()), ("model", estimator(**params))])
+        r2 = cross_val_score(pipeline, X, y, cv=folds, scoring="r2")
+        assert np.isclose(results.loc[label, "r2"], r2.mean())
+        assert np.isclose(results.loc[label, "r2_std"], r2.std(ddof=1))
+
+
+def test_process_pool_gives_the_same_scores(raw):
+    X, y = training_data(raw)
+    serial = compare_models(X, y, grid=GRID, n_splits=3, n_jobs=1)
+    pooled = compare_models(X, y, grid=GRID, n_splits=3, n_jobs=2)
+    columns = ["model", "r2", "mae", "rmse"]
+    pd.testing.assert_frame_equal(serial[columns], pooled[columns])
@@ -0,0 +1,94 @@
+# tests/test_validation.py
+
+import datetime
+
+import pandas as pd
+import pytest
+
+from validation import RULES, rules_version, validate, write_quarantine
+
+
+def with_rows(df, rows):
+    return pd.concat([df, pd.DataFrame(rows)], ignore_index=True)
+
+
+@pytest.fixture
+def dirty(raw):
+    """
+    The raw tables with known bad rows appended: {table: {row position: reasons}}.
+    """
+    vehicles, customers, f_cost, f_freight = raw
+    cost = f_cost.iloc[0].to_dict()
+    freight = f_freight.iloc[0].to_dict()
+    bad = {
+        "vehicles": {len(vehicles): "duplicate Truck ID"},
+        "customers": {len(customers): "Latitude out of range"},
+        "costs": {
+            len(f_cost): "KM Traveled out of range",
+            len(f_cost) + 1: "Truck ID unknown",
+            len(f_cost) + 2: "Date out of range",
+            len(f_cost) + 3: "duplicate row",
+        },
+        "freight": {
+            len(f_freight): "Net Revenue not a number",
+            len(f_freight) + 1: "Customer ID unknown",
+            len(f_freight) + 2: "Date missing",
+            len(f_freight) + 3: "duplicate Invoice Number",
+        },
+    }
+    vehicles = with_rows(vehicles, [{**vehicles.iloc[0].to_dict(), "Plate": "PLT-COPY"}])
+    customers = with_rows(customers, [{**customers.iloc[0].to_dict(), "Customer ID": 1000, "Latitude": 95.0}])
+    f_cost = with_rows(f_cost, [
+        {**cost, "KM Traveled": -5},
+        {**cost, "Truck ID": 99},
+        {**cost, "Date": datetime.datetime(1999, 12, 31)},
+        cost,
+    ])
+    invoice = f_freight["Invoice Number"].max()
+    f_freight = with_rows(f_freight, [
+        {**freight, "Invoice Number": invoice + 1, "Net Revenue": "abc"},
+        {**freight, "Invoice Number": invoice + 2, "Customer ID": 999},
+        {**freight, "Invoice Number": invoice + 3, "Date": None},
+        freight,
+    ])
+    return (vehicles, customers, f_cost, f_freight), bad
+
+
+def test_clean_tables_pass(raw):
+    result = validate(*raw)
+    assert result.quarantine.empty and result.reasons.empty
+    for accepted, df in zip(result.frames, raw):
+        pd.testing.assert_frame_equal(accepted, df)
+
+
+def test_quarantine_holds_exactly_the_bad_rows(dirty, tmp_path):
+    tables, bad = dirty
+    result = validate(*tables)
+    path = tmp_path / "quarantine.csv"
+    write_quarantine(result, str(path))
+
+    quarantine = pd.read_csv(path)
+    found = {(t, r): reasons for t, r, reasons in quarantine[["Table", "Row", "Reasons"]].itertuples(index=False)}
+    expected = {(table, row): reasons for table, rows in bad.items() for row, reasons in rows.items()}
+    assert found == expected
+
+    summary = result.summary.set_index("Table")
+    for (table, rows), df, accepted in zip(bad.items(), tables, result.frames):
+        assert summary.loc[table, "Rejected"] == len(rows)
+        assert len(accepted) == len(df) - len(rows)
+    assert set(result.reasons["Reason"]) == set(expected.values())
+
+
+def test_repeated_header_row(raw):
+    vehicles, customers, f_cost, f_freight = raw
+    # As in fCosts.xlsx: the header repeated as a data row
+    f_cost = with_rows(f_cost, [{col: col for col in f_cost.columns}])
+    result = validate(vehicles, customers, f_cost, f_freight)
+    assert result.quarantine["Row"].tolist() == [len(f_cost) - 1]
+    assert result.quarantine["Reasons"].iloc[0].startswith("repeated header")
+    assert len(result.frames[2]) == len(raw[2])
+
+
+def test_rules_version_tracks_the_rules():
+    changed = {**RULES, "vehicles": RULES["vehicles"][:-1]}
+    assert rules_version() == rules_version(RULES) != rules_version(changed)
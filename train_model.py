@@ -1,39 +1,68 @@
 # train_model.py
 
-import joblib
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.model_selection import train_test_split
+from sklearn.ensemble import RandomForestRegressor, HistGradientBoostingRegressor
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.model_selection import train_test_split, KFold, ParameterGrid
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
+from concurrent.futures import ProcessPoolExecutor
+import os
+import time
 import numpy as np
+import pandas as pd
 
-from data_loader import load_raw_data
+from data_loader import load_raw_data, source_paths
 from preprocessing import preprocess_data
 from config import CATEGORICAL_FEATURES, NUMERICAL_FEATURES, TARGET
+from ingest import dataset_version
+from validation import validate, format_summary
+from model_registry import publish
 
-def train_pipeline():
-    # Load and Preprocess
-    vehicles, customers, f_cost, f_freight = load_raw_data()
-    df, _ = preprocess_data(vehicles, customers, f_cost, f_freight)
-
-    X = df[CATEGORICAL_FEATURES + NUMERICAL_FEATURES]
-    y = df[TARGET]
+# Candidate models for compare_models: name -> (estimator class, parameter grid)
+MODEL_GRID = {
+    "random_forest": (RandomForestRegressor, {
+        "n_estimators": [100, 300], "max_depth": [None, 8], "random_state": [42],
+    }),
+    "hist_gradient_boosting": (HistGradientBoostingRegressor, {
+        "learning_rate": [0.05, 0.1], "max_iter": [200], "random_state": [42],
+    }),
+    "ridge": (Ridge, {"alpha": [0.1, 1.0, 10.0]}),
+    "linear": (LinearRegression, {}),
+}
 
-    # Define Preprocessor
-    preprocessor = ColumnTransformer(
+def make_preprocessor():
+    return ColumnTransformer(
         transformers=[
             ("cat", OneHotEncoder(handle_unknown="ignore"), CATEGORICAL_FEATURES),
             ("num", StandardScaler(), NUMERICAL_FEATURES),
         ]
     )
 
+def load_training_data():
+    # Rows failing the data-quality rules are left out (see validation.py)
+    checked = validate(*load_raw_data())
+    print(format_summary(checked))
+    df, _ = preprocess_data(*checked.frames)
+    return df[CATEGORICAL_FEATURES + NUMERICAL_FEATURES], df[TARGET]
+
+def train_pipeline(model=None):
+    """
+    Fits preprocessor + `model` (default RandomForestRegressor(random_state=42)) and
+    publishes it to the model registry.
+    """
+    # Load and Preprocess
+    X, y = load_training_data()
+
+    # Define Preprocessor
+    preprocessor = make_preprocessor()
+
     # Define Pipeline with Random Forest
     pipeline = Pipeline(
         steps=[
             ("preprocessor", preprocessor),
-            ("model", RandomForestRegressor(random_state=42))
+            ("model", model if model is not None else RandomForestRegressor(random_state=42))
         ]
     )
 
@@ -43,18 +72,111 @@ def train_pipeline():
     )
 
     # Train
-    print("Training Random Forest model...")
+    print(f"Training {type(pipeline.named_steps['model']).__name__} model...")
     pipeline.fit(X_train, y_train)
     y_pred = pipeline.predict(X_test)
     r2 = r2_score(y_test, y_pred)
+    metrics = {
+        "r2": float(r2),
+        "mae": float(mean_absolute_error(y_test, y_pred)),
+        "rmse": float(np.sqrt(mean_squared_error(y_test, y_pred))),
+    }
     
-    print(f"R2 Score: {r2:.4f}")
+    print(f"R2 Score: {r2:.4f}  MAE: {metrics['mae']:.2f}  RMSE: {metrics['rmse']:.2f}")
     
-    # Save
-    joblib.dump(pipeline, "data/model_pipeline.pkl")
-    print("Model saved to data/model_pipeline.pkl")
+    # Save as a new registry version; serving workers pick it up on their next call
+    publish(pipeline, X, metrics=metrics, data_fingerprint=dataset_version(source_paths()),
+            n_train_rows=len(X_train))
     
     return pipeline
 
+def expand_grid(grid=None):
+    """
+    Yields (label, estimator class, params) for every point of MODEL_GRID-style `grid`.
+    """
+    for name, (estimator, param_grid) in (grid or MODEL_GRID).items():
+        for params in ParameterGrid(param_grid):
+            label = name + "".join(f" {k}={v}" for k, v in params.items() if k != "random_state")
+            yield label, estimator, params
+
+# Per-worker fold matrices, set once by the pool initializer instead of per task
+_FOLDS = None
+
+def _init_folds(folds):
+    global _FOLDS
+    _FOLDS = folds
+
+def _evaluate(task):
+    label, estimator, params, fold = task
+    X_train, X_test, y_train, y_test = _FOLDS[fold]
+    model = estimator(**params)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    y_pred = model.predict(X_test)
+    predict_s = time.perf_counter() - start
+
+    return {
+        "model": label,
+        "fold": fold,
+        "r2": r2_score(y_test, y_pred),
+        "mae": mean_absolute_error(y_test, y_pred),
+        "rmse": float(np.sqrt(mean_squared_error(y_test, y_pred))),
+        "fit_s": fit_s,
+        "predict_ms_per_1k": 1e6 * predict_s / max(len(X_test), 1),
+    }
+
+def compare_models(X, y, grid=None, n_splits=5, n_jobs=-1):
+    """
+    K-fold cross-validates every candidate of `grid` (default MODEL_GRID) in a process pool.
+    The preprocessor is fitted once per fold and its output shared by all candidates.
+    Returns one row per candidate with mean R2/MAE/RMSE, fit time and predict time.
+    """
+    folds = []
+    for train_idx, test_idx in KFold(n_splits=n_splits, shuffle=True, random_state=42).split(X):
+        preprocessor = make_preprocessor().fit(X.iloc[train_idx])
+        folds.append((
+            preprocessor.transform(X.iloc[train_idx]), preprocessor.transform(X.iloc[test_idx]),
+            y.iloc[train_idx].to_numpy(), y.iloc[test_idx].to_numpy(),
+        ))
+
+    tasks = [(label, estimator, params, fold)
+             for label, estimator, params in expand_grid(grid)
+             for fold in range(len(folds))]
+    workers = os.cpu_count() if n_jobs == -1 else n_jobs
+    print(f"Evaluating {len(tasks) // len(folds)} candidates x {len(folds)} folds on {workers} processes...")
+
+    if workers == 1:
+        _init_folds(folds)
+        rows = [_evaluate(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_folds, initargs=(folds,)) as pool:
+            rows = list(pool.map(_evaluate, tasks))
+
+    results = pd.DataFrame(rows).drop(columns="fold").groupby("model").agg(
+        r2=("r2", "mean"), r2_std=("r2", "std"), mae=("mae", "mean"), rmse=("rmse", "mean"),
+        fit_s=("fit_s", "mean"), predict_ms_per_1k=("predict_ms_per_1k", "mean"),
+    )
+    return results.sort_values("rmse").reset_index()
+
 if __name__ == "__main__":
-    train_pipeline()
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train and publish the model, or compare candidates.")
+    parser.add_argument("--compare", action="store_true", help="cross-validate MODEL_GRID instead of training")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1, help="worker processes, -1 for all cores")
+    parser.add_argument("--output", help="write the comparison table to this JSON file")
+    args = parser.parse_args()
+
+    if args.compare:
+        X, y = load_training_data()
+        results = compare_models(X, y, n_splits=args.folds, n_jobs=args.jobs)
+        print(results.to_string(index=False, float_format=lambda v: f"{v:,.4f}"))
+        if args.output:
+            results.to_json(args.output, orient="records", indent=2)
+    else:
+        train_pipeline()
@@ -0,0 +1,244 @@
+# validation.py
+#
+# Data-quality stage between load_raw_data and preprocess_data. preprocess_data is
+# lenient: unparseable numbers become 0, repeated header rows are dropped silently and
+# rows of unknown trucks fall out of the joins. Here every raw table is checked against
+# declarative rules (RULES) instead; rows breaking any rule are taken out and kept, with
+# the reasons, in a quarantine frame (written to data/quarantine.csv by the app).
+#
+# Each rule is one vectorized pass over a column (parsing, comparisons, hash lookups
+# for isin/duplicated), and each column is parsed once per table, so the cost is linear
+# in the number of rows and the stage runs on every dataset refresh.
+#
+# Usage: python validation.py [data_dir]   (prints the summary, writes the quarantine)
+
+import hashlib
+import os
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from config import VEHICLE_ID, CUSTOMER_ID, DATE
+from cleaning import numeric_values, parse_dates, COST_SCHEMA, FREIGHT_SCHEMA, NumericSpec
+from ingest import save_csv
+
+# check: what to test
+#   header     value equals the column name (a repeated header row)
+#   required   value is missing
+#   number     value is present but not a number (parsed as in cleaning.py)
+#   range      number outside arg = (low, high); None is unbounded
+#   date       value is present but not a date, or outside arg = (first, last); last None is today
+#   reference  value not among the accepted keys of table arg (referential integrity)
+#   unique     columns repeat an earlier row's values (the first one is kept)
+#   duplicate  the whole row repeats an earlier one (columns unused)
+# Rules on columns a table does not have are skipped.
+Rule = namedtuple("Rule", ["check", "columns", "arg"], defaults=[None])
+
+DATE_RANGE = ("2000-01-01", None)
+
+RULES = {
+    "vehicles": [
+        Rule("required", [VEHICLE_ID]),
+        Rule("number", [VEHICLE_ID]),
+        Rule("unique", [VEHICLE_ID]),
+    ],
+    "customers": [
+        Rule("required", [CUSTOMER_ID]),
+        Rule("number", [CUSTOMER_ID]),
+        Rule("unique", [CUSTOMER_ID]),
+        Rule("range", ['Latitude'], (-90, 90)),
+        Rule("range", ['Longitude'], (-180, 180)),
+    ],
+    "costs": [
+        Rule("header", list(COST_SCHEMA)),
+        Rule("required", [DATE, VEHICLE_ID]),
+        Rule("number", [VEHICLE_ID] + list(COST_SCHEMA)),
+        Rule("range", list(COST_SCHEMA), (0, None)),
+        Rule("date", [DATE], DATE_RANGE),
+        Rule("reference", [VEHICLE_ID], "vehicles"),
+        Rule("duplicate", []),
+    ],
+    "freight": [
+        Rule("header", list(FREIGHT_SCHEMA)),
+        Rule("required", [DATE, VEHICLE_ID, CUSTOMER_ID]),
+        Rule("number", [VEHICLE_ID, CUSTOMER_ID] + list(FREIGHT_SCHEMA)),
+        Rule("range", list(FREIGHT_SCHEMA), (0, None)),
+        Rule("date", [DATE], DATE_RANGE),
+        Rule("reference", [VEHICLE_ID], "vehicles"),
+        Rule("reference", [CUSTOMER_ID], "customers"),
+        Rule("unique", ['Invoice Number']),
+    ],
+}
+
+# Number formats per table (see cleaning.py); other columns are plain numbers
+SCHEMAS = {"costs": COST_SCHEMA, "freight": FREIGHT_SCHEMA}
+
+# Tables in load_raw_data order; referenced tables come before the ones using them
+TABLES = ["vehicles", "customers", "costs", "freight"]
+
+QUARANTINE_PATH = os.path.join("data", "quarantine.csv")
+
+ValidationResult = namedtuple("ValidationResult", ["frames", "quarantine", "summary", "reasons"])
+
+
+def rules_version(rules=RULES):
+    """
+    Short hash of the rules, so results derived from validated frames can be keyed on it.
+    """
+    text = repr([(table, rules[table]) for table in sorted(rules)]) + repr(SCHEMAS)
+    return hashlib.sha1(text.encode()).hexdigest()[:8]
+
+
+class _Columns:
+    """
+    Parsed values of one table's columns, computed at most once per column.
+    """
+
+    def __init__(self, df, schema):
+        self.df = df
+        self.schema = schema
+        self._numbers = {}
+        self._dates = {}
+
+    def numbers(self, col):
+        if col not in self._numbers:
+            self._numbers[col] = numeric_values(self.df[col], self.schema.get(col, NumericSpec(float)))
+        return self._numbers[col]
+
+    def dates(self, col):
+        if col not in self._dates:
+            self._dates[col] = parse_dates(self.df[col])
+        return self._dates[col]
+
+
+def _bounds_mask(values, low, high):
+    outside = pd.Series(False, index=values.index)
+    if low is not None:
+        outside |= values < low
+    if high is not None:
+        outside |= values > high
+    return outside
+
+
+def _failures(rule, columns, keys):
+    """
+    Yields (reason, boolean mask of the failing rows) for one rule.
+    """
+    df = columns.df
+    present = [col for col in rule.columns if col in df.columns]
+    if rule.check == "duplicate":
+        yield "duplicate row", df.duplicated(keep="first")
+    elif rule.check == "unique":
+        if present == rule.columns:
+            yield f"duplicate {', '.join(present)}", df.duplicated(subset=present, keep="first")
+    elif rule.check == "header":
+        header = pd.Series(False, index=df.index)
+        for col in present:
+            header |= (df[col] == col).fillna(False).astype(bool)
+        yield "repeated header", header
+    for col in present:
+        if rule.check == "required":
+            yield f"{col} missing", df[col].isna()
+        elif rule.check == "number":
+            values, missing = columns.numbers(col)
+            yield f"{col} not a number", values.isna() & ~missing
+        elif rule.check == "range":
+            yield f"{col} out of range", _bounds_mask(columns.numbers(col)[0], *rule.arg)
+        elif rule.check == "date":
+            dates = columns.dates(col)
+            first, last = rule.arg
+            last = pd.Timestamp.now().normalize() if last is None else pd.Timestamp(last)
+            yield f"{col} not a date", dates.isna() & df[col].notna()
+            yield f"{col} out of range", _bounds_mask(dates, pd.Timestamp(first), last)
+        elif rule.check == "reference":
+            values = columns.numbers(col)[0]
+            yield f"{col} unknown", values.notna() & ~values.isin(keys[rule.arg][col])
+
+
+def _reason_text(failures, n):
+    """
+    'reason; reason' for each of n rows (None where all rules pass); each rule only
+    touches the rows it rejects.
+    """
+    text = np.full(n, None, dtype=object)
+    for reason, mask in failures:
+        rows = np.flatnonzero(mask)
+        previous = text[rows]
+        first = pd.isna(previous)
+        text[rows[first]] = reason
+        text[rows[~first]] = previous[~first] + f"; {reason}"
+    return text
+
+
+def validate_table(name, df, keys, rules=RULES):
+    """
+    (accepted rows, rejected rows with 'Reasons', {reason: failing rows}) of one table.
+    `keys` holds the accepted key values of the tables referenced so far.
+    """
+    columns = _Columns(df, SCHEMAS.get(name, {}))
+    failures = [(reason, mask.fillna(False).to_numpy(dtype=bool))
+                for rule in rules.get(name, []) for reason, mask in _failures(rule, columns, keys)]
+    counts = {reason: int(mask.sum()) for reason, mask in failures}
+    text = _reason_text(failures, len(df))
+    rejected = ~pd.isna(text)
+
+    rows = np.flatnonzero(rejected)
+    quarantine = df.iloc[rows].reset_index(drop=True)
+    quarantine.insert(0, "Reasons", text[rows])
+    quarantine.insert(0, "Row", rows)
+    quarantine.insert(0, "Table", name)
+    return df[~rejected].reset_index(drop=True), quarantine, counts
+
+
+def validate(vehicles, customers, f_cost, f_freight, rules=RULES):
+    """
+    Checks the raw tables (load_raw_data's output) against `rules`. Returns a
+    ValidationResult: the accepted frames in the same order, the quarantine (rejected
+    rows with Table, Row = position in the raw table, Reasons and their raw values),
+    a summary per table and the number of failing rows per reason.
+    """
+    frames, quarantined, summary, reasons, keys = [], [], [], [], {}
+    for name, df in zip(TABLES, (vehicles, customers, f_cost, f_freight)):
+        accepted, rejected, counts = validate_table(name, df, keys, rules)
+        # Keys later tables may reference, as numbers like the values checked against them
+        keys[name] = {col: numeric_values(accepted[col], NumericSpec(float))[0].dropna().unique()
+                      for col in (VEHICLE_ID, CUSTOMER_ID) if col in accepted.columns}
+        frames.append(accepted)
+        if len(rejected):
+            quarantined.append(rejected)
+        summary.append({"Table": name, "Rows": len(df), "Accepted": len(accepted), "Rejected": len(rejected)})
+        reasons += [{"Table": name, "Reason": reason, "Rows": n} for reason, n in counts.items() if n]
+
+    quarantine = (pd.concat(quarantined, ignore_index=True) if quarantined
+                  else pd.DataFrame(columns=["Table", "Row", "Reasons"]))
+    return ValidationResult(tuple(frames), quarantine, pd.DataFrame(summary),
+                            pd.DataFrame(reasons, columns=["Table", "Reason", "Rows"]))
+
+
+def write_quarantine(result, path=QUARANTINE_PATH):
+    save_csv(result.quarantine, path)
+
+
+def format_summary(result):
+    text = result.summary.to_string(index=False)
+    if len(result.reasons):
+        text += "\n" + result.reasons.to_string(index=False)
+    return text
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from data_loader import load_raw_data
+
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else "data"
+    raw = load_raw_data(data_dir)
+    start = time.perf_counter()
+    result = validate(*raw)
+    print(f"Validated in {time.perf_counter() - start:.2f}s")
+    print(format_summary(result))
+    path = os.path.join(data_dir, "quarantine.csv")
+    write_quarantine(result, path)
+    print(f"{len(result.quarantine):,} rejected rows written to {path}")